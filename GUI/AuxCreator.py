@@ -1,12 +1,18 @@
 # AuxCreator.py
+import itertools
 import sys
+import time
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QGridLayout, QTabWidget, QTextEdit,
-                             QListWidget, QLabel, QPushButton, QSplitter,
+                             QListView, QLabel, QPushButton, QSplitter, QLineEdit,
                              QFrame, QProgressBar, QStackedWidget, QMessageBox)
-from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProperty
+from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProperty, QTimer, QThreadPool
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon, QFontDatabase
 
+from BackgroundTasks import BackgroundTask, SubmissionQueue
+from ProblemListModel import ProblemListModel
+from ProblemSearchIndex import ProblemSearchIndex
+
 # =============================================
 # 1. DEFINICIONES DUMMY (BACKUP)
 # =============================================
@@ -44,12 +50,15 @@ class DummyDatabaseHandler:
 
     def get_all_problem_titles(self):
         return ["Problema de Prueba 1 (Dummy)", "Otro Problema (Dummy)"]
+
+    def get_sidebar_entries(self):
+        return [(title, None) for title in self.get_all_problem_titles()]
 # =============================================
 # 2. IMPORTACIÓN SEGURA DE PYLOGIC
 # =============================================
 try:
     # Intentar importar las clases reales
-    from PyLogic import DatabaseHandler, CodeCompilerWrapper, UIActions
+    from PyLogic import DatabaseHandler, CodeCompilerWrapper, UIActions, format_problem_label
 
     print("INFO: Clases de PyLogic (reales) importadas exitosamente.")
 
@@ -59,26 +68,66 @@ except ImportError as e:
     DatabaseHandler = DummyDatabaseHandler
     CodeCompilerWrapper = DummyCompilerWrapper
     UIActions = None  # Se manejará más adelante
+    format_problem_label = None  # El índice de búsqueda usará solo el título
+
+try:
+    from Leaderboard import Leaderboard
+    from UserStats import UserStatsStore, summarize as summarize_user_stats
+except ImportError as e:
+    print(f"ERROR: No se pudo importar Leaderboard/UserStats: {e}. Ranking y progreso quedarán vacíos.")
+    Leaderboard = None
+    UserStatsStore = None
+
+try:
+    from SubmissionJournal import SubmissionJournal, submission_record
+except ImportError as e:
+    print(f"ERROR: No se pudo importar SubmissionJournal: {e}. Los envíos no se registrarán.")
+    SubmissionJournal = None
 
 
 class ModernMainWindow(QMainWindow):
 
-    def __init__(self):
+    RANKING_SIZE = 10
+    USER_TASKS_CLOSE_TIMEOUT_MS = 5000
+    SEARCH_LIMIT = 500
+
+    def __init__(self, compiler_client=None, db_handler=None, sidebar_page=None, startup_timer=None,
+                 logic=None):
+        """
+        Los argumentos opcionales llegan ya calentados desde AppBootstrap;
+        si faltan, la ventana crea sus propios objetos como antes.
+        ``logic`` es el LogAccion del login: con él se suman los puntajes y
+        se alimenta el ranking.
+        """
         super().__init__()
         self.current_section = None
         self.current_problem_data = None
         self.logged_in_user = None  # Inicializar para evitar errores
+        self.startup_timer = startup_timer
+        self.logic = logic
+        self.leaderboard = None
+        self.user_stats_store = None
+        self.user_stats = None  # Último documento de user_stats del usuario
+        self._submissions = {}  # id de envío -> (paquete, time.monotonic() al encolar)
+        self.journal = self.open_submission_journal()
 
         # INSTANCIACIÓN A PRUEBA DE FALLOS
-        self.compiler_client = CodeCompilerWrapper()
-        self.db_handler = DatabaseHandler()  # SI FALLÓ, SERÁ DummyDatabaseHandler
-        self.diagnose_database()
+        self.compiler_client = compiler_client or CodeCompilerWrapper()
+        if db_handler is None:
+            self.db_handler = DatabaseHandler()  # SI FALLÓ, SERÁ DummyDatabaseHandler
+            self.diagnose_database()
+        else:
+            self.db_handler = db_handler  # El arranque ya hizo el diagnóstico
+        self.submission_queue = SubmissionQueue(self)
         self.initUI()
-        self.load_problems_into_sidebar()
+        self.setup_submission_queue()
+        self.setup_user_data()
+        self.load_problems_into_sidebar(sidebar_page)
+        self.setup_problem_search()
 
         # Conectar la lista a una nueva función
         if hasattr(self, 'problems_list'):
-            self.problems_list.itemClicked.connect(self.display_problem_details)
+            self.problems_list.clicked.connect(self.display_problem_details)
 
     def initUI(self):
         """Inicializa la interfaz de usuario con diseño moderno"""
@@ -146,6 +195,14 @@ class ModernMainWindow(QMainWindow):
             self.animate_section_change(new_index)
             self.current_section = section_name
 
+            if section_name == "Ranking" and self.leaderboard is not None:
+                # Trae lo que otras máquinas cambiaron; mientras, se ve lo que ya hay en memoria
+                self.refresh_ranking_view()
+                self.run_user_task(self.leaderboard.sync, refresh=True)
+            elif section_name == "Mi Progreso" and self.user_stats_store is not None:
+                self.refresh_progress_view()
+                self.run_user_task(self._load_user_stats, refresh=True)
+
     def animate_section_change(self, new_index):
         """Animación para cambiar entre secciones"""
         self.animation = QPropertyAnimation(self.stacked_widget, b"windowOpacity")
@@ -246,24 +303,112 @@ class ModernMainWindow(QMainWindow):
         dark_palette.setColor(QPalette.ToolTipText, QColor(220, 220, 220))
         self.setPalette(dark_palette)
 
-    def load_problems_into_sidebar(self):
+    def load_problems_into_sidebar(self, sidebar_page=None):
         """
-        Obtiene los títulos de la base de datos y los pone en self.problems_list.
+        Conecta self.problems_list con un modelo paginado de problemas.
+        Cada fila guarda el _id del problema en Qt.UserRole y las páginas se
+        piden a la base de datos a medida que el usuario se desplaza.
+        Si el arranque ya precargó la primera página, se usa directamente.
         """
         if not self.db_handler:
             print("No hay manejador de base de datos.")
             return
 
-        # Obtener los títulos formateados
-        problem_titles = self.db_handler.get_all_problem_titles()
+        if hasattr(self.db_handler, 'get_sidebar_page'):
+            self.problems_model = ProblemListModel(self.db_handler.get_sidebar_page, parent=self)
+            if sidebar_page is not None:
+                self.problems_model.seed(*sidebar_page)
+            elif self.problems_model.canFetchMore():
+                self.problems_model.fetchMore()
+        else:
+            # Manejadores sin paginación (Dummy): lista fija
+            self.problems_model = ProblemListModel(parent=self)
+            self.problems_model.set_static_entries(self.db_handler.get_sidebar_entries())
+
+        if self.problems_model.rowCount() == 0:
+            self.problems_model.set_static_entries([("No se pudieron cargar problemas", None)])
+
+        self.problems_list.setModel(self.problems_model)
+
+    # =============================================
+    # BÚSQUEDA DE PROBLEMAS
+    # =============================================
+
+    def setup_problem_search(self):
+        """
+        Construye en segundo plano el índice de búsqueda (título, categoría,
+        dificultad y enunciado) y conecta el buscador de la barra lateral.
+        Cada tecla filtra en memoria: nunca se consulta MongoDB al escribir.
+        """
+        self.search_index = None
+        self._search_task = None
+        self.search_pool = QThreadPool(self)
+        self.search_pool.setMaxThreadCount(1)
 
-        # Limpiar la lista
-        self.problems_list.clear()
+        if not (hasattr(self.db_handler, 'mirror') or hasattr(self.db_handler, 'catalog')):
+            self.search_box.setPlaceholderText("Búsqueda no disponible")
+            return
+
+        self._search_task = BackgroundTask(0, self._build_search_index)
+        self._search_task.signals.finished.connect(self.on_search_index_ready)
+        self._search_task.signals.failed.connect(self.on_search_index_failed)
+        self.search_pool.start(self._search_task)
 
-        if problem_titles:
-            self.problems_list.addItems(problem_titles)
+    def _build_search_index(self):
+        handler = self.db_handler
+        if handler.mirror_sync is not None:
+            handler.mirror_sync.result()  # Indexar el espejo ya sincronizado
+
+        if handler.mirror is not None and len(handler.mirror) > 0:
+            problems = handler.mirror.documents()
+        elif handler.catalog is not None:
+            problems = handler.catalog.load()  # Sin espejo: solo título, categoría y dificultad
         else:
-            self.problems_list.addItem("No se pudieron cargar problemas")
+            return None
+
+        start = time.perf_counter()
+        index = ProblemSearchIndex(format_problem_label)
+        index.build(problems)
+        print(f"INFO: Índice de búsqueda con {len(index)} problemas "
+              f"({(time.perf_counter() - start) * 1000:.0f} ms)")
+        return index
+
+    def on_search_index_ready(self, task_id, index):
+        if index is None:
+            self.search_box.setPlaceholderText("Búsqueda no disponible")
+            return
+
+        self.search_index = index
+        self.search_box.setPlaceholderText("🔍 Buscar problemas...")
+        self.search_box.setEnabled(True)
+        self.search_box.textChanged.connect(self.filter_problems)
+
+        # El índice sigue al espejo: cada sincronización (periódica, en DatabaseHandler) le pasa lo que cambió
+        if getattr(self.db_handler, 'mirror', None) is not None:
+            self.db_handler.add_mirror_listener(self._on_mirror_change)
+
+    def on_search_index_failed(self, task_id, message):
+        print(f"ERROR: No se pudo construir el índice de búsqueda: {message}")
+        self.search_box.setPlaceholderText("Búsqueda no disponible")
+
+    def _on_mirror_change(self, upserted, removed):
+        # Corre en el hilo de sincronización; el índice tiene su propio lock
+        for problem in upserted:
+            self.search_index.add(problem)
+        for problem_id in removed:
+            self.search_index.remove(problem_id)
+
+    def filter_problems(self, text):
+        """Filtra la barra lateral con el índice en memoria (texto vacío: lista completa)."""
+        if not text.strip():
+            self.problems_model.clear_filter()
+            self.problems_label.setText("PROBLEMAS")
+            return
+
+        results = self.search_index.search(text, limit=self.SEARCH_LIMIT)
+        self.problems_model.set_filter(results)
+        shown = f"{len(results)}+" if len(results) >= self.SEARCH_LIMIT else str(len(results))
+        self.problems_label.setText(f"PROBLEMAS · {shown} resultados")
 
     def create_left_sidebar(self):
         """Crea la barra lateral izquierda con navegación"""
@@ -328,9 +473,25 @@ class ModernMainWindow(QMainWindow):
         self.problems_label.setStyleSheet("color: #ccc; font-weight: bold;")
         layout.addWidget(self.problems_label)
 
-        self.problems_list = QListWidget()
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("🔍 Cargando búsqueda...")
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.setEnabled(False)  # Hasta que el índice esté listo
+        self.search_box.setStyleSheet("""
+            QLineEdit {
+                background-color: #1a1a1f;
+                color: #ddd;
+                border: 1px solid #444;
+                border-radius: 4px;
+                padding: 6px;
+            }
+        """)
+        layout.addWidget(self.search_box)
+
+        self.problems_list = QListView()
+        self.problems_list.setUniformItemSizes(True)  # Permite calcular el scroll sin medir cada fila
         self.problems_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #1a1a1f;
                 color: #ddd;
                 border: none;
@@ -374,8 +535,27 @@ class ModernMainWindow(QMainWindow):
         self.save_btn.setStyleSheet(self._button_style("#f39c12"))
         toolbar_layout.addWidget(self.save_btn)
 
+        self.cancel_btn = QPushButton("⛔ Cancelar")
+        self.cancel_btn.setFixedHeight(35)
+        self.cancel_btn.setStyleSheet(self._button_style("#7f8c8d"))
+        self.cancel_btn.setEnabled(False)
+        toolbar_layout.addWidget(self.cancel_btn)
+
         toolbar_layout.addStretch()
 
+        # Indicador de envíos en curso (barra ocupada + texto con el tiempo)
+        self.submission_status = QLabel("")
+        self.submission_status.setStyleSheet("color: #ccc; padding: 8px;")
+        toolbar_layout.addWidget(self.submission_status)
+
+        self.submission_progress = QProgressBar()
+        self.submission_progress.setRange(0, 0)
+        self.submission_progress.setFixedWidth(140)
+        self.submission_progress.setFixedHeight(12)
+        self.submission_progress.setTextVisible(False)
+        self.submission_progress.setVisible(False)
+        toolbar_layout.addWidget(self.submission_progress)
+
         lang_label = QLabel("Lenguaje: C++")
         lang_label.setStyleSheet("color: #ccc; padding: 8px;")
         toolbar_layout.addWidget(lang_label)
@@ -506,23 +686,26 @@ class ModernMainWindow(QMainWindow):
         """)
         stats_layout = QGridLayout(stats_frame)
 
+        # Las tarjetas se rellenan desde user_stats en refresh_progress_view
         stats_data = [
-            ("120", "Problemas Resueltos", "#27ae60"),
-            ("45", "Resueltos Hoy", "#f39c12"),
-            ("15", "Racha Actual", "#2980b9"),
-            ("350", "Puntos Totales", "#9b59b6"),
-            ("85%", "Tasa de Éxito", "#e74c3c"),
-            ("25", "Días Consecutivos", "#1abc9c")
+            ("solved_total", "Problemas Resueltos", "#27ae60"),
+            ("solved_today", "Resueltos Hoy", "#f39c12"),
+            ("verdict_streak", "Racha Actual", "#2980b9"),
+            ("points", "Puntos Totales", "#9b59b6"),
+            ("acceptance_rate", "Tasa de Éxito", "#e74c3c"),
+            ("day_streak", "Días Consecutivos", "#1abc9c")
         ]
 
-        for i, (value, label, color) in enumerate(stats_data):
+        self.progress_values = {}
+        for i, (key, label, color) in enumerate(stats_data):
             stat_widget = QFrame()
             stat_widget.setStyleSheet("background-color: #1a1a1f; border-radius: 6px; padding: 15px;")
             stat_layout = QVBoxLayout(stat_widget)
 
-            value_label = QLabel(value)
+            value_label = QLabel("-")
             value_label.setStyleSheet(f"font-size: 24px; font-weight: bold; color: {color};")
             value_label.setAlignment(Qt.AlignCenter)
+            self.progress_values[key] = value_label
 
             label_label = QLabel(label)
             label_label.setStyleSheet("font-size: 12px; color: #ccc;")
@@ -534,6 +717,11 @@ class ModernMainWindow(QMainWindow):
             stats_layout.addWidget(stat_widget, i // 3, i % 3)
 
         layout.addWidget(stats_frame)
+
+        self.progress_details = QLabel("")
+        self.progress_details.setStyleSheet("font-size: 14px; color: #ccc; padding: 10px;")
+        self.progress_details.setWordWrap(True)
+        layout.addWidget(self.progress_details)
         layout.addStretch()
 
         return container
@@ -569,92 +757,173 @@ class ModernMainWindow(QMainWindow):
             header_label.setStyleSheet("font-size: 16px; font-weight: bold; color: #f1c40f; padding: 10px;")
             grid_layout.addWidget(header_label, 0, col)
 
-        ranking_data = [
-            ("🥇 1", "CodeMaster", "1250", "45"),
-            ("🥈 2", "AlgoExpert", "1180", "42"),
-            ("🥉 3", "PythonPro", "1120", "38"),
-            ("4", "JavaWizard", "1050", "35"),
-            ("5", "CppGuru", "980", "32"),
-            ("6", "DataStruct", "920", "30"),
-            ("7", "AlgorithmLover", "870", "28"),
-            ("8", "LeetCodeFan", "810", "25"),
-            ("9", "BinarySearch", "760", "22"),
-            ("10", "QuickSort", "700", "20")
-        ]
-
-        for row, (position, user, score, problems) in enumerate(ranking_data, start=1):
-            pos_label = QLabel(position)
-            user_label = QLabel(user)
-            score_label = QLabel(score)
-            problems_label = QLabel(problems)
-
-            for label in [pos_label, user_label, score_label, problems_label]:
-                label.setStyleSheet("font-size: 14px; color: #ddd; padding: 8px;")
-
-            if row <= 3:
-                for label in [pos_label, user_label, score_label, problems_label]:
-                    label.setStyleSheet("font-size: 14px; font-weight: bold; color: #f1c40f; padding: 8px;")
+        # Filas fijas que refresh_ranking_view rellena desde el Leaderboard
+        self.ranking_rows = []
+        for row in range(1, self.RANKING_SIZE + 1):
+            labels = [QLabel("") for _ in headers]
+            for col, label in enumerate(labels):
+                grid_layout.addWidget(label, row, col)
+            self.ranking_rows.append(labels)
 
-            grid_layout.addWidget(pos_label, row, 0)
-            grid_layout.addWidget(user_label, row, 1)
-            grid_layout.addWidget(score_label, row, 2)
-            grid_layout.addWidget(problems_label, row, 3)
+        self.ranking_status = QLabel("Cargando ranking...")
+        self.ranking_status.setStyleSheet("font-size: 14px; color: #888; padding: 8px;")
 
         ranking_layout.addLayout(grid_layout)
+        ranking_layout.addWidget(self.ranking_status)
         layout.addWidget(ranking_frame)
+
+        self.my_rank_label = QLabel("")
+        self.my_rank_label.setStyleSheet("font-size: 16px; color: #3498db; padding: 10px;")
+        layout.addWidget(self.my_rank_label)
         layout.addStretch()
 
         return container
 
-    # En la clase ModernMainWindow en AuxCreator.py - AGREGAR MÉTODO DE DIAGNÓSTICO
+    # =============================================
+    # RANKING Y PROGRESO
+    # =============================================
 
-    def diagnose_database(self):
-        """Método temporal para diagnosticar la conexión a la base de datos"""
-        print("\n=== DIAGNÓSTICO DE BASE DE DATOS ===")
+    def setup_user_data(self):
+        """
+        Carga el ranking en segundo plano (la primera vez puede materializarse
+        desde ``users``). Un hilo único serializa carga, sincronización,
+        puntajes y estadísticas, así que nunca compiten por los mismos datos.
+        """
+        self.user_pool = QThreadPool(self)
+        self.user_pool.setMaxThreadCount(1)
+        self._user_task_ids = itertools.count(1)
+        self._user_tasks = {}  # id -> BackgroundTask (mantiene vivas sus señales)
 
-        if not self.db_handler:
-            print("❌ DatabaseHandler no está inicializado")
+        if self.logic is None or Leaderboard is None:
+            self.ranking_status.setText("Ranking no disponible.")
             return
-
-        if not self.db_handler.client:
-            print("❌ Cliente MongoDB no conectado")
+        self.run_user_task(self._load_user_data)
+
+    def _load_user_data(self):
+        # Corre en el hilo de datos de usuario: logic.store puede esperar a MongoDB
+        store = self.logic.store
+        self.user_stats_store = UserStatsStore.from_store(store)
+        if self.journal is not None and store.collection is not None:
+            self.journal.attach(store.collection.database[SubmissionJournal.COLLECTION])
+        leaderboard = Leaderboard.from_store(store)
+        leaderboard.load()
+        self.logic.add_score_listener(leaderboard.on_score_changed)
+        self.leaderboard = leaderboard
+
+    def _load_user_stats(self):
+        if self.logged_in_user:
+            self.user_stats = self.user_stats_store.get(self.logged_in_user.nombre)
+
+    def _record_verdict(self, nombre, problem, result):
+        """Suma el veredicto a los contadores de user_stats (una escritura atómica)."""
+        stats = self.user_stats_store.record_verdict(
+            nombre, problem.get("title", ""), bool(result.get("problem_solved")),
+            difficulty=problem.get("difficulty"), category=problem.get("category"),
+            runtime_ms=(result.get("metrics") or {}).get("total_wall_ms"))
+        if stats is not None:
+            self.user_stats = stats
+
+    def run_user_task(self, fn, *args, refresh=False):
+        """
+        Encola ``fn`` en el hilo de datos de usuario. ``refresh=True`` marca
+        lecturas que solo refrescan la vista: al cerrar se descartan, mientras
+        que puntajes y veredictos siempre se escriben.
+        """
+        task = BackgroundTask(next(self._user_task_ids), fn, *args)
+        task.refresh = refresh
+        task.signals.finished.connect(self.on_user_task_finished)
+        task.signals.failed.connect(self.on_user_task_failed)
+        self._user_tasks[task.task_id] = task
+        self.user_pool.start(task)
+
+    def on_user_task_finished(self, task_id, result):
+        self._user_tasks.pop(task_id, None)
+        self.refresh_ranking_view()
+        self.refresh_progress_view()
+
+    def on_user_task_failed(self, task_id, message):
+        self._user_tasks.pop(task_id, None)
+        print(f"ERROR: Tarea de datos de usuario #{task_id} falló: {message}")
+
+    def refresh_progress_view(self):
+        """Pinta Mi Progreso desde los contadores de user_stats (no recorre envíos)."""
+        if self.user_stats is None:
             return
 
-        print("✅ Cliente MongoDB conectado")
-
-        try:
-            # Listar todas las bases de datos
-            databases = self.db_handler.client.list_database_names()
-            print(f"📊 Bases de datos disponibles: {databases}")
-
-            if 'codecoach_db' in databases:
-                print("✅ codecoach_db encontrada")
+        stats = summarize_user_stats(self.user_stats)
+        me = self.logged_in_user.nombre if self.logged_in_user else None
+        ranked = self.leaderboard.rank_of(me) if self.leaderboard is not None and me else None
+        points = ranked[1] if ranked else getattr(self.logged_in_user, "puntaje", 0)
+        rate = stats["acceptance_rate"]
+
+        values = {
+            "solved_total": stats["solved_total"],
+            "solved_today": stats["solved_today"],
+            "verdict_streak": stats["verdict_streak"],
+            "points": points,
+            "acceptance_rate": "-" if rate is None else f"{rate:.0%}",
+            "day_streak": stats["day_streak"]
+        }
+        for key, value in values.items():
+            self.progress_values[key].setText(str(value))
+
+        lines = [f"Envíos: {stats['submissions']} · Mejor racha: {stats['best_verdict_streak']} aceptados seguidos, "
+                 f"{stats['best_day_streak']} días"]
+        if stats["avg_runtime_ms"] is not None:
+            lines.append(f"Tiempo medio de ejecución: {stats['avg_runtime_ms']:.1f} ms")
+        for title, counts in (("Por dificultad", stats["solved_by_difficulty"]),
+                              ("Por categoría", stats["solved_by_category"])):
+            if counts:
+                lines.append(f"{title}: " + " · ".join(f"{name} {count}" for name, count in sorted(counts.items())))
+        self.progress_details.setText("\n".join(lines))
+
+    def refresh_ranking_view(self):
+        """Pinta el top del Leaderboard y la posición del usuario (consultas en O(log n))."""
+        if self.leaderboard is None:
+            return
 
-                # Listar colecciones en codecoach_db
-                collections = self.db_handler.db.list_collection_names()
-                print(f"📁 Colecciones en codecoach_db: {collections}")
+        top = self.leaderboard.top(self.RANKING_SIZE)
+        medals = {1: "🥇", 2: "🥈", 3: "🥉"}
+        me = self.logged_in_user.nombre if self.logged_in_user else None
+
+        entries = top + [None] * (len(self.ranking_rows) - len(top))
+        for labels, entry in zip(self.ranking_rows, entries):
+            if entry is None:
+                for label in labels:
+                    label.setText("")
+                continue
+
+            position, nombre, score, problems = entry
+            position_text = f"{medals[position]} {position}" if position in medals else str(position)
+            for label, text in zip(labels, (position_text, nombre, str(score), str(problems))):
+                label.setText(text)
+                if nombre == me:
+                    label.setStyleSheet("font-size: 14px; font-weight: bold; color: #3498db; padding: 8px;")
+                elif position <= 3:
+                    label.setStyleSheet("font-size: 14px; font-weight: bold; color: #f1c40f; padding: 8px;")
+                else:
+                    label.setStyleSheet("font-size: 14px; color: #ddd; padding: 8px;")
 
-                if 'problems' in collections:
-                    print("✅ Colección 'problems' encontrada")
+        total = len(self.leaderboard)
+        self.ranking_status.setText("Aún no hay puntajes registrados." if total == 0 else f"{total} usuarios en el ranking")
 
-                    # Contar documentos en problems
-                    count = self.db_handler.problems_collection.count_documents({})
-                    print(f"📄 Número de problemas en la colección: {count}")
+        mine = self.leaderboard.rank_of(me) if me else None
+        if mine is None:
+            self.my_rank_label.setText("Resuelve un problema para entrar al ranking." if me else "")
+        else:
+            position, score, problems = mine
+            self.my_rank_label.setText(f"Tu posición: #{position} de {total} · {score} puntos · {problems} problemas")
 
-                    # Mostrar algunos títulos como ejemplo
-                    sample_problems = self.db_handler.problems_collection.find().limit(3)
-                    print("🔍 Problemas de ejemplo:")
-                    for problem in sample_problems:
-                        print(f"   - {problem.get('title', 'Sin título')}")
-                else:
-                    print("❌ Colección 'problems' NO encontrada")
-            else:
-                print("❌ codecoach_db NO encontrada")
+    # En la clase ModernMainWindow en AuxCreator.py - AGREGAR MÉTODO DE DIAGNÓSTICO
 
-        except Exception as e:
-            print(f"💥 Error durante diagnóstico: {e}")
+    def diagnose_database(self):
+        """Método temporal para diagnosticar la conexión a la base de datos"""
+        if not self.db_handler:
+            print("❌ DatabaseHandler no está inicializado")
+            return
 
-        print("=== FIN DIAGNÓSTICO ===\n")
+        if hasattr(self.db_handler, 'diagnose'):
+            self.db_handler.diagnose()
 
 
     def create_settings_section(self):
@@ -731,15 +1000,175 @@ class ModernMainWindow(QMainWindow):
         if submission_package is None:
             return
 
+        self.enqueue_evaluation(submission_package)
+
+    # =============================================
+    # ENVÍOS ASÍNCRONOS
+    # =============================================
+
+    def setup_submission_queue(self):
+        """Conecta la cola de envíos con el indicador de la barra del editor."""
+        queue = self.submission_queue
+        queue.submission_started.connect(self.on_submission_started)
+        queue.submission_progress.connect(self.on_submission_progress)
+        queue.submission_finished.connect(self.on_submission_finished)
+        queue.submission_failed.connect(self.on_submission_failed)
+        queue.submission_cancelled.connect(self.on_submission_cancelled)
+        queue.outstanding_changed.connect(self.update_submission_indicator)
+
+        self.cancel_btn.clicked.connect(self.cancel_latest_submission)
+
+        # Refresca el tiempo transcurrido sin bloquear el hilo de la interfaz
+        self.submission_timer = QTimer(self)
+        self.submission_timer.setInterval(100)
+        self.submission_timer.timeout.connect(self.refresh_submission_status)
+
+    def enqueue_evaluation(self, submission_package):
+        """
+        Encola la evaluación en un hilo trabajador y devuelve el id del envío.
+        El resultado llega por la señal submission_finished.
+        """
+        problem_title = submission_package.get('problem_details', {}).get('title', 'Problema')
+
+        if hasattr(self.compiler_client, 'stream_evaluation_package'):
+            # Cada caso de prueba llega como progreso en cuanto el servidor lo termina
+            def evaluate(task, package):
+                return self.compiler_client.stream_evaluation_package(
+                    package, on_event=task.report_progress, cancel_event=task.cancel_event)
+
+            task_id = self.submission_queue.submit(evaluate, submission_package,
+                                                   label=problem_title, task_aware=True)
+        else:
+            task_id = self.submission_queue.submit(
+                self.compiler_client.send_evaluation_package,
+                submission_package,
+                label=problem_title
+            )
+
+        self._submissions[task_id] = (submission_package, time.monotonic())
         self.terminal_output.clear()
-        self.terminal_output.setText("Enviando código y detalles para evaluación...")
+        self.terminal_output.setText(f"🔄 Envío #{task_id} en cola: {problem_title}...")
+        return task_id
+
+    def on_submission_started(self, task_id):
+        print(f"DEBUG: Envío #{task_id} en ejecución")
+        self.live_submission_id = task_id
+        self.terminal_output.setText(
+            f"🔄 Envío #{task_id} enviado al servidor, esperando resultado...")
+
+    def on_submission_progress(self, task_id, event):
+        """Agrega a la terminal cada caso de prueba en cuanto llega."""
+        if task_id != getattr(self, 'live_submission_id', None) or not isinstance(event, dict):
+            return
+
+        if event.get("event") == "test":
+            self.terminal_output.append(self._format_test_row(event.get("test", {})))
 
+    def on_submission_finished(self, task_id, result):
+        print(f"📨 Envío #{task_id} terminado: {result.get('status', 'unknown')}")
+        self.show_output(result)
+        package, queued_at = self._submissions.pop(task_id, ({}, None))
+        problem = package.get('problem_details') or {}
+        self.journal_submission(package, result, queued_at)
+        if not self.logged_in_user or self.logic is None:
+            return
+
+        # Solo los envíos calificados cuentan como veredicto (no los errores de conexión)
+        if self.user_stats_store is not None and ("problem_solved" in result or "passed_count" in result):
+            self.run_user_task(self._record_verdict, self.logged_in_user.nombre, problem, result)
+
+        # Un problema resuelto suma puntaje; el Leaderboard se entera por el oyente de LogAccion
+        if result.get("problem_solved"):
+            self.run_user_task(self.logic.update_user_score, self.logged_in_user.nombre,
+                               result.get("score", 0), self.submission_queue.label(task_id))
+
+    def on_submission_failed(self, task_id, message):
+        result = {
+            "status": "local_error",
+            "message": f"Fallo al enviar o procesar la respuesta del envío #{task_id}: {message}"
+        }
+        package, queued_at = self._submissions.pop(task_id, ({}, None))
+        self.journal_submission(package, result, queued_at)
+        self.show_output(result)
+
+    def on_submission_cancelled(self, task_id):
+        print(f"DEBUG: Envío #{task_id} cancelado")
+        self._submissions.pop(task_id, None)
+        self.show_output({"status": "cancelled", "message": f"Envío #{task_id} cancelado."})
+
+    def open_submission_journal(self):
+        """Diario local de envíos; se sube a MongoDB cuando _load_user_data conecta."""
+        if SubmissionJournal is None:
+            return None
         try:
-            result = self.compiler_client.send_evaluation_package(submission_package)
-            self.show_output(result)
+            return SubmissionJournal()
+        except OSError as e:
+            print(f"ERROR: No se pudo abrir el diario de envíos: {e}")
+            return None
 
-        except Exception as e:
-            self.show_output({"status": "local_error", "message": f"Fallo al enviar o procesar la respuesta: {e}"})
+    def journal_submission(self, package, result, queued_at):
+        """Anota el envío en el diario (no toca el disco en este hilo)."""
+        if self.journal is None or not package:
+            return
+        client_ms = (time.monotonic() - queued_at) * 1000 if queued_at is not None else None
+        self.journal.append(submission_record(package, result, client_ms))
+
+    def cancel_latest_submission(self):
+        """Cancela el envío más reciente que siga pendiente."""
+        outstanding = self.submission_queue.outstanding_ids()
+        if outstanding:
+            self.submission_queue.cancel(outstanding[-1])
+
+    def update_submission_indicator(self, outstanding):
+        busy = outstanding > 0
+        self.submission_progress.setVisible(busy)
+        self.cancel_btn.setEnabled(busy)
+
+        if busy:
+            if not self.submission_timer.isActive():
+                self.submission_timer.start()
+            self.refresh_submission_status()
+        else:
+            self.submission_timer.stop()
+            self.submission_status.setText("")
+
+    def refresh_submission_status(self):
+        queue = self.submission_queue
+        outstanding = queue.outstanding_ids()
+        if not outstanding:
+            return
+
+        latest = outstanding[-1]
+        elapsed = queue.elapsed(latest)
+        state = "en cola" if elapsed is None else f"{elapsed:.1f}s"
+        plural = "s" if len(outstanding) > 1 else ""
+        self.submission_status.setText(
+            f"⏳ {len(outstanding)} envío{plural} · #{latest} {state}")
+
+    def closeEvent(self, event):
+        """Descarta los envíos pendientes al cerrar la ventana."""
+        self.submission_queue.shutdown()
+        if self._search_task is not None:
+            self._search_task.cancel_event.set()  # Un índice a medio construir ya no se usa
+        # Solo se descartan los refrescos en espera; un veredicto encolado detrás de otra
+        # tarea (p. ej. la primera carga del ranking) se termina de guardar antes de salir
+        for task in list(self._user_tasks.values()):
+            if task.refresh:
+                task.cancel_event.set()
+        # Acotado: con MongoDB inalcanzable cada tarea puede esperar su timeout. Lo que no
+        # termine a tiempo queda en los buffers de escritura diferida que se cierran abajo
+        if not self.user_pool.waitForDone(self.USER_TASKS_CLOSE_TIMEOUT_MS):
+            print("INFO: Tareas de datos de usuario pendientes al cerrar; se cierra igual.")
+        # Lo que quedó en los buffers de escritura diferida se manda ahora
+        if self.leaderboard is not None:
+            self.leaderboard.close()
+        if self.logic is not None and hasattr(self.logic, "close"):
+            self.logic.close()
+        if self.journal is not None:
+            self.journal.close()
+        if hasattr(self.db_handler, "close"):
+            self.db_handler.close()
+        super().closeEvent(event)
 
     def get_submission_data_for_evaluation(self):
         """
@@ -768,17 +1197,21 @@ class ModernMainWindow(QMainWindow):
 
     # En AuxCreator.py - MEJORAR EL MÉTODO display_problem_details
 
-    def display_problem_details(self, item):
+    def display_problem_details(self, index):
         """
         Carga y muestra la descripción de un problema seleccionado
         obteniendo sus detalles completos desde el DatabaseHandler.
         """
-        problem_title = item.text()
-        print(f"DEBUG: Item clickeado: {problem_title}")
+        problem_title = index.data(Qt.DisplayRole)
+        problem_id = index.data(ProblemListModel.ProblemIdRole)
+        print(f"DEBUG: Item clickeado: {problem_title} (_id={problem_id})")
 
         if self.db_handler:
             print("DEBUG: DB Handler disponible, buscando detalles...")
-            problem_info = self.db_handler.get_problem_details(problem_title)
+            if problem_id is not None and hasattr(self.db_handler, 'get_problem_by_id'):
+                problem_info = self.db_handler.get_problem_by_id(problem_id)
+            else:
+                problem_info = self.db_handler.get_problem_details(problem_title)
         else:
             print("DEBUG: DB Handler NO disponible")
             problem_info = None
@@ -834,6 +1267,22 @@ class ModernMainWindow(QMainWindow):
         self.problem_section_desc.setText(description_html)
 
         print(f"DEBUG: Problema '{title}' cargado exitosamente")
+
+        self.prefetch_neighbour_problems(index.row())
+
+    def prefetch_neighbour_problems(self, row, radius=2):
+        """Pide precargar los problemas cercanos al seleccionado en la barra lateral."""
+        if not hasattr(self.db_handler, 'prefetch_problem_details'):
+            return
+
+        neighbours = []
+        for offset in range(1, radius + 1):
+            for neighbour_row in (row + offset, row - offset):
+                problem_id = self.problems_model.problem_id(neighbour_row)
+                if problem_id is not None:
+                    neighbours.append(problem_id)
+
+        self.db_handler.prefetch_problem_details(neighbours)
     def show_output(self, result):
         """
         Muestra el resultado de la evaluación en la terminal.
@@ -868,8 +1317,40 @@ class ModernMainWindow(QMainWindow):
         if output:
             display_text += f"Salida:\n{output}"
 
+        tests = result.get('tests', [])
+        if 'passed_count' in result:
+            display_text += (f"Aprobados: {result.get('passed_count')}/{result.get('total_tests', len(tests))}"
+                             f" · Puntaje: {result.get('score', 0)}\n")
+        metrics = result.get('metrics')
+        if metrics:
+            display_text += (f"Tiempo total: {metrics.get('total_wall_ms', 0)} ms · "
+                             f"Caso más lento: #{metrics.get('slowest_test_id', '?')} "
+                             f"({metrics.get('max_wall_ms', 0)} ms)")
+            if 'peak_rss_kb' in metrics:
+                display_text += (f" · CPU total: {metrics['total_cpu_ms']} ms"
+                                 f" · Memoria pico: {metrics['peak_rss_kb'] / 1024:.1f} MB")
+            display_text += "\n"
+        for test in tests:
+            display_text += self._format_test_row(test) + "\n"
+
         self.terminal_output.setText(display_text)
 
+    def _format_test_row(self, test):
+        """Una línea de la terminal por caso de prueba."""
+        icon = "✅" if test.get('passed') else "❌"
+        row = (f"{icon} Caso {test.get('test_id', '?')}: entrada={test.get('input', '')!r} "
+               f"obtenido={test.get('obtained', '')!r}")
+        if not test.get('passed') and 'expected' in test:
+            row += f" esperado={test.get('expected')!r}"
+        if test.get('error'):
+            row += f" ({test.get('error')})"
+        if 'wall_ms' in test:
+            row += f" [{test['wall_ms']} ms"
+            if 'peak_rss_kb' in test:
+                row += f", CPU {test['cpu_user_ms'] + test['cpu_sys_ms']:.1f} ms, {test['peak_rss_kb'] / 1024:.1f} MB"
+            row += "]"
+        return row
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
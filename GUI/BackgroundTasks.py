@@ -0,0 +1,190 @@
+# BackgroundTasks.py
+import itertools
+import threading
+import time
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class TaskSignals(QObject):
+    """
+    Señales de una tarea en segundo plano.
+
+    QRunnable no hereda de QObject, así que las señales viven en este objeto
+    (creado en el hilo de la interfaz). Al emitirse desde el hilo trabajador,
+    Qt las entrega encoladas al hilo de la interfaz.
+    """
+    started = pyqtSignal(int)
+    progress = pyqtSignal(int, object)
+    finished = pyqtSignal(int, object)
+    failed = pyqtSignal(int, str)
+
+
+class BackgroundTask(QRunnable):
+    """
+    Ejecuta una función fuera del hilo de Qt y publica el resultado por señales.
+
+    Si ``task_aware`` es True, la función recibe la tarea como primer argumento
+    para poder consultar ``cancel_event`` o llamar a ``report_progress``.
+    """
+
+    def __init__(self, task_id, fn, *args, task_aware=False, **kwargs):
+        super().__init__()
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.task_aware = task_aware
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()  # run() terminó (con o sin resultado)
+        self.signals = TaskSignals()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def report_progress(self, payload):
+        """Publica un avance parcial (texto o dict) si la tarea sigue viva."""
+        if not self.is_cancelled():
+            self.signals.progress.emit(self.task_id, payload)
+
+    def run(self):
+        try:
+            self._run()
+        finally:
+            self.done.set()
+
+    def _run(self):
+        if self.is_cancelled():
+            return
+
+        self.signals.started.emit(self.task_id)
+        try:
+            if self.task_aware:
+                result = self.fn(self, *self.args, **self.kwargs)
+            else:
+                result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            if not self.is_cancelled():
+                self.signals.failed.emit(self.task_id, str(e))
+            return
+
+        # Un resultado que llega después de cancelar se descarta
+        if not self.is_cancelled():
+            self.signals.finished.emit(self.task_id, result)
+
+
+class SubmissionQueue(QObject):
+    """
+    Cola de envíos de evaluación sobre un QThreadPool.
+
+    Cada envío recibe un id incremental. Los envíos en espera se pueden retirar
+    del pool; los que ya están en curso se cancelan de forma cooperativa: la
+    interfaz recibe ``submission_cancelled`` al instante y el resultado tardío
+    se descarta cuando el hilo trabajador termina.
+    """
+    submission_queued = pyqtSignal(int, str)
+    submission_started = pyqtSignal(int)
+    submission_progress = pyqtSignal(int, object)
+    submission_finished = pyqtSignal(int, object)
+    submission_failed = pyqtSignal(int, str)
+    submission_cancelled = pyqtSignal(int)
+    outstanding_changed = pyqtSignal(int)
+
+    def __init__(self, parent=None, max_workers=3):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_workers)
+        self._ids = itertools.count(1)
+        self._tasks = {}  # id -> BackgroundTask
+        self._labels = {}  # id -> descripción legible
+        self._started_at = {}  # id -> time.monotonic() al comenzar
+        self._retired = []  # Cancelados que el pool ya tomó: se conservan hasta que terminen
+
+    def submit(self, fn, *args, label="Envío", task_aware=False, **kwargs):
+        """Encola ``fn(*args, **kwargs)`` y devuelve el id del envío."""
+        task_id = next(self._ids)
+        task = BackgroundTask(task_id, fn, *args, task_aware=task_aware, **kwargs)
+        # Sin autoDelete el pool no destruye la tarea al terminar: su resultado llega por una
+        # señal encolada y, mientras tanto, cancel() todavía puede llamar a tryTake sobre ella.
+        # La tarea vive mientras haya referencias en _tasks (o en _retired)
+        task.setAutoDelete(False)
+        task.signals.started.connect(self._on_started)
+        task.signals.progress.connect(self.submission_progress)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+
+        self._tasks[task_id] = task
+        self._labels[task_id] = label
+        self.pool.start(task)
+
+        self.submission_queued.emit(task_id, label)
+        self.outstanding_changed.emit(self.outstanding())
+        return task_id
+
+    def cancel(self, task_id):
+        """Cancela un envío en espera o en curso. Devuelve False si ya terminó."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            return False
+
+        task.cancel_event.set()
+        if not self.pool.tryTake(task):  # Si aún no arrancó, sale del pool
+            self._retired.append(task)  # Ya la tomó un hilo: no se suelta hasta que termine
+        self._retired = [t for t in self._retired if not t.done.is_set()]
+        self._forget(task_id)
+        self.submission_cancelled.emit(task_id)
+        self._labels.pop(task_id, None)
+        self.outstanding_changed.emit(self.outstanding())
+        return True
+
+    def cancel_all(self):
+        for task_id in list(self._tasks):
+            self.cancel(task_id)
+
+    def outstanding(self):
+        """Número de envíos en espera o en curso."""
+        return len(self._tasks)
+
+    def outstanding_ids(self):
+        return list(self._tasks)
+
+    def label(self, task_id):
+        return self._labels.get(task_id, "")
+
+    def elapsed(self, task_id):
+        """Segundos desde que el envío empezó a ejecutarse (None si sigue en cola)."""
+        started = self._started_at.get(task_id)
+        if started is None:
+            return None
+        return time.monotonic() - started
+
+    def shutdown(self, wait_ms=0):
+        """Cancela todo y, opcionalmente, espera a que los hilos terminen."""
+        self.cancel_all()
+        if wait_ms:
+            self.pool.waitForDone(wait_ms)
+
+    def _on_started(self, task_id):
+        if task_id in self._tasks:
+            self._started_at[task_id] = time.monotonic()
+            self.submission_started.emit(task_id)
+
+    def _on_finished(self, task_id, result):
+        if task_id not in self._tasks:
+            return
+        self._forget(task_id)
+        self.submission_finished.emit(task_id, result)
+        self._labels.pop(task_id, None)
+        self.outstanding_changed.emit(self.outstanding())
+
+    def _on_failed(self, task_id, message):
+        if task_id not in self._tasks:
+            return
+        self._forget(task_id)
+        self.submission_failed.emit(task_id, message)
+        self._labels.pop(task_id, None)
+        self.outstanding_changed.emit(self.outstanding())
+
+    def _forget(self, task_id):
+        self._tasks.pop(task_id, None)
+        self._started_at.pop(task_id, None)
@@ -0,0 +1,189 @@
+# Bootstrap.py
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+from PyQt5.QtCore import QCoreApplication
+
+from PyLogic import get_app_data_dir, UserStore
+
+
+class StartupTimer:
+    """
+    Registra la duración de cada fase del arranque y los hitos principales.
+
+    Las fases pueden ejecutarse en hilos distintos; cada una guarda su inicio
+    relativo al arranque, su duración y el hilo donde corrió.
+    """
+
+    REPORT_FILE = "startup_timings.jsonl"
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.phases = []
+        self.marks = {}
+        self._lock = threading.Lock()
+
+    def _now_ms(self):
+        return (time.perf_counter() - self.t0) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Mide el bloque ``with`` como una fase con nombre."""
+        start = self._now_ms()
+        try:
+            yield
+        finally:
+            end = self._now_ms()
+            with self._lock:
+                self.phases.append({
+                    "phase": name,
+                    "start_ms": round(start, 1),
+                    "duration_ms": round(end - start, 1),
+                    "thread": threading.current_thread().name
+                })
+
+    def mark(self, name):
+        """Registra un hito (milisegundos desde el arranque)."""
+        with self._lock:
+            self.marks[name] = round(self._now_ms(), 1)
+
+    def report(self):
+        """Devuelve el reporte completo como diccionario."""
+        with self._lock:
+            marks = dict(self.marks)
+            phases = sorted(self.phases, key=lambda p: p["start_ms"])
+
+        report = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "app_version": QCoreApplication.applicationVersion() or "desconocida",
+            "phases": phases,
+            "marks": marks
+        }
+
+        # Tiempo hasta interactivo, con y sin el tiempo que el usuario tardó en el login
+        if "interactive" in marks:
+            report["time_to_interactive_ms"] = marks["interactive"]
+            if "credentials_accepted" in marks:
+                report["login_to_interactive_ms"] = round(
+                    marks["interactive"] - marks["credentials_accepted"], 1)
+        return report
+
+    def print_report(self, report=None):
+        report = report or self.report()
+        print("\n=== REPORTE DE ARRANQUE ===")
+        for p in report["phases"]:
+            print(f"   {p['phase']:<24} +{p['start_ms']:>8.1f} ms  {p['duration_ms']:>8.1f} ms  [{p['thread']}]")
+        for name, at in report["marks"].items():
+            print(f"   ◆ {name:<22} +{at:>8.1f} ms")
+        if "login_to_interactive_ms" in report:
+            print(f"⏱️  Login → interactivo: {report['login_to_interactive_ms']} ms")
+        print("=== FIN REPORTE ===\n")
+
+    def save(self, report=None, path=None):
+        """Agrega el reporte al historial JSONL para comparar entre versiones."""
+        report = report or self.report()
+        path = path or os.path.join(get_app_data_dir(), self.REPORT_FILE)
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(report, ensure_ascii=False) + "\n")
+        except OSError as e:
+            print(f"ERROR: No se pudo guardar el reporte de arranque: {e}")
+        return path
+
+
+class AppBootstrap:
+    """
+    Calienta en segundo plano los objetos que necesita ModernMainWindow.
+
+    Se inicia cuando se muestra el login: mientras el usuario escribe sus
+    credenciales se resuelve el DNS del servidor C++, se conecta a MongoDB y se
+    precarga la lista de problemas. ``warmed_objects`` entrega el resultado.
+    """
+
+    def __init__(self, timer=None):
+        self.timer = timer or StartupTimer()
+        self.executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bootstrap")
+        self._compiler_future = None
+        self._db_future = None
+        self._sidebar_future = None  # Primera página de la barra lateral
+        self._finished = False
+
+    def start(self):
+        """Lanza las fases en segundo plano (idempotente)."""
+        if self._compiler_future is not None:
+            return
+
+        # Importar la ventana principal ahora evita pagar la importación tras el login
+        with self.timer.phase("import_main_window"):
+            from AuxCreator import CodeCompilerWrapper, DatabaseHandler
+
+        self._compiler_future = self.executor.submit(self._build_compiler_client, CodeCompilerWrapper)
+        self._db_future = self.executor.submit(self._connect_database, DatabaseHandler)
+        self._sidebar_future = self.executor.submit(self._prefetch_sidebar_page)
+
+    def _build_compiler_client(self, compiler_cls):
+        with self.timer.phase("dns_http_client"):
+            return compiler_cls()
+
+    def _connect_database(self, db_cls):
+        with self.timer.phase("mongo_connect"):
+            db_handler = db_cls()
+        if hasattr(db_handler, "diagnose"):
+            with self.timer.phase("db_diagnose"):
+                db_handler.diagnose()
+        return db_handler
+
+    def _prefetch_sidebar_page(self):
+        db_handler = self._db_future.result()
+        if not hasattr(db_handler, "get_sidebar_page"):
+            return None
+        with self.timer.phase("problem_list_prefetch"):
+            return db_handler.get_sidebar_page()
+
+    def _result(self, future, timeout):
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception as e:
+            print(f"ERROR: Fase de arranque fallida: {e}")
+            return None
+
+    def warmed_objects(self, timeout=10):
+        """
+        Espera (lo que falte) a las fases y devuelve los argumentos para
+        ModernMainWindow. Lo que falle queda en None y la ventana lo crea ella misma.
+        """
+        self.start()
+        with self.timer.phase("wait_for_bootstrap"):
+            return {
+                "compiler_client": self._result(self._compiler_future, timeout),
+                "db_handler": self._result(self._db_future, timeout),
+                "sidebar_page": self._result(self._sidebar_future, timeout),
+                "startup_timer": self.timer
+            }
+
+    def user_store(self, timeout=10):
+        """
+        UserStore sobre la conexión del arranque (en memoria si MongoDB no
+        respondió). Pensado como ``store_factory`` de LogAccion.
+        """
+        self.start()
+        db_handler = self._result(self._db_future, timeout)
+        return UserStore.from_database(getattr(db_handler, "db", None))
+
+    def finish(self):
+        """Marca la app como interactiva, imprime y guarda el reporte (una sola vez)."""
+        if self._finished:
+            return
+        self._finished = True
+        self.timer.mark("interactive")
+        report = self.timer.report()
+        self.timer.print_report(report)
+        self.timer.save(report)
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,943 @@
+# EvaluationEngine.py
+import copy
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import resource  # Solo POSIX: límites del proceso que corre el código del usuario
+except ImportError:
+    resource = None
+
+
+class CompilationError(Exception):
+    """El código del usuario no compiló; ``output`` trae los mensajes de g++."""
+
+    def __init__(self, output):
+        super().__init__("Error de compilación")
+        self.output = output
+
+
+def get_engine_data_dir():
+    """Directorio local del motor (mismo criterio que la GUI: CODECOACH_HOME o ~/.codecoach)."""
+    path = os.environ.get("CODECOACH_HOME") or os.path.join(os.path.expanduser("~"), ".codecoach")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class BinaryCache:
+    """
+    Caché de binarios compilados, direccionada por contenido.
+
+    La clave es un SHA-256 del código normalizado más el compilador y sus
+    flags, así que reenviar el mismo código reutiliza el binario sin compilar.
+    El tamaño total se limita expulsando los binarios usados hace más tiempo
+    (la fecha de modificación se actualiza en cada acierto).
+    """
+
+    # Un binario usado hace menos de esto no se expulsa: puede estar corriendo casos
+    MIN_EVICTION_AGE_S = 60
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024):
+        self.cache_dir = cache_dir or os.path.join(get_engine_data_dir(), "bin_cache")
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}  # clave -> Lock, para no compilar dos veces lo mismo a la vez
+
+    @staticmethod
+    def normalize_source(source):
+        # Finales de línea y espacios al final no cambian el programa
+        lines = [line.rstrip() for line in source.replace("\r\n", "\n").split("\n")]
+        while lines and not lines[-1]:
+            lines.pop()
+        return "\n".join(lines)
+
+    def key(self, source, compiler_id, flags):
+        digest = hashlib.sha256()
+        digest.update(self.normalize_source(source).encode("utf-8"))
+        digest.update(b"\0" + compiler_id.encode("utf-8"))
+        digest.update(b"\0" + " ".join(flags).encode("utf-8"))
+        return digest.hexdigest()
+
+    def key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key, count=True):
+        """Ruta del binario en caché, o None. Un acierto lo marca como recién usado."""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            if count:
+                self.record(hit=False)
+            return None
+        if count:
+            self.record(hit=True)
+        return path
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key, built_path):
+        """Mueve el binario recién compilado a la caché (atómico) y devuelve su ruta."""
+        path = self.path_for(key)
+        os.replace(built_path, path)
+        self._evict()
+        return path
+
+    def release_key_lock(self, key):
+        with self._lock:
+            self._key_locks.pop(key, None)
+
+    def stats(self):
+        entries, total = self._entries()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "entries": len(entries),
+                "bytes": total
+            }
+
+    def _entries(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+        return entries, total
+
+    def _evict(self):
+        entries, total = self._entries()
+        if total <= self.max_bytes:
+            return
+
+        now = time.time()
+        for mtime, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if now - mtime < self.MIN_EVICTION_AGE_S:
+                continue
+            try:
+                os.remove(path)
+                total -= size
+            except FileNotFoundError:
+                pass
+
+
+# Comentarios, literales y operadores de C++ (los operadores largos primero)
+_CPP_TOKEN_RE = re.compile(r"""
+    (?P<comment>//[^\n]*|/\*.*?\*/)
+  | (?P<raw>R"(?P<delim>[^(\s]*)\(.*?\)(?P=delim)")
+  | (?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+  | (?P<newline>\n)
+  | (?P<space>[ \t\r\f\v]+|\\\n)
+  | (?P<word>[A-Za-z0-9_.]+)
+  | (?P<op>>>=|<<=|->\*|\.\.\.|::|->|\+\+|--|<<|>>|<=|>=|==|!=|&&|\|\||[-+*/%&|^]=|.)
+""", re.VERBOSE | re.DOTALL)
+
+
+def cpp_tokens(source):
+    """
+    Tokeniza código C++ descartando espacios y comentarios.
+
+    Los literales quedan intactos (sus espacios sí importan) y el fin de una
+    directiva del preprocesador se conserva, porque ahí el salto de línea
+    cambia el significado.
+    """
+    tokens = []
+    in_directive = False
+    for match in _CPP_TOKEN_RE.finditer(source):
+        kind = match.lastgroup
+        if kind == "delim":
+            kind = "raw"
+        if kind in ("comment", "space"):
+            continue
+        if kind == "newline":
+            if in_directive:
+                tokens.append("\n")
+                in_directive = False
+            continue
+        text = match.group()
+        if text == "#" and not in_directive and _starts_line(source, match.start()):
+            in_directive = True
+        tokens.append(text)
+    return tokens
+
+
+def _starts_line(source, pos):
+    line_start = source.rfind("\n", 0, pos) + 1
+    return not source[line_start:pos].strip()
+
+
+def code_fingerprint(source, compiler_id="", flags=()):
+    """Hash del código normalizado por tokens, más compilador y flags."""
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(cpp_tokens(source)).encode("utf-8"))
+    digest.update(b"\0" + compiler_id.encode("utf-8"))
+    digest.update(b"\0" + " ".join(flags).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def test_set_fingerprint(test_cases):
+    """Huella de la lista test_cases tal como la arma CodeCompilerWrapper._extract_test_cases."""
+    canonical = json.dumps(test_cases, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResultMemo:
+    """
+    Memo de resultados de evaluación por (código normalizado, huella de los casos).
+
+    Mismo código contra los mismos casos da el mismo veredicto, así que un reenvío
+    idéntico se responde sin compilar ni ejecutar. Las entradas vencen tras
+    ``ttl_s``. Cuando un problema llega con casos distintos a los memorizados
+    (sus ejemplos cambiaron), se descartan todas sus entradas. Los resultados
+    con timeouts no se memorizan: dependen de la carga del servidor.
+    """
+
+    def __init__(self, ttl_s=600, max_entries=4096):
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (código, casos) -> (vence_en, título, resultado)
+        self._problem_tests = {}  # título -> huella de casos vigente
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, problem_title, code_fp, tests_fp):
+        with self._lock:
+            self._check_problem(problem_title, tests_fp)
+            entry = self._entries.get((code_fp, tests_fp))
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[(code_fp, tests_fp)]
+                self.misses += 1
+                return None
+            self._entries.move_to_end((code_fp, tests_fp))
+            self.hits += 1
+            return copy.deepcopy(entry[2])
+
+    def put(self, problem_title, code_fp, tests_fp, result):
+        if any(str(t.get("error", "")).startswith("timeout") for t in result.get("tests", [])):
+            return
+
+        with self._lock:
+            self._check_problem(problem_title, tests_fp)
+            self._entries[(code_fp, tests_fp)] = (time.monotonic() + self.ttl_s, problem_title,
+                                                  copy.deepcopy(result))
+            self._entries.move_to_end((code_fp, tests_fp))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_problem(self, problem_title):
+        """Descarta los resultados memorizados de un problema."""
+        with self._lock:
+            self._drop_problem(problem_title)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+    def _check_problem(self, problem_title, tests_fp):
+        # Casos distintos para el mismo problema = sus ejemplos cambiaron
+        previous = self._problem_tests.get(problem_title)
+        if previous is not None and previous != tests_fp:
+            self._drop_problem(problem_title)
+        self._problem_tests[problem_title] = tests_fp
+
+    def _drop_problem(self, problem_title):
+        stale = [key for key, (_, title, _) in self._entries.items() if title == problem_title]
+        for key in stale:
+            del self._entries[key]
+        self._problem_tests.pop(problem_title, None)
+
+
+class PrecompiledHeaders:
+    """
+    Encabezados precompilados (.gch) para los conjuntos de includes habituales.
+
+    Casi todas las soluciones incluyen ``<bits/stdc++.h>`` o unos pocos
+    encabezados de la STL; parsearlos es la mayor parte del tiempo de
+    compilación. Los .gch se generan una vez por compilador y flags (g++ solo
+    acepta un .gch compilado con las mismas flags) en
+    ``~/.codecoach/pch/<huella>/``.
+
+    Un .gch nunca cambia el programa: ``<bits/stdc++.h>`` se resuelve al .gch
+    del mismo encabezado (-I), y para el resto se precompila un encabezado con
+    exactamente los includes que el código pone al principio, en el mismo
+    orden; ``-include`` lo antepone y los del código quedan sin efecto por sus
+    guardas. Un conjunto nuevo se precompila en segundo plano (hasta
+    ``MAX_INCLUDE_SETS``) y mientras tanto se compila sin .gch.
+    """
+
+    # Conjuntos que se precompilan al arrancar (la plantilla del editor usa bits/stdc++.h)
+    COMMON_INCLUDE_SETS = (("iostream",), ("iostream", "vector"), ("iostream", "vector", "algorithm"))
+    MAX_INCLUDE_SETS = 32
+
+    _INCLUDE_RE = re.compile(r"^\s*#\s*include\b", re.MULTILINE)
+    _PRELUDE_INCLUDE_RE = re.compile(r"#\s*include\s*<([^>]+)>\s*(//.*)?$")
+
+    def __init__(self, compiler, compiler_id, flags, base_dir=None, build_timeout=120.0):
+        self.compiler = compiler
+        self.flags = tuple(flags)
+        self.build_timeout = build_timeout
+        fingerprint = hashlib.sha256(
+            (compiler_id + "\0" + " ".join(self.flags)).encode("utf-8")).hexdigest()[:16]
+        self.pch_dir = base_dir or os.path.join(get_engine_data_dir(), "pch", fingerprint)
+        self._ready = set()
+        self._include_sets = {self._set_name(includes): includes for includes in self.COMMON_INCLUDE_SETS}
+        self._lock = threading.Lock()
+        self._builder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pch")
+        self._build_locks = {}  # nombre -> Lock: un mismo .gch no se genera dos veces a la vez
+        self.build_ms = {}
+
+    @staticmethod
+    def _set_name(includes):
+        return "set-" + hashlib.sha256("\n".join(includes).encode("utf-8")).hexdigest()[:12]
+
+    def _set_header(self, name):
+        return os.path.join(self.pch_dir, "sets", name + ".h")
+
+    def _targets(self):
+        # nombre -> (encabezado a precompilar, contenido, ruta del .gch)
+        targets = {
+            # g++ busca <bits/stdc++.h>.gch en cada directorio -I antes que en el del sistema
+            "bits": (os.path.join(self.pch_dir, "src", "stdcxx.h"), "#include <bits/stdc++.h>\n",
+                     os.path.join(self.pch_dir, "bits", "stdc++.h.gch"))
+        }
+        with self._lock:
+            include_sets = dict(self._include_sets)
+        for name, includes in include_sets.items():
+            header = self._set_header(name)
+            targets[name] = (header, "".join(f"#include <{h}>\n" for h in includes), header + ".gch")
+        return targets
+
+    def build_all(self):
+        """Genera los .gch que falten (tarda unos segundos la primera vez)."""
+        for name in self._targets():
+            self.build(name)
+        return self.ready()
+
+    def build(self, name):
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+        with build_lock:
+            return self._build(name)
+
+    def _build(self, name):
+        header, content, gch = self._targets()[name]
+        if os.path.exists(gch) and os.path.exists(header):
+            with self._lock:
+                self._ready.add(name)
+            return True
+
+        os.makedirs(os.path.dirname(header), exist_ok=True)
+        os.makedirs(os.path.dirname(gch), exist_ok=True)
+        with open(header, "w", encoding="utf-8") as f:
+            f.write(content)
+
+        tmp_gch = f"{gch}.{os.getpid()}.{threading.get_ident()}.tmp"
+        cmd = [self.compiler, *self.flags, "-x", "c++-header", header, "-o", tmp_gch]
+        start = time.perf_counter()
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.build_timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"ERROR: No se pudo generar el encabezado precompilado '{name}': {e}")
+            return False
+        if proc.returncode != 0:
+            print(f"ERROR: No se pudo generar el encabezado precompilado '{name}': {proc.stderr[:500]}")
+            return False
+
+        os.replace(tmp_gch, gch)
+        self.build_ms[name] = round((time.perf_counter() - start) * 1000, 1)
+        with self._lock:
+            self._ready.add(name)
+        print(f"INFO: Encabezado precompilado '{name}' listo en {self.build_ms[name]} ms")
+        return True
+
+    def ready(self):
+        with self._lock:
+            return sorted(self._ready)
+
+    def include_prelude(self, source):
+        """
+        Includes ``<...>`` con los que empieza ``source``, en orden. None si
+        antes o entre ellos hay otra cosa (un #define, por ejemplo) o si el
+        código tiene más includes después.
+        """
+        includes = []
+        for line in source.splitlines():
+            stripped = line.strip()
+            if not stripped or stripped.startswith("//"):
+                continue
+            match = self._PRELUDE_INCLUDE_RE.match(stripped)
+            if match is None:
+                break
+            includes.append(match.group(1).strip())
+        if not includes or len(self._INCLUDE_RE.findall(source)) != len(includes):
+            return None
+        return tuple(includes)
+
+    def flags_for(self, source):
+        """Flags extra para compilar ``source`` con el .gch adecuado ([] si ninguno aplica)."""
+        with self._lock:
+            ready = set(self._ready)
+        if "bits" in ready and re.search(r"#\s*include\s*<bits/stdc\+\+\.h>", source):
+            return ["-I", self.pch_dir]
+
+        includes = self.include_prelude(source)
+        if includes is None or "bits/stdc++.h" in includes:
+            return []
+        name = self._set_name(includes)
+        if name in ready:
+            return ["-include", self._set_header(name)]
+
+        with self._lock:
+            schedule = name not in self._include_sets and len(self._include_sets) < self.MAX_INCLUDE_SETS
+            if schedule:
+                self._include_sets[name] = includes
+        if schedule:
+            try:
+                self._builder.submit(self.build, name)
+            except RuntimeError:
+                pass  # Ya se cerró
+        return []
+
+    def prepare(self, source):
+        """Precompila ya (sin segundo plano) el .gch que usaría ``source`` y devuelve sus flags."""
+        self.flags_for(source)
+        includes = self.include_prelude(source)
+        if includes is not None and "bits/stdc++.h" not in includes:
+            name = self._set_name(includes)
+            with self._lock:
+                known = name in self._include_sets
+            if known:
+                self.build(name)
+        return self.flags_for(source)
+
+    def close(self):
+        self._builder.shutdown(wait=False)
+
+    def stats(self):
+        return {"dir": self.pch_dir, "ready": self.ready(), "build_ms": dict(self.build_ms)}
+
+
+# Lanzador de casos: codecoach_runner <timeout_ms> <reporte> <binario>
+# Escribe en <reporte>: código_de_salida hubo_timeout utime_us stime_us maxrss_kb
+_RUNNER_SOURCE = r"""
+#include <csignal>
+#include <cstdio>
+#include <cstdlib>
+#include <cerrno>
+#include <sys/resource.h>
+#include <sys/time.h>
+#include <sys/wait.h>
+#include <unistd.h>
+
+static volatile pid_t child = -1;
+static volatile sig_atomic_t timed_out = 0;
+
+static void on_alarm(int) {
+    timed_out = 1;
+    if (child > 0) kill(-child, SIGKILL);
+}
+
+static void limit(int resource, rlim_t value) {
+    rlimit rl = {value, value};
+    if (setrlimit(resource, &rl) != 0) _exit(126);
+}
+
+// Uso: runner <timeout_ms> <reporte> <memoria_bytes> <salida_bytes> <binario> [args...]
+int main(int argc, char **argv) {
+    if (argc < 6) return 2;
+    long timeout_ms = atol(argv[1]);
+    rlim_t memory_bytes = strtoull(argv[3], nullptr, 10);
+    rlim_t output_bytes = strtoull(argv[4], nullptr, 10);
+
+    child = fork();
+    if (child < 0) return 3;
+    if (child == 0) {
+        setpgid(0, 0);  // Grupo propio: al terminar se mata también a lo que haya creado
+        // Límites del código del usuario, antes de execv: memoria, CPU, tamaño de
+        // archivos, sin procesos nuevos (una fork bomb falla en su primer fork) ni core
+        limit(RLIMIT_AS, memory_bytes);
+        limit(RLIMIT_CPU, (rlim_t) (timeout_ms / 1000 + 1));
+        limit(RLIMIT_FSIZE, output_bytes);
+        limit(RLIMIT_NPROC, 0);
+        limit(RLIMIT_CORE, 0);
+        execv(argv[5], argv + 5);
+        _exit(127);
+    }
+
+    signal(SIGALRM, on_alarm);
+    itimerval timer = {};
+    timer.it_value.tv_sec = timeout_ms / 1000;
+    timer.it_value.tv_usec = (timeout_ms % 1000) * 1000;
+    setitimer(ITIMER_REAL, &timer, nullptr);
+
+    int status = 0;
+    rusage usage = {};
+    while (wait4(child, &status, 0, &usage) < 0 && errno == EINTR) {
+    }
+    // RLIMIT_NPROC no rige para root: si algo logró hacer fork, no sobrevive al caso
+    kill(-child, SIGKILL);
+
+    int code = WIFEXITED(status) ? WEXITSTATUS(status) : -WTERMSIG(status);
+    FILE *report = fopen(argv[2], "w");
+    if (!report) return 4;
+    fprintf(report, "%d %d %ld %ld %ld\n", code, (int) timed_out,
+            usage.ru_utime.tv_sec * 1000000L + usage.ru_utime.tv_usec,
+            usage.ru_stime.tv_sec * 1000000L + usage.ru_stime.tv_usec,
+            usage.ru_maxrss);
+    fclose(report);
+    return 0;
+}
+"""
+
+
+# Sin lanzador compilado (POSIX): los mismos límites con un proceso intermedio que los
+# aplica y hace exec del binario (sin preexec_fn, que no es seguro con hilos)
+_LIMITS_TRAMPOLINE = """
+import os, resource, signal, sys
+# Python ignora SIGPIPE y SIGXFSZ, y lo ignorado se hereda en exec: se restauran
+signal.signal(signal.SIGPIPE, signal.SIG_DFL)
+signal.signal(signal.SIGXFSZ, signal.SIG_DFL)
+memory, cpu, output = (int(value) for value in sys.argv[1:4])
+for limit, value in ((resource.RLIMIT_AS, memory), (resource.RLIMIT_CPU, cpu),
+                     (resource.RLIMIT_FSIZE, output), (resource.RLIMIT_NPROC, 0),
+                     (resource.RLIMIT_CORE, 0)):
+    resource.setrlimit(limit, (value, value))
+os.execv(sys.argv[4], sys.argv[4:])
+"""
+
+
+class EvaluationEngine:
+    """
+    Motor de evaluación local para el contrato de /submit_evaluation.
+
+    Recibe exactamente el payload que arma CodeCompilerWrapper
+    (``problem_title``, ``user_code`` y ``test_cases`` con ``input_raw`` /
+    ``expected_output_raw``), compila el código UNA vez con g++ y corre todos
+    los casos contra ese mismo binario en paralelo, cada uno con su timeout.
+
+    Cada caso ya es un proceso hijo independiente, así que los casos se
+    reparten en un pool de hilos que solo espera a esos procesos.
+
+    Las compilaciones pasan por un pool aparte de ``compile_workers`` hilos,
+    que al arrancar genera los encabezados precompilados y hace una
+    compilación de calentamiento por hilo (deja el .gch y g++ en la caché de
+    páginas del SO), sin bloquear las primeras evaluaciones.
+    """
+
+    DEFAULT_FLAGS = ("-std=c++17", "-O2", "-pipe")
+    POINTS_PER_TEST = 10
+    MAX_OUTPUT_CHARS = 64 * 1024  # Salida máxima que se devuelve por caso
+    MAX_OUTPUT_FILE_BYTES = 16 * 1024 * 1024  # RLIMIT_FSIZE del binario (su stdout es un archivo)
+
+    def __init__(self, compiler="g++", flags=None, test_timeout=2.0, compile_timeout=30.0, max_workers=None,
+                 binary_cache=None, result_memo=None, precompiled_headers=True, compile_workers=2,
+                 memory_limit_mb=256):
+        self.compiler = compiler
+        self.memory_limit_mb = memory_limit_mb
+        self.flags = tuple(flags) if flags is not None else self.DEFAULT_FLAGS
+        self.binary_cache = binary_cache if binary_cache is not None else BinaryCache()
+        self.result_memo = result_memo if result_memo is not None else ResultMemo()
+        self.compiler_id = self._compiler_identity()
+        self.test_timeout = test_timeout
+        self.compile_timeout = compile_timeout
+        self.runner = self._build_runner()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 2,
+                                           thread_name_prefix="eval")
+        self.compile_workers = compile_workers
+        self.compile_pool = ThreadPoolExecutor(max_workers=compile_workers, thread_name_prefix="compile")
+        self.pch = PrecompiledHeaders(compiler, self.compiler_id, self.flags) if precompiled_headers else None
+        self.warm_future = self.compile_pool.submit(self._warm_up) if self.pch else None
+
+    # =============================================
+    # API PÚBLICA
+    # =============================================
+
+    def evaluate(self, payload):
+        """Evalúa el payload completo y devuelve el resultado con el esquema del README."""
+        tests = []
+        summary = None
+        for event in self.iter_evaluate(payload):
+            if event["event"] == "test":
+                tests.append(event["test"])
+            else:
+                summary = {k: v for k, v in event.items() if k != "event"}
+
+        summary["tests"] = sorted(tests, key=lambda t: t["test_id"])
+        return summary
+
+    def iter_evaluate(self, payload):
+        """
+        Igual que evaluate, pero genera eventos a medida que terminan los casos:
+        ``{"event": "test", "test": {...}}`` por caso (en orden de llegada) y un
+        ``{"event": "summary", ...}`` final. Es lo que emite el modo NDJSON.
+        """
+        error = self._validate(payload)
+        if error:
+            yield dict(error, event="error")
+            return
+
+        problem_title = payload.get("problem_title", "")
+        code_fp = code_fingerprint(payload["user_code"], self.compiler_id, self.flags)
+        tests_fp = test_set_fingerprint(payload["test_cases"])
+
+        cached = self.result_memo.get(problem_title, code_fp, tests_fp)
+        if cached is not None:
+            for test in cached["tests"]:
+                yield {"event": "test", "test": test}
+            summary = {k: v for k, v in cached.items() if k != "tests"}
+            yield dict(summary, event="summary", cached=True)
+            return
+
+        tests = []
+        summary = None
+        for event in self._run(payload):
+            if event["event"] == "test":
+                tests.append(event["test"])
+            else:
+                summary = {k: v for k, v in event.items() if k != "event"}
+            yield event
+
+        if summary is not None:
+            result = dict(summary, tests=sorted(tests, key=lambda t: t["test_id"]))
+            self.result_memo.put(problem_title, code_fp, tests_fp, result)
+
+    def _run(self, payload):
+        """Compila (o reutiliza el binario) y corre los casos, generando eventos."""
+        test_cases = payload["test_cases"]
+        work_dir = tempfile.mkdtemp(prefix="codecoach_")
+        try:
+            try:
+                binary = self.compile(payload["user_code"], work_dir)
+            except CompilationError as e:
+                yield dict(self._summary([], len(test_cases)),
+                           event="summary", status="compile_error",
+                           message="Error de compilación", details=e.output)
+                return
+
+            futures = [self.executor.submit(self.run_test, binary, i, case)
+                       for i, case in enumerate(test_cases, 1)]
+            results = []
+            for future in as_completed(futures):
+                test = future.result()
+                results.append(test)
+                yield {"event": "test", "test": test}
+
+            yield dict(self._summary(results, len(test_cases)), event="summary")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def compile(self, source, work_dir):
+        """
+        Devuelve la ruta de un binario para ``source``: de la caché si el mismo
+        código ya se compiló con el mismo compilador y flags, o compilándolo en ``work_dir``.
+        """
+        # Las flags del .gch forman parte de la clave: el binario es de esa compilación exacta
+        pch_flags = self.pch.flags_for(source) if self.pch else []
+        key = self.binary_cache.key(source, self.compiler_id, (*self.flags, *pch_flags))
+        cached = self.binary_cache.get(key, count=False)
+        if cached is not None:
+            self.binary_cache.record(hit=True)
+            return cached
+
+        # Si otro hilo está compilando exactamente lo mismo, se espera su binario
+        try:
+            with self.binary_cache.key_lock(key):
+                cached = self.binary_cache.get(key)
+                if cached is not None:
+                    return cached
+                binary_path = self.compile_pool.submit(self._run_compiler, source, work_dir, pch_flags).result()
+                return self.binary_cache.put(key, binary_path)
+        finally:
+            self.binary_cache.release_key_lock(key)
+
+    def _run_compiler(self, source, work_dir, pch_flags=()):
+        source_path = os.path.join(work_dir, "solution.cpp")
+        binary_path = os.path.join(work_dir, "solution")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(source)
+
+        cmd = [self.compiler, *self.flags, *pch_flags, source_path, "-o", binary_path]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=self.compile_timeout)
+        except subprocess.TimeoutExpired:
+            raise CompilationError(f"La compilación superó {self.compile_timeout}s")
+
+        if proc.returncode != 0:
+            raise CompilationError(proc.stderr.replace(work_dir + os.sep, ""))
+        return binary_path
+
+    def stats(self):
+        return {
+            "binary_cache": self.binary_cache.stats(),
+            "result_memo": self.result_memo.stats(),
+            "precompiled_headers": self.pch.stats() if self.pch else None
+        }
+
+    def run_test(self, binary, test_id, case):
+        """
+        Corre un caso de prueba contra el binario y compara la salida.
+        Agrega las métricas del proceso: ``wall_ms``, ``cpu_user_ms``,
+        ``cpu_sys_ms`` y ``peak_rss_kb`` (las de CPU y memoria solo en POSIX,
+        donde el caso corre a través del lanzador).
+        """
+        input_raw = case.get("input_raw", "")
+        expected = case.get("expected_output_raw", "")
+        test = {"test_id": test_id, "input": input_raw, "expected": expected}
+
+        stdin_data = input_raw if input_raw.endswith("\n") else input_raw + "\n"
+        returncode, stdout, stderr, timed_out, metrics = self._execute(binary, stdin_data.encode("utf-8"))
+        test.update(metrics)
+        if timed_out:
+            test.update(obtained="", passed=False, error=f"timeout ({self.test_timeout}s)")
+            return test
+
+        obtained = stdout.decode("utf-8", errors="replace")[:self.MAX_OUTPUT_CHARS]
+        test["obtained"] = obtained.strip()
+        if returncode != 0 and self._hit_memory_limit(stderr, metrics):
+            test.update(passed=False, error=f"memory_limit_exceeded ({self.memory_limit_mb} MB)")
+        elif returncode == -getattr(signal, "SIGXFSZ", 0):  # RLIMIT_FSIZE: escribió demasiada salida
+            test.update(passed=False, error="output_limit_exceeded")
+        elif returncode != 0:
+            test.update(passed=False, error=f"runtime_error (código {returncode})")
+        else:
+            test["passed"] = self._normalize(obtained) == self._normalize(expected)
+        return test
+
+    def _execute(self, binary, stdin_bytes):
+        """
+        Ejecuta el binario con stdin/stdout/stderr en archivos temporales.
+        Devuelve (código de salida, stdout, inicio de stderr, hubo_timeout, métricas).
+
+        Con el lanzador (POSIX) el tiempo de CPU y el pico de memoria vienen del
+        rusage del proceso; sin él solo se mide el tiempo de pared.
+        """
+        with tempfile.TemporaryFile() as stdin_file, tempfile.TemporaryFile() as stdout_file, \
+                tempfile.TemporaryFile() as stderr_file:
+            stdin_file.write(stdin_bytes)
+            stdin_file.seek(0)
+
+            start = time.perf_counter()
+            if self.runner:
+                returncode, timed_out, metrics = self._execute_with_runner(binary, stdin_file, stdout_file,
+                                                                           stderr_file)
+            else:
+                returncode, timed_out, metrics = self._execute_plain(binary, stdin_file, stdout_file,
+                                                                     stderr_file)
+            metrics = dict(wall_ms=round((time.perf_counter() - start) * 1000, 2), **metrics)
+
+            stdout_file.seek(0)
+            stdout = stdout_file.read(self.MAX_OUTPUT_CHARS * 4)
+            stderr_file.seek(0)
+            stderr = stderr_file.read(4096)  # Solo para reconocer el motivo de un fallo
+        return returncode, stdout, stderr, timed_out, metrics
+
+    def _hit_memory_limit(self, stderr, metrics):
+        """
+        Con RLIMIT_AS, pasarse de memoria no mata con una señal propia: ``new``
+        lanza std::bad_alloc (abort con su mensaje en stderr) o malloc
+        devuelve NULL y el programa cae poco después, ya cerca del límite.
+        """
+        if b"std::bad_alloc" in stderr:
+            return True
+        return metrics.get("peak_rss_kb", 0) >= self.memory_limit_mb * 1024 * 0.95
+
+    def _execute_with_runner(self, binary, stdin_file, stdout_file, stderr_file):
+        fd, report_path = tempfile.mkstemp(prefix="codecoach_rusage_")
+        os.close(fd)
+        timeout_ms = str(int(self.test_timeout * 1000))
+        try:
+            proc = subprocess.Popen([self.runner, timeout_ms, report_path,
+                                     str(self.memory_limit_mb * 1024 * 1024), str(self.MAX_OUTPUT_FILE_BYTES),
+                                     binary], stdin=stdin_file,
+                                    stdout=stdout_file, stderr=stderr_file, start_new_session=True)
+            try:
+                # El lanzador aplica el timeout; este margen solo cubre un lanzador colgado
+                proc.wait(timeout=self.test_timeout + 5)
+            except subprocess.TimeoutExpired:
+                os.killpg(proc.pid, signal.SIGKILL)
+                proc.wait()
+                return -signal.SIGKILL, True, {}
+
+            with open(report_path, encoding="utf-8") as f:
+                fields = f.read().split()
+        finally:
+            os.remove(report_path)
+
+        if len(fields) != 5:
+            return proc.returncode, False, {}
+        returncode, timed_out, utime_us, stime_us, maxrss_kb = (int(x) for x in fields)
+        return returncode, bool(timed_out), {
+            "cpu_user_ms": round(utime_us / 1000, 2),
+            "cpu_sys_ms": round(stime_us / 1000, 2),
+            "peak_rss_kb": maxrss_kb
+        }
+
+    def _execute_plain(self, binary, stdin_file, stdout_file, stderr_file):
+        if resource is None:
+            cmd, new_session = [binary], False  # Windows: sin rlimits, solo el timeout
+        else:
+            cmd = [sys.executable, "-c", _LIMITS_TRAMPOLINE, str(self.memory_limit_mb * 1024 * 1024),
+                   str(int(self.test_timeout) + 1), str(self.MAX_OUTPUT_FILE_BYTES), binary]
+            new_session = True
+        proc = subprocess.Popen(cmd, stdin=stdin_file, stdout=stdout_file, stderr=stderr_file,
+                                start_new_session=new_session)
+        try:
+            proc.wait(timeout=self.test_timeout)
+        except subprocess.TimeoutExpired:
+            if new_session:
+                os.killpg(proc.pid, signal.SIGKILL)
+            else:
+                proc.kill()
+            proc.wait()
+            return proc.returncode, True, {}
+        return proc.returncode, False, {}
+
+    def _build_runner(self):
+        """
+        Compila (una vez por versión del compilador) el lanzador de casos.
+
+        El pico de memoria (ru_maxrss) de un proceso hereda el de quien lo creó
+        con fork, así que medir el binario como hijo directo del servidor
+        reportaría la memoria de Python. El lanzador es un proceso mínimo que
+        crea al binario, aplica el timeout y escribe su rusage en un archivo.
+        Antes de execv le pone al binario límites de memoria (RLIMIT_AS), CPU,
+        tamaño de archivo y procesos (RLIMIT_NPROC en 0: no puede hacer fork).
+        """
+        if os.name != "posix":
+            return None
+
+        fingerprint = hashlib.sha256(self.compiler_id.encode("utf-8") + _RUNNER_SOURCE.encode("utf-8"))
+        runner_dir = os.path.join(get_engine_data_dir(), "runner", fingerprint.hexdigest()[:16])
+        runner_path = os.path.join(runner_dir, "codecoach_runner")
+        if os.path.exists(runner_path):
+            return runner_path
+
+        os.makedirs(runner_dir, exist_ok=True)
+        source_path = os.path.join(runner_dir, "runner.cpp")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(_RUNNER_SOURCE)
+        tmp_path = f"{runner_path}.{os.getpid()}.tmp"
+        try:
+            proc = subprocess.run([self.compiler, "-O2", source_path, "-o", tmp_path],
+                                  capture_output=True, text=True, timeout=self.compile_timeout)
+        except (OSError, subprocess.SubprocessError) as e:
+            print(f"ERROR: No se pudo compilar el lanzador de casos (solo se medirá tiempo de pared): {e}")
+            return None
+        if proc.returncode != 0:
+            print(f"ERROR: No se pudo compilar el lanzador de casos: {proc.stderr[:500]}")
+            return None
+        os.replace(tmp_path, runner_path)
+        return runner_path
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False)
+        self.compile_pool.shutdown(wait=False)
+        if self.pch is not None:
+            self.pch.close()
+
+    def wait_until_warm(self, timeout=None):
+        """Espera a los .gch y a las compilaciones de calentamiento (para medir en caliente)."""
+        if self.warm_future is None:
+            return
+        for future in self.warm_future.result(timeout=timeout):
+            future.result(timeout=timeout)
+
+    # =============================================
+    # AUXILIARES
+    # =============================================
+
+    def _warm_up(self):
+        """Genera los .gch y hace una compilación de prueba por cada hilo de compilación."""
+        self.pch.build_all()
+        warm_source = "#include <bits/stdc++.h>\nint main() { return 0; }\n"
+        return [self.compile_pool.submit(self._warm_compile, warm_source) for _ in range(self.compile_workers)]
+
+    def _warm_compile(self, source):
+        work_dir = tempfile.mkdtemp(prefix="codecoach_warm_")
+        try:
+            self._run_compiler(source, work_dir, self.pch.flags_for(source))
+        except CompilationError as e:
+            print(f"ERROR: Falló la compilación de calentamiento: {e.output[:300]}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _compiler_identity(self):
+        # La versión forma parte de la clave: actualizar g++ invalida los binarios viejos
+        try:
+            proc = subprocess.run([self.compiler, "--version"], capture_output=True, text=True, timeout=10)
+            return proc.stdout.splitlines()[0] if proc.stdout else self.compiler
+        except (OSError, subprocess.SubprocessError):
+            return self.compiler
+
+    def _validate(self, payload):
+        if not isinstance(payload, dict):
+            return {"status": "error", "message": "El cuerpo debe ser un objeto JSON."}
+        if not str(payload.get("user_code", "")).strip():
+            return {"status": "error", "message": "Falta 'user_code'."}
+        if not isinstance(payload.get("test_cases"), list):
+            return {"status": "error", "message": "Falta la lista 'test_cases'."}
+        return None
+
+    def _normalize(self, text):
+        # Ignora espacios al final de cada línea y líneas vacías al final
+        lines = [line.rstrip() for line in str(text).replace("\r\n", "\n").split("\n")]
+        while lines and not lines[-1]:
+            lines.pop()
+        return "\n".join(lines)
+
+    def _summary(self, tests, total):
+        passed = sum(1 for t in tests if t.get("passed"))
+        summary = {
+            "status": "success",
+            "passed_count": passed,
+            "total_tests": total,
+            "score": passed * self.POINTS_PER_TEST,
+            "problem_solved": total > 0 and passed == total
+        }
+        if tests:
+            summary["metrics"] = self._aggregate_metrics(tests)
+        return summary
+
+    def _aggregate_metrics(self, tests):
+        """Totales y máximos de las métricas por caso, y cuál fue el caso más lento."""
+        slowest = max(tests, key=lambda t: t.get("wall_ms", 0))
+        metrics = {
+            "total_wall_ms": round(sum(t.get("wall_ms", 0) for t in tests), 2),
+            "max_wall_ms": slowest.get("wall_ms", 0),
+            "slowest_test_id": slowest["test_id"]
+        }
+        if all("cpu_user_ms" in t for t in tests):
+            metrics["total_cpu_ms"] = round(sum(t["cpu_user_ms"] + t["cpu_sys_ms"] for t in tests), 2)
+            metrics["peak_rss_kb"] = max(t["peak_rss_kb"] for t in tests)
+        return metrics
@@ -0,0 +1,334 @@
+# Leaderboard.py
+import random
+import threading
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+from WriteBehind import WriteBehindBuffer
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [0] * level  # Posiciones que avanza cada enlace
+
+
+class RankedSkipList:
+    """
+    Skip list ordenada con anchos en los enlaces (como el sorted set de Redis).
+
+    Además de insertar y borrar en O(log n), cada enlace guarda cuántas
+    posiciones salta, así que la posición de una clave y la clave en una
+    posición también salen en O(log n), sin recorrer la lista.
+    Posiciones base 1.
+    """
+
+    MAX_LEVEL = 32
+    P = 0.25
+
+    def __init__(self, seed=None):
+        self._rng = random.Random(seed)
+        self.head = _Node(None, self.MAX_LEVEL)
+        self.level = 1
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _random_level(self):
+        level = 1
+        while level < self.MAX_LEVEL and self._rng.random() < self.P:
+            level += 1
+        return level
+
+    @classmethod
+    def from_sorted(cls, keys, seed=None):
+        """Construye la lista en O(n) a partir de claves ya ordenadas y sin repetir."""
+        skiplist = cls(seed)
+        last = [skiplist.head] * cls.MAX_LEVEL
+        last_pos = [0] * cls.MAX_LEVEL
+        pos = 0
+        for pos, key in enumerate(keys, 1):
+            level = skiplist._random_level()
+            skiplist.level = max(skiplist.level, level)
+            node = _Node(key, level)
+            for i in range(level):
+                last[i].next[i] = node
+                last[i].width[i] = pos - last_pos[i]
+                last[i] = node
+                last_pos[i] = pos
+        for i in range(skiplist.level):
+            last[i].width[i] = pos - last_pos[i]
+        skiplist.size = pos
+        return skiplist
+
+    def insert(self, key):
+        update = [None] * self.MAX_LEVEL
+        rank = [0] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            rank[i] = rank[i + 1] if i + 1 < self.level else 0
+            while x.next[i] is not None and x.next[i].key < key:
+                rank[i] += x.width[i]
+                x = x.next[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self.level:
+            for i in range(self.level, level):
+                rank[i] = 0
+                update[i] = self.head
+                self.head.width[i] = self.size
+            self.level = level
+
+        node = _Node(key, level)
+        for i in range(level):
+            node.next[i] = update[i].next[i]
+            update[i].next[i] = node
+            node.width[i] = update[i].width[i] - (rank[0] - rank[i])
+            update[i].width[i] = rank[0] - rank[i] + 1
+        for i in range(level, self.level):
+            update[i].width[i] += 1
+        self.size += 1
+
+    def remove(self, key):
+        update = [None] * self.MAX_LEVEL
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and x.next[i].key < key:
+                x = x.next[i]
+            update[i] = x
+
+        x = x.next[0]
+        if x is None or x.key != key:
+            return False
+
+        for i in range(self.level):
+            if update[i].next[i] is x:
+                update[i].width[i] += x.width[i] - 1
+                update[i].next[i] = x.next[i]
+            else:
+                update[i].width[i] -= 1
+        while self.level > 1 and self.head.next[self.level - 1] is None:
+            self.level -= 1
+        self.size -= 1
+        return True
+
+    def rank(self, key):
+        """Posición de ``key`` (1 = primera), o None si no está."""
+        rank = 0
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and x.next[i].key <= key:
+                rank += x.width[i]
+                x = x.next[i]
+            if x is not self.head and x.key == key:
+                return rank
+        return None
+
+    def _node_at(self, position):
+        traversed = 0
+        x = self.head
+        for i in reversed(range(self.level)):
+            while x.next[i] is not None and traversed + x.width[i] <= position:
+                traversed += x.width[i]
+                x = x.next[i]
+            if traversed == position:
+                return x
+        return None
+
+    def slice(self, start, count):
+        """Hasta ``count`` claves desde la posición ``start``."""
+        if start < 1 or count <= 0:
+            return []
+        x = self._node_at(start)
+        keys = []
+        while x is not None and len(keys) < count:
+            keys.append(x.key)
+            x = x.next[0]
+        return keys
+
+
+class Leaderboard:
+    """
+    Ranking global mantenido de forma incremental.
+
+    Cada cambio de puntaje (LogAccion.update_user_score) mueve al usuario en
+    la skip list, en O(log n), y actualiza su fila en la colección
+    materializada ``ranking``. Top-K y "mi posición" se responden desde
+    memoria sin reordenar a todos los usuarios.
+
+    ``load`` trae ``ranking`` ya ordenada por su índice (y la reconstruye
+    desde ``users`` si está vacía). ``sync`` trae solo las filas que otras
+    máquinas cambiaron desde la última carga, gracias al índice en ``updated_at``.
+
+    Las filas de ``ranking`` se escriben en lotes (WriteBehindBuffer): de
+    varios cambios seguidos del mismo usuario solo viaja el mayor. Los
+    puntajes solo crecen, así que cada fila se escribe con ``$max``: dos
+    sesiones del mismo usuario, o una escritura vieja que llega tarde,
+    nunca bajan ``ranking.score`` por debajo de lo que ya se registró.
+    """
+
+    COLLECTION = "ranking"
+
+    def __init__(self, collection=None, users_collection=None):
+        self.collection = collection
+        self.users_collection = users_collection
+        self._scores = {}  # nombre -> (puntaje, problemas)
+        self._list = RankedSkipList()
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self.loaded = False
+        self.writes = None
+
+        if self.collection is not None:
+            self.writes = WriteBehindBuffer(self.collection, self._ranking_op, merge=self._merge_rows,
+                                            name="ranking-writes")
+            try:
+                self.collection.create_index([("score", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)])
+                self.collection.create_index("updated_at")
+            except PyMongoError as e:
+                print(f"ERROR DB: No se pudieron crear los índices del ranking: {e}")
+
+    @classmethod
+    def from_store(cls, store):
+        """Ranking junto a la colección de usuarios de un UserStore (en memoria si no hay MongoDB)."""
+        users = getattr(store, "collection", None)
+        if users is None:
+            return cls()
+        return cls(users.database[cls.COLLECTION], users)
+
+    @staticmethod
+    def _key(nombre, score):
+        # Mayor puntaje primero; a igual puntaje, orden alfabético
+        return (-score, nombre)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._scores)
+
+    def load(self):
+        """Carga el ranking materializado completo. Devuelve la cantidad de usuarios."""
+        if self.collection is None:
+            self.loaded = True
+            return len(self)
+
+        try:
+            rows = self._read_rows()
+            if not rows and self.users_collection is not None and self._rebuild_from_users():
+                rows = self._read_rows()  # Releídas: updated_at es la hora del servidor
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo cargar el ranking: {e}")
+            return len(self)
+
+        scores = {row["_id"]: (row.get("score", 0), row.get("problems", 0)) for row in rows}
+        keys = [self._key(nombre, score) for nombre, (score, _) in scores.items()]
+        keys.sort()
+        skiplist = RankedSkipList.from_sorted(keys)
+        synced_at = max((row["updated_at"] for row in rows if row.get("updated_at")), default=None)
+
+        with self._lock:
+            self._scores = scores
+            self._list = skiplist
+            self._synced_at = synced_at
+        self.loaded = True
+        print(f"INFO: Ranking cargado con {len(scores)} usuarios")
+        return len(scores)
+
+    def _read_rows(self):
+        return list(self.collection.find({}, {"score": 1, "problems": 1, "updated_at": 1})
+                    .sort([("score", pymongo.DESCENDING), ("_id", pymongo.ASCENDING)]))
+
+    def _rebuild_from_users(self):
+        """
+        Primera vez: materializa ``ranking`` a partir de los puntajes en
+        ``users``. Devuelve cuántas filas escribió.
+        """
+        ops = [pymongo.UpdateOne({"_id": doc["nombre"]}, {
+                   # Como en _ranking_op: $max y hora del servidor, que sync compara entre máquinas
+                   "$max": {"score": doc.get("puntaje", 0), "problems": doc.get("num_ejercicios", 0)},
+                   "$currentDate": {"updated_at": True}
+               }, upsert=True)
+               for doc in self.users_collection.find({}, {"nombre": 1, "puntaje": 1, "num_ejercicios": 1})]
+        for i in range(0, len(ops), 1000):
+            self.collection.bulk_write(ops[i:i + 1000], ordered=False)
+        if ops:
+            print(f"INFO: Ranking materializado desde users ({len(ops)} usuarios)")
+        return len(ops)
+
+    def sync(self):
+        """Aplica los cambios que otras máquinas escribieron en ``ranking``. Devuelve cuántos."""
+        if self.collection is None or not self.loaded:
+            return 0
+
+        query = {"updated_at": {"$gt": self._synced_at}} if self._synced_at else {}
+        try:
+            rows = list(self.collection.find(query, {"score": 1, "problems": 1, "updated_at": 1}))
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo sincronizar el ranking: {e}")
+            return 0
+
+        for row in rows:
+            # Una escritura propia aún en el buffer puede ir por delante de la fila remota
+            self._apply(row["_id"], row.get("score", 0), row.get("problems", 0), keep_higher=True)
+            if row.get("updated_at") and (self._synced_at is None or row["updated_at"] > self._synced_at):
+                self._synced_at = row["updated_at"]
+        return len(rows)
+
+    def update(self, nombre, score, problems):
+        """Registra el puntaje actual de un usuario y lo persiste en ``ranking``."""
+        self._apply(nombre, score, problems)
+        if self.writes is not None:
+            self.writes.add(nombre, {"score": score, "problems": problems})
+
+    @staticmethod
+    def _merge_rows(old, new):
+        return {"score": max(old["score"], new["score"]), "problems": max(old["problems"], new["problems"])}
+
+    @staticmethod
+    def _ranking_op(nombre, row):
+        # $max: el valor de otra sesión más adelantada no se pisa. Hora del servidor:
+        # sync compara updated_at entre máquinas
+        return pymongo.UpdateOne({"_id": nombre}, {"$max": row, "$currentDate": {"updated_at": True}},
+                                 upsert=True)
+
+    def close(self):
+        """Escribe las filas pendientes de ``ranking``."""
+        if self.writes is not None:
+            self.writes.close()
+
+    def on_score_changed(self, user):
+        """Oyente para LogAccion: recibe el User ya actualizado."""
+        self.update(user.nombre, user.puntaje, user.num_ejercicios)
+
+    def _apply(self, nombre, score, problems, keep_higher=False):
+        with self._lock:
+            old = self._scores.get(nombre)
+            if old is not None and keep_higher:
+                score, problems = max(score, old[0]), max(problems, old[1])
+            if old is not None:
+                if old[0] == score:
+                    self._scores[nombre] = (score, problems)
+                    return
+                self._list.remove(self._key(nombre, old[0]))
+            self._list.insert(self._key(nombre, score))
+            self._scores[nombre] = (score, problems)
+
+    def top(self, k=10, start=1):
+        """Filas (posición, nombre, puntaje, problemas) desde la posición ``start``."""
+        with self._lock:
+            keys = self._list.slice(start, k)
+            return [(start + i, nombre, -neg_score, self._scores[nombre][1])
+                    for i, (neg_score, nombre) in enumerate(keys)]
+
+    def rank_of(self, nombre):
+        """(posición, puntaje, problemas) del usuario, o None si aún no puntuó."""
+        with self._lock:
+            entry = self._scores.get(nombre)
+            if entry is None:
+                return None
+            return self._list.rank(self._key(nombre, entry[0])), entry[0], entry[1]
@@ -3,7 +3,7 @@ import sys
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QLabel, QLineEdit, QPushButton,
                              QFrame, QMessageBox)
-from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve
+from PyQt5.QtCore import Qt, QPropertyAnimation, QEasingCurve, QTimer, QThreadPool
 from PyQt5.QtGui import QPalette, QColor
 
 # Importar la clase LogAccion desde PyLogic
@@ -28,13 +28,43 @@ except ImportError:
             return True
 
 
+try:
+    from BackgroundTasks import BackgroundTask
+except ImportError as e:
+    print(f"ERROR: No se pudo importar BackgroundTasks: {e}. El login bloqueará la interfaz.")
+    BackgroundTask = None
+
+try:
+    from Bootstrap import AppBootstrap
+except ImportError as e:
+    print(f"ERROR: No se pudo importar Bootstrap: {e}. El arranque será secuencial.")
+    AppBootstrap = None
+
+
 class LoginWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.main_window = None
-        self.logic = LogAccion()  # Instanciar la lógica de login
+        # Login y registro (KDF + MongoDB) corren de a uno fuera del hilo de Qt
+        self.auth_pool = QThreadPool(self)
+        self.auth_pool.setMaxThreadCount(1)
+        self._auth_task = None
+        self._auth_pending = None  # (usuario, mensaje de error)
+        self.bootstrap = AppBootstrap() if AppBootstrap is not None else None
+        # Instanciar la lógica de login (los usuarios usan la conexión del arranque)
+        if self.bootstrap is not None:
+            self.logic = LogAccion(store_factory=self.bootstrap.user_store)
+        else:
+            self.logic = LogAccion()
         self.initUI()
 
+    def showEvent(self, event):
+        """Al mostrarse el login, arranca el calentamiento en segundo plano."""
+        super().showEvent(event)
+        if self.bootstrap is not None:
+            self.bootstrap.timer.mark("login_shown")
+            self.bootstrap.start()
+
     def initUI(self):
         """Inicializa la interfaz de login"""
         self.setWindowTitle('leetAI - Iniciar Sesión')
@@ -221,13 +251,8 @@ class LoginWindow(QMainWindow):
             self.show_message("Error", "Por favor completa todos los campos")
             return
 
-        # Llamar al método signin de la lógica
-        success = self.logic.signin(username, password)
-
-        if success:
-            self.open_main_window(username)
-        else:
-            self.show_message("Error", "Usuario o contraseña incorrectos")
+        # Llamar al método signin de la lógica (en segundo plano)
+        self.run_auth(self.logic.signin, username, password, "Usuario o contraseña incorrectos")
 
     def handle_new_user(self):
         """Maneja el evento de crear usuario"""
@@ -238,28 +263,83 @@ class LoginWindow(QMainWindow):
             self.show_message("Error", "Por favor completa todos los campos")
             return
 
-        # Llamar al método new_user de la lógica
-        success = self.logic.new_user(username, password)
+        # Llamar al método new_user de la lógica (en segundo plano)
+        self.run_auth(self.logic.new_user, username, password,
+                      "No se pudo crear el usuario (puede que ya exista)")
+
+    def run_auth(self, action, username, password, error_message):
+        """
+        Ejecuta signin/new_user en un hilo trabajador: el hash de la contraseña
+        tarda a propósito y la consulta a MongoDB puede demorar, y ninguno de
+        los dos debe congelar la ventana.
+        """
+        if self._auth_task is not None:
+            return  # Ya hay un intento en curso
+
+        self._auth_pending = (username, error_message)
+        if BackgroundTask is None:
+            self.on_auth_finished(0, action(username, password))
+            return
+
+        self.set_auth_busy(True)
+        self._auth_task = BackgroundTask(0, action, username, password)
+        self._auth_task.signals.finished.connect(self.on_auth_finished)
+        self._auth_task.signals.failed.connect(self.on_auth_failed)
+        self.auth_pool.start(self._auth_task)
+
+    def on_auth_finished(self, task_id, success):
+        username, error_message = self._auth_pending
+        self._auth_task = None
+        self._auth_pending = None
+        self.set_auth_busy(False)
 
         if success:
             self.open_main_window(username)
         else:
-            self.show_message("Error", "No se pudo crear el usuario (puede que ya exista)")
+            if getattr(self.logic, "offline", False):
+                # Sin MongoDB solo existen las cuentas creadas en esta sesión
+                error_message += ("\n\nSin conexión con la base de datos: las cuentas registradas no "
+                                  "están disponibles y las nuevas solo duran esta sesión.")
+            self.show_message("Error", error_message)
+
+    def on_auth_failed(self, task_id, error):
+        print(f"ERROR: Falló la autenticación: {error}")
+        self._auth_task = None
+        self._auth_pending = None
+        self.set_auth_busy(False)
+        self.show_message("Error", f"No se pudo completar la operación: {error}")
+
+    def set_auth_busy(self, busy):
+        """Bloquea el formulario mientras se verifica (evita envíos dobles)."""
+        for widget in (self.user_input, self.password_input, self.login_btn, self.create_btn):
+            widget.setEnabled(not busy)
+        self.login_btn.setText("Verificando..." if busy else "Sign In")
 
     def open_main_window(self, username):
         """Abre la ventana principal y cierra el login"""
         try:
             from AuxCreator import ModernMainWindow
 
-            # Crear y mostrar ventana principal
-            self.main_window = ModernMainWindow()
+            # Crear y mostrar ventana principal con los objetos ya calentados
+            if self.bootstrap is not None:
+                self.bootstrap.timer.mark("credentials_accepted")
+                warmed = self.bootstrap.warmed_objects()
+                with self.bootstrap.timer.phase("main_window_build"):
+                    self.main_window = ModernMainWindow(logic=self.logic, **warmed)
+            else:
+                self.main_window = ModernMainWindow(logic=self.logic)
 
             # Configurar el usuario loggeado
             from PyLogic import User
-            self.main_window.logged_in_user = User(nombre=username, contrasena="")
+            user = self.logic.get_user(username) if hasattr(self.logic, "get_user") else None
+            self.main_window.logged_in_user = user or User(nombre=username, contrasena="")
 
             self.main_window.show()
 
+            # Primera vuelta del event loop tras mostrar = interactivo
+            if self.bootstrap is not None:
+                QTimer.singleShot(0, self.bootstrap.finish)
+
             # Cerrar ventana de login
             self.close()
 
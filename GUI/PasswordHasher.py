@@ -0,0 +1,123 @@
+# PasswordHasher.py
+import base64
+import hashlib
+import hmac
+import json
+import os
+
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _unb64(text):
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+class PasswordHasher:
+    """
+    Hash de contraseñas con sal y costo ajustable (scrypt, o PBKDF2-SHA256 si
+    el Python no trae scrypt).
+
+    Formatos guardados en ``contrasena``:
+        scrypt$<n>$<r>$<p>$<sal>$<hash>
+        pbkdf2_sha256$<iteraciones>$<sal>$<hash>
+
+    Los parámetros viajan con cada hash, así que subir el costo no invalida
+    los anteriores: ``verify`` indica cuándo conviene volver a calcularlo.
+    Un valor sin formato conocido se trata como contraseña en texto plano
+    heredada (se compara en tiempo constante y se pide rehash).
+
+    El costo por defecto se lee de ``~/.codecoach/kdf.json``, que escribe
+    ``bench_kdf.py --save`` tras medir este equipo.
+    """
+
+    CONFIG_FILE = "kdf.json"
+    SALT_BYTES = 16
+    HASH_BYTES = 32
+    DEFAULT_SCRYPT = {"n": 2 ** 14, "r": 8, "p": 1}
+    DEFAULT_PBKDF2_ITERATIONS = 600000
+
+    def __init__(self, algorithm=None, n=None, r=None, p=None, iterations=None):
+        if algorithm is None:
+            algorithm = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+        if algorithm == "scrypt" and not hasattr(hashlib, "scrypt"):
+            print("ERROR: Este Python no tiene hashlib.scrypt; se usará PBKDF2.")
+            algorithm = "pbkdf2_sha256"
+
+        self.algorithm = algorithm
+        self.n = n or self.DEFAULT_SCRYPT["n"]
+        self.r = r or self.DEFAULT_SCRYPT["r"]
+        self.p = p or self.DEFAULT_SCRYPT["p"]
+        self.iterations = iterations or self.DEFAULT_PBKDF2_ITERATIONS
+
+    @classmethod
+    def config_path(cls):
+        base = os.environ.get("CODECOACH_HOME") or os.path.join(os.path.expanduser("~"), ".codecoach")
+        return os.path.join(base, cls.CONFIG_FILE)
+
+    @classmethod
+    def from_config(cls, path=None):
+        """Hasher con el costo guardado por bench_kdf.py (o los valores por defecto)."""
+        try:
+            with open(path or cls.config_path(), encoding="utf-8") as f:
+                return cls(**json.load(f))
+        except FileNotFoundError:
+            return cls()
+        except (ValueError, TypeError) as e:
+            print(f"ERROR: Configuración de KDF inválida, se usan los valores por defecto: {e}")
+            return cls()
+
+    def save_config(self, path=None):
+        path = path or self.config_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.params(), f, indent=2)
+        return path
+
+    def params(self):
+        if self.algorithm == "scrypt":
+            return {"algorithm": "scrypt", "n": self.n, "r": self.r, "p": self.p}
+        return {"algorithm": self.algorithm, "iterations": self.iterations}
+
+    def hash(self, password):
+        salt = os.urandom(self.SALT_BYTES)
+        if self.algorithm == "scrypt":
+            digest = self._scrypt(password, salt, self.n, self.r, self.p)
+            return f"scrypt${self.n}${self.r}${self.p}${_b64(salt)}${_b64(digest)}"
+        digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, self.iterations, self.HASH_BYTES)
+        return f"pbkdf2_sha256${self.iterations}${_b64(salt)}${_b64(digest)}"
+
+    def verify(self, password, stored):
+        """
+        Devuelve (coincide, necesita_rehash). El rehash se pide si el valor
+        guardado es texto plano heredado o usa otro algoritmo/costo.
+        """
+        stored = stored or ""
+        parts = stored.split("$")
+        try:
+            if parts[0] == "scrypt" and len(parts) == 6:
+                n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+                expected = _unb64(parts[5])
+                digest = self._scrypt(password, _unb64(parts[4]), n, r, p, len(expected))
+                outdated = self.algorithm != "scrypt" or (n, r, p) != (self.n, self.r, self.p)
+                return hmac.compare_digest(digest, expected), outdated
+            if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+                iterations = int(parts[1])
+                expected = _unb64(parts[3])
+                digest = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), _unb64(parts[2]),
+                                             iterations, len(expected))
+                outdated = self.algorithm != "pbkdf2_sha256" or iterations != self.iterations
+                return hmac.compare_digest(digest, expected), outdated
+        except (ValueError, TypeError) as e:
+            print(f"ERROR: Hash de contraseña corrupto: {e}")
+            return False, False
+
+        # Texto plano de versiones anteriores
+        matches = hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        return matches, True
+
+    def _scrypt(self, password, salt, n, r, p, dklen=None):
+        # maxmem por defecto (32 MB) no alcanza desde n=2^15 con r=8
+        return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                              maxmem=256 * n * r * p, dklen=dklen or self.HASH_BYTES)
@@ -0,0 +1,25 @@
+# PerfStats.py
+import math
+
+
+def summarize_latencies(samples_ms):
+    """Resume una lista de latencias (ms): cantidad, media y percentiles p50/p95/p99."""
+    if not samples_ms:
+        return {"count": 0}
+
+    ordered = sorted(samples_ms)
+
+    def percentile(p):
+        # Rango más cercano: el valor por debajo del cual queda el p% de las muestras
+        rank = max(0, min(len(ordered) - 1, math.ceil(p / 100 * len(ordered)) - 1))
+        return round(ordered[rank], 2)
+
+    return {
+        "count": len(ordered),
+        "min": round(ordered[0], 2),
+        "mean": round(sum(ordered) / len(ordered), 2),
+        "p50": percentile(50),
+        "p95": percentile(95),
+        "p99": percentile(99),
+        "max": round(ordered[-1], 2)
+    }
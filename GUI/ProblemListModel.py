@@ -0,0 +1,110 @@
+# ProblemListModel.py
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+class ProblemListModel(QAbstractListModel):
+    """
+    Modelo de la lista de problemas de la barra lateral, cargado por páginas.
+
+    ``fetch_page(cursor, limit)`` debe devolver ``(entradas, siguiente_cursor)``
+    con entradas ``(texto, _id)``; un cursor None indica que no hay más páginas.
+    La vista pide más filas (canFetchMore/fetchMore) solo cuando el usuario se
+    acerca al final, así que nunca se crean filas para todo el catálogo.
+
+    ``set_filter`` muestra resultados de búsqueda en lugar de las páginas;
+    ``clear_filter`` devuelve la lista paginada tal como estaba.
+    """
+
+    ProblemIdRole = Qt.UserRole
+
+    def __init__(self, fetch_page=None, page_size=200, parent=None):
+        super().__init__(parent)
+        self.fetch_page = fetch_page
+        self.page_size = page_size
+        self._rows = []  # (texto, _id)
+        self._cursor = None
+        self._exhausted = fetch_page is None
+        self._unfiltered = None  # (filas, cursor, agotado) de la lista paginada mientras hay filtro
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._rows):
+            return None
+
+        label, problem_id = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return label
+        if role == self.ProblemIdRole:
+            return problem_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        entries, next_cursor = self.fetch_page(self._cursor, self.page_size)
+        self._append(entries, next_cursor)
+
+    def seed(self, entries, next_cursor):
+        """Carga una primera página ya obtenida (por ejemplo, precargada en el arranque)."""
+        self.beginResetModel()
+        self._rows = []
+        self._cursor = None
+        self._exhausted = False
+        self._unfiltered = None
+        self.endResetModel()
+        self._append(entries, next_cursor)
+
+    def set_static_entries(self, entries):
+        """Reemplaza el contenido por una lista fija, sin paginación."""
+        self.beginResetModel()
+        self._rows = list(entries)
+        self._cursor = None
+        self._exhausted = True
+        self._unfiltered = None
+        self.endResetModel()
+
+    def set_filter(self, entries):
+        """Muestra solo ``entries`` (resultados de búsqueda), conservando la lista paginada."""
+        self.beginResetModel()
+        if self._unfiltered is None:
+            self._unfiltered = (self._rows, self._cursor, self._exhausted)
+        self._rows = list(entries)
+        self._cursor = None
+        self._exhausted = True
+        self.endResetModel()
+
+    def clear_filter(self):
+        if self._unfiltered is None:
+            return
+        self.beginResetModel()
+        self._rows, self._cursor, self._exhausted = self._unfiltered
+        self._unfiltered = None
+        self.endResetModel()
+
+    def is_filtered(self):
+        return self._unfiltered is not None
+
+    def problem_id(self, row):
+        if 0 <= row < len(self._rows):
+            return self._rows[row][1]
+        return None
+
+    def _append(self, entries, next_cursor):
+        if entries:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(entries) - 1)
+            self._rows.extend(entries)
+            self.endInsertRows()
+
+        self._cursor = next_cursor
+        self._exhausted = next_cursor is None
@@ -0,0 +1,260 @@
+# ProblemMirror.py
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+import pymongo
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def _mirror_dir():
+    """Directorio local (mismo criterio que la GUI: CODECOACH_HOME o ~/.codecoach)."""
+    path = os.environ.get("CODECOACH_HOME") or os.path.join(os.path.expanduser("~"), ".codecoach")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ProblemMirror:
+    """
+    Copia local (SQLite) de la colección ``problems``.
+
+    Guarda cada documento completo más las columnas que usa la barra lateral,
+    así que sin MongoDB la app muestra el catálogo real y abre cualquier
+    problema. ``sync`` es incremental: trae solo los documentos con ``_id``
+    o ``updated_at`` posteriores a la última sincronización (ambos campos
+    tienen índice) y, si los conteos no cuadran, borra los que ya no existen
+    comparando solo los _id. Como en ProblemCatalog, las ediciones se
+    detectan únicamente si quien las hace actualiza ``updated_at``. Esa
+    marca se compara con ``$gte``: una edición con el mismo instante que la
+    última vista no se pierde, y lo que vuelve sin cambios no se reescribe.
+    La marca de ``_id`` se guarda con su tipo (ObjectId, entero o texto)
+    para que la consulta compare contra el mismo tipo que hay en la colección.
+
+    Una conexión compartida con un lock: la usan el hilo de la interfaz y
+    los de precarga/sincronización de DatabaseHandler. ``on_change`` de
+    ``sync`` recibe lo que cambió, lote por lote, para mantener al día
+    estructuras derivadas (el índice de búsqueda) sin releer el espejo.
+    """
+
+    FILE_TEMPLATE = "problem_mirror_{db}.sqlite3"
+    BATCH = 1000
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS problems (
+                    id TEXT PRIMARY KEY,
+                    title TEXT,
+                    difficulty TEXT,
+                    category TEXT,
+                    doc TEXT NOT NULL
+                )""")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS problems_title ON problems (title)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+    @classmethod
+    def open(cls, db_name, directory=None):
+        """Espejo de la base ``db_name`` (uno por base, como la caché del catálogo)."""
+        path = os.path.join(directory or _mirror_dir(), cls.FILE_TEMPLATE.format(db=db_name))
+        try:
+            return cls(path)
+        except sqlite3.Error as e:
+            print(f"ERROR: No se pudo abrir el espejo local de problemas: {e}")
+            return None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM problems").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---------- lectura ----------
+
+    def page(self, after_id=None, limit=200):
+        """Problemas (dicts del catálogo) con id mayor que ``after_id``, en orden de _id."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, title, difficulty, category FROM problems WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id or "", limit)).fetchall()
+        return [{"_id": row[0], "title": row[1], "difficulty": row[2], "category": row[3]} for row in rows]
+
+    def catalog(self):
+        return self.page(limit=-1)  # LIMIT -1: sin límite en SQLite
+
+    def get(self, problem_id):
+        """Documento completo por _id (str), o None."""
+        return self._one("SELECT doc FROM problems WHERE id = ?", (str(problem_id),))
+
+    def find_by_title(self, title):
+        return self._one("SELECT doc FROM problems WHERE title = ? ORDER BY id LIMIT 1", (title,))
+
+    def find(self, query):
+        """Resuelve las consultas que hace DatabaseHandler (por _id o por título)."""
+        if "_id" in query:
+            return self.get(query["_id"])
+        if "title" in query:
+            return self.find_by_title(query["title"])
+        return None
+
+    def documents(self):
+        """Todos los documentos completos (para indexar texto sin tocar MongoDB)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT doc FROM problems ORDER BY id").fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def _one(self, sql, params):
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ---------- sincronización ----------
+
+    def _meta(self, key):
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _encode_id(value):
+        """(texto, tipo) para guardar la marca de _id en ``meta``."""
+        if isinstance(value, ObjectId):
+            return str(value), "objectid"
+        if isinstance(value, int) and not isinstance(value, bool):
+            return str(value), "int"
+        return str(value), "str"
+
+    @staticmethod
+    def _decode_id(text, kind):
+        """Inversa de _encode_id. Sin tipo (espejos viejos): ObjectId si es válido, si no el texto."""
+        if kind == "int":
+            return int(text)
+        if kind == "str":
+            return text
+        try:
+            return ObjectId(text)
+        except InvalidId:
+            return text
+
+    def _last_id(self):
+        text = self._meta("last_id")
+        return None if text is None else self._decode_id(text, self._meta("last_id_type"))
+
+    def sync(self, collection, on_change=None):
+        """
+        Trae de ``collection`` lo nuevo o modificado desde la última vez y
+        quita lo borrado. Devuelve (actualizados, borrados).
+        ``on_change(documentos, ids_borrados)`` se llama tras cada lote guardado.
+        """
+        with self._lock:
+            last_id = self._last_id()
+            last_updated = self._meta("last_updated_at")
+
+        conditions = []
+        if last_id is not None:
+            conditions.append({"_id": {"$gt": last_id}})
+        watermark = datetime.fromisoformat(last_updated) if last_updated else None
+        if watermark is not None:
+            # $gte: otra edición en el mismo milisegundo que la última vista también entra
+            conditions.append({"updated_at": {"$gte": watermark}})
+        query = {"$or": conditions} if last_id is not None else {}
+
+        updated = 0
+        newest_update = None
+        batch = []
+        for doc in collection.find(query).sort("_id", pymongo.ASCENDING):
+            updated_at = doc.get("updated_at")
+            if isinstance(updated_at, datetime):
+                newest_update = max(newest_update or updated_at, updated_at)
+            if watermark is not None and updated_at == watermark and self._unchanged(doc):
+                continue  # Lo del instante de la marca vuelve en cada sync; si no cambió, se omite
+            batch.append(doc)
+            if len(batch) >= self.BATCH:
+                updated += self._upsert(batch, on_change)
+                batch = []
+        updated += self._upsert(batch, on_change)
+
+        # La marca de updated_at avanza solo tras recorrer todo: si el cursor se corta a
+        # mitad, una edición más vieja en un lote no leído no queda por detrás de la marca
+        if newest_update is not None:
+            with self._lock, self._conn:
+                last_updated = self._meta("last_updated_at")
+                if last_updated is None or newest_update > datetime.fromisoformat(last_updated):
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('last_updated_at', ?)",
+                                       (newest_update.isoformat(),))
+
+        removed = 0
+        # Conteo de metadatos: barato, y solo si no cuadra se comparan los _id
+        if collection.estimated_document_count() != len(self):
+            removed = self._remove_missing(collection, on_change)
+
+        if updated or removed:
+            print(f"INFO: Espejo local de problemas sincronizado: {updated} actualizados, {removed} borrados")
+        return updated, removed
+
+    @staticmethod
+    def _serialize(doc):
+        doc = dict(doc, _id=str(doc["_id"]))
+        return doc, json.dumps(doc, default=str, ensure_ascii=False)
+
+    def _unchanged(self, doc):
+        _, text = self._serialize(doc)
+        with self._lock:
+            row = self._conn.execute("SELECT doc FROM problems WHERE id = ?", (str(doc["_id"]),)).fetchone()
+        return row is not None and row[0] == text
+
+    def _upsert(self, docs, on_change=None):
+        if not docs:
+            return 0
+
+        rows = []
+        stored = []
+        # El lote viene ordenado por _id: el último es el mayor, con su tipo nativo
+        newest_id = docs[-1]["_id"]
+        for doc in docs:
+            doc, text = self._serialize(doc)
+            stored.append(doc)
+            rows.append((doc["_id"], doc.get("title"), doc.get("difficulty"), doc.get("category"), text))
+
+        with self._lock, self._conn:  # Una transacción por lote
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO problems (id, title, difficulty, category, doc) VALUES (?, ?, ?, ?, ?)",
+                rows)
+            # La marca de _id solo avanza: un lote de ediciones viejas no la hace retroceder
+            if self._advances(self._last_id(), newest_id):
+                text, kind = self._encode_id(newest_id)
+                self._conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                                       [("last_id", text), ("last_id_type", kind)])
+        if on_change is not None:
+            on_change(stored, [])
+        return len(rows)
+
+    @staticmethod
+    def _advances(last_id, new_id):
+        if last_id is None:
+            return True
+        try:
+            return new_id > last_id
+        except TypeError:
+            # Tipos distintos: MongoDB compara por tipo primero, así que un
+            # _id de otro tipo no mueve la marca (igual llega por updated_at)
+            return False
+
+    def _remove_missing(self, collection, on_change=None):
+        remote = {str(doc["_id"]) for doc in collection.find({}, {"_id": 1})}
+        with self._lock:
+            local = [row[0] for row in self._conn.execute("SELECT id FROM problems")]
+        missing = [(problem_id,) for problem_id in local if problem_id not in remote]
+        if missing:
+            with self._lock, self._conn:
+                self._conn.executemany("DELETE FROM problems WHERE id = ?", missing)
+            if on_change is not None:
+                on_change([], [problem_id for problem_id, in missing])
+        return len(missing)
@@ -0,0 +1,239 @@
+# ProblemSearchIndex.py
+import heapq
+import re
+import sys
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+
+_TOKEN = re.compile(r"\w+")
+_COMBINING = re.compile(r"[\u0300-\u036f]")
+
+
+def fold(text):
+    """Minúsculas y sin tildes: "Árboles" y "arboles" son el mismo término."""
+    text = str(text or "").lower()
+    if text.isascii():
+        return text
+    return _COMBINING.sub("", unicodedata.normalize("NFKD", text))
+
+
+def tokenize(text):
+    return _TOKEN.findall(fold(text))
+
+
+def _has_prefix(terms, prefix):
+    """``terms`` es una tupla ordenada: basta mirar el primer término >= prefix."""
+    i = bisect_left(terms, prefix)
+    return i < len(terms) and terms[i].startswith(prefix)
+
+
+class _Postings:
+    """
+    Término -> documentos que lo contienen (array ordenado, 4 bytes por
+    entrada), con los términos ordenados para buscar por prefijo.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.terms = []  # Ordenada: los términos con un prefijo forman un rango contiguo
+
+    def build(self, doc_terms):
+        """``doc_terms``: pares (número, términos) en orden creciente de número."""
+        postings = {}
+        for doc, terms in doc_terms:
+            for term in terms:
+                docs = postings.get(term)
+                if docs is None:
+                    postings[term] = docs = array("I")
+                docs.append(doc)  # Los números llegan en orden: el array queda ordenado
+        self.postings = postings
+        self.terms = sorted(postings)
+
+    def add(self, doc, terms):
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is None:
+                self.postings[term] = array("I", (doc,))
+                insort(self.terms, term)
+            elif docs[-1] < doc:
+                docs.append(doc)
+            else:
+                insort(docs, doc)
+
+    def remove(self, doc, terms):
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is None:
+                continue
+            i = bisect_left(docs, doc)
+            if i < len(docs) and docs[i] == doc:
+                del docs[i]
+            if not docs:
+                del self.postings[term]
+                del self.terms[bisect_left(self.terms, term)]
+
+    def prefix(self, prefix):
+        """Listas de documentos de cada término que empieza con ``prefix``."""
+        start = bisect_left(self.terms, prefix)
+        end = bisect_left(self.terms, prefix + "\uffff", start)
+        postings = self.postings
+        return [postings[term] for term in self.terms[start:end]]
+
+
+class ProblemSearchIndex:
+    """
+    Índice invertido en memoria para filtrar problemas mientras se escribe.
+
+    Título, categoría y dificultad van a un índice y el enunciado a otro.
+    Cada palabra de la consulta se busca como prefijo (bisect sobre los
+    términos ordenados). El enunciado solo se consulta con prefijos de
+    ``MIN_TEXT_PREFIX`` letras o más: con una o dos letras coincide casi
+    todo el vocabulario.
+
+    Según cuántas entradas suman los términos de cada palabra:
+      * hasta ``MAX_SET_POSTINGS``, se convierten en conjuntos y se
+        intersectan (en C: unos milisegundos como mucho);
+      * las muy frecuentes ("de", "suma") no: se recorren los candidatos en
+        orden, comprobándolas con bisect sobre los términos (ordenados) de
+        cada documento, y se corta al juntar ``limit`` resultados;
+      * si todas son frecuentes, los candidatos son el catálogo entero.
+
+    Los resultados salen en orden de catálogo. ``add``/``remove`` actualizan
+    el índice sin reconstruirlo.
+    """
+
+    MIN_TEXT_PREFIX = 3
+    MAX_SET_POSTINGS = 30000
+    TEXT_FIELD = "statement"
+    FIELDS = ("title", "category", "difficulty")
+
+    def __init__(self, label_fn=None):
+        self.label_fn = label_fn or (lambda problem: problem.get("title", ""))
+        self._fields = _Postings()
+        self._text = _Postings()
+        # Número interno -> ((texto, _id), términos de campos, términos de enunciado), los
+        # términos en tuplas ordenadas. Los números siguen el orden del catálogo, así que
+        # ordenar resultados es ordenar enteros
+        self._docs = {}
+        self._numbers = {}  # _id -> número interno
+        self._next = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _entry(self, problem):
+        problem_id = str(problem["_id"])
+        field_terms = set()
+        for field in self.FIELDS:
+            field_terms.update(tokenize(problem.get(field)))
+        text_terms = set(tokenize(problem.get(self.TEXT_FIELD)))
+        # intern: un término que aparece en miles de enunciados se guarda una sola vez
+        return problem_id, ((self.label_fn(problem), problem_id),
+                            tuple(sorted(map(sys.intern, field_terms))),
+                            tuple(sorted(map(sys.intern, text_terms))))
+
+    def build(self, problems):
+        """Construye el índice completo (``problems`` en orden de catálogo)."""
+        docs = {}
+        numbers = {}
+        for number, problem in enumerate(problems):
+            problem_id, docs[number] = self._entry(problem)
+            numbers[problem_id] = number
+
+        fields, text = _Postings(), _Postings()
+        fields.build((number, doc[1]) for number, doc in docs.items())
+        text.build((number, doc[2]) for number, doc in docs.items())
+
+        with self._lock:
+            self._fields, self._text = fields, text
+            self._docs, self._numbers = docs, numbers
+            self._next = len(docs)
+        return len(docs)
+
+    def add(self, problem):
+        """Agrega o reemplaza un problema."""
+        problem_id, doc = self._entry(problem)
+        with self._lock:
+            number = self._numbers.get(problem_id)
+            if number is not None:
+                self._remove_locked(problem_id)  # Una edición conserva su lugar en el orden
+            else:
+                number = self._next  # Los _id nuevos son posteriores: van al final
+                self._next += 1
+            self._docs[number] = doc
+            self._numbers[problem_id] = number
+            self._fields.add(number, doc[1])
+            self._text.add(number, doc[2])
+
+    def remove(self, problem_id):
+        with self._lock:
+            return self._remove_locked(str(problem_id))
+
+    def _remove_locked(self, problem_id):
+        number = self._numbers.pop(problem_id, None)
+        if number is None:
+            return False
+        _, field_terms, text_terms = self._docs.pop(number)
+        self._fields.remove(number, field_terms)
+        self._text.remove(number, text_terms)
+        return True
+
+    def search(self, query, limit=500):
+        """
+        Entradas ``(texto, _id)`` que contienen todas las palabras de la
+        consulta (como prefijo), en orden de catálogo. Una consulta vacía no
+        devuelve nada.
+        """
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        with self._lock:
+            selective = []
+            dense = []
+            for token in tokens:
+                lists = self._fields.prefix(token)
+                if len(token) >= self.MIN_TEXT_PREFIX:
+                    lists += self._text.prefix(token)
+                size = sum(map(len, lists))  # Cota superior: un documento puede repetirse
+                if not size:
+                    return []
+                if size <= self.MAX_SET_POSTINGS:
+                    selective.append((size, lists))
+                else:
+                    dense.append(token)
+
+            if selective:
+                selective.sort(key=lambda item: item[0])
+                matches = set().union(*selective[0][1])
+                for _, lists in selective[1:]:
+                    matches.intersection_update(set().union(*lists))
+                    if not matches:
+                        return []
+                if not dense:
+                    ranked = heapq.nsmallest(limit, matches)
+                    return [self._docs[doc][0] for doc in ranked]
+                candidates = sorted(matches)
+            else:
+                candidates = range(self._next)  # Con huecos de los borrados
+
+            ranked = []
+            docs = self._docs
+            for doc in candidates:
+                if doc in docs and self._matches(doc, dense):
+                    ranked.append(doc)
+                    if len(ranked) >= limit:
+                        break
+
+            return [self._docs[doc][0] for doc in ranked]
+
+    def _matches(self, doc, tokens):
+        _, field_terms, text_terms = self._docs[doc]
+        for token in tokens:
+            if not (_has_prefix(field_terms, token)
+                    or len(token) >= self.MIN_TEXT_PREFIX and _has_prefix(text_terms, token)):
+                return False
+        return True
@@ -1,8 +1,25 @@
 # PyLogic.py
+import json
+import os
 import sys
+import socket
+import threading
+import time
+import uuid
+from bisect import bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import requests
-from pymongo.errors import ServerSelectionTimeoutError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from pymongo.errors import ServerSelectionTimeoutError, DuplicateKeyError, BulkWriteError, PyMongoError
 import pymongo
+from bson import ObjectId
+from bson.errors import InvalidId
+from PerfStats import summarize_latencies
+from PasswordHasher import PasswordHasher
+from WriteBehind import WriteBehindBuffer
+from ProblemMirror import ProblemMirror
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QHBoxLayout, QGridLayout, QTabWidget, QTextEdit,
                              QListWidget, QLabel, QPushButton, QSplitter,
@@ -11,6 +28,42 @@ from PyQt5.QtCore import Qt, QSize, QPropertyAnimation, QEasingCurve, pyqtProper
 from PyQt5.QtGui import QFont, QPalette, QColor, QIcon, QFontDatabase
 
 
+def get_app_data_dir():
+    """
+    Devuelve (y crea si hace falta) el directorio local de datos de la aplicación.
+    Se puede cambiar con la variable de entorno CODECOACH_HOME.
+    """
+    path = os.environ.get("CODECOACH_HOME") or os.path.join(os.path.expanduser("~"), ".codecoach")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def resolve_server_base_url(port=5000):
+    """
+    Determina la URL del servidor C++.
+
+    Usa CPP_SERVER_URL si está definida (docker-compose la define); si no,
+    intenta resolver el servicio de Docker y cae a localhost. La resolución DNS
+    es bloqueante, por eso el arranque la ejecuta en segundo plano.
+    """
+    env_url = os.environ.get("CPP_SERVER_URL")
+    if env_url:
+        return env_url.rstrip("/")
+
+    # En Docker, usar el nombre del servicio; localmente, localhost
+    docker_host = "cpp-server"  # Nombre del servicio en docker-compose
+    local_host = "localhost"
+
+    try:
+        socket.gethostbyname(docker_host)
+        base_url = f"http://{docker_host}:{port}"
+        print(f"✅ Conectando al servidor C++ en Docker: {base_url}")
+    except socket.gaierror:
+        base_url = f"http://{local_host}:{port}"
+        print(f"⚠️  Conectando al servidor C++ local: {base_url}")
+    return base_url
+
+
 class User:
     """
     Clase que representa a un usuario de la plataforma leetAI.
@@ -22,16 +75,31 @@ class User:
 
         Args:
             nombre (str): Nombre del usuario
-            contrasena (str): Contraseña del usuario
+            contrasena (str): Hash de la contraseña (formato de PasswordHasher)
             puntaje (int): Puntaje acumulado del usuario (por defecto 0)
             num_ejercicios (int): Número de ejercicios resueltos (por defecto 0)
             exercise_list (list): Lista de ejercicios completados (por defecto lista vacía)
+
+        ``exercise_list`` conserva el orden para guardarlo; las consultas de
+        pertenencia usan un set paralelo (ver ``add_exercise``).
         """
         self.nombre = nombre
         self.contrasena = contrasena
         self.puntaje = puntaje
         self.num_ejercicios = num_ejercicios
         self.exercise_list = exercise_list if exercise_list is not None else []
+        self._solved = set(self.exercise_list)
+
+    def has_solved(self, exercise_name):
+        return exercise_name in self._solved
+
+    def add_exercise(self, exercise_name):
+        """Registra el ejercicio en O(1). Devuelve False si ya estaba resuelto."""
+        if exercise_name in self._solved:
+            return False
+        self._solved.add(exercise_name)
+        self.exercise_list.append(exercise_name)
+        return True
 
     def __str__(self):
         """Representación en string del usuario."""
@@ -61,111 +129,579 @@ class User:
         )
 
 
+def format_problem_label(problem):
+    """Construye el texto de la barra lateral: icono de dificultad, título y dificultad."""
+    title = problem.get('title', 'Sin título')
+    difficulty = problem.get('difficulty', 'Desconocida')
+
+    # Asignar iconos según dificultad
+    if difficulty == "Fácil":
+        icon = "🟢"
+    elif difficulty == "Media":
+        icon = "🟡"
+    elif difficulty == "Difícil":
+        icon = "🔴"
+    else:
+        icon = "⚪"  # Para dificultades desconocidas
+
+    return f"{icon} {title} - {difficulty}"
+
+
+def to_object_id(problem_id):
+    """ObjectId del _id recibido como texto; si no es uno válido (_id de texto plano), el valor tal cual."""
+    try:
+        return ObjectId(problem_id)
+    except (InvalidId, TypeError):
+        return problem_id
+
+
+class ProblemCatalog:
+    """
+    Catálogo liviano de problemas para la barra lateral.
+
+    Solo trae de MongoDB los campos que la barra lateral necesita (proyección)
+    y guarda el resultado en un archivo local. Al arrancar compara una marca de
+    versión barata de la colección con la guardada; si coinciden, el catálogo
+    se lee del disco sin descargar documentos.
+
+    La marca combina el conteo estimado (metadatos, sin recorrer la colección),
+    el _id más reciente y el ``updated_at`` más reciente. Las ediciones solo se
+    detectan si quien las hace actualiza ``updated_at``.
+    """
+
+    CACHE_FILE = "problem_catalog.json"
+    PROJECTION = {"title": 1, "difficulty": 1, "category": 1}
+
+    def __init__(self, collection, cache_path=None):
+        self.collection = collection
+        self.cache_path = cache_path or os.path.join(get_app_data_dir(), self.CACHE_FILE)
+        self._snapshot = None  # (problemas, _ids ordenados) si la caché es válida
+        self._token = None
+
+        try:
+            # Sin este índice la marca de versión tendría que recorrer la colección
+            self.collection.create_index([("updated_at", pymongo.DESCENDING)])
+        except Exception as e:
+            print(f"DEBUG: No se pudo crear el índice updated_at: {e}")
+
+    @property
+    def problems(self):
+        return self._snapshot[0] if self._snapshot is not None else None
+
+    def version_token(self):
+        """Marca de versión de la colección calculada con consultas indexadas."""
+        count = self.collection.estimated_document_count()
+        newest = self.collection.find_one({}, {"_id": 1}, sort=[("_id", pymongo.DESCENDING)])
+        updated = self.collection.find_one(
+            {"updated_at": {"$exists": True}}, {"updated_at": 1},
+            sort=[("updated_at", pymongo.DESCENDING)]
+        )
+        newest_id = str(newest["_id"]) if newest else ""
+        updated_at = str(updated.get("updated_at")) if updated else ""
+        return f"{count}:{newest_id}:{updated_at}"
+
+    def revalidate(self):
+        """
+        Compara la marca de versión con la caché en disco.
+        Devuelve True si la caché es vigente (y queda cargada en memoria).
+        """
+        self._token = self.version_token()
+
+        cached = self._read_cache()
+        if cached is not None and cached.get("version") == self._token:
+            print(f"DEBUG: Catálogo vigente en caché ({len(cached['problems'])} problemas)")
+            self._set_problems(cached["problems"])
+            return True
+
+        self._snapshot = None
+        return False
+
+    def needs_refresh(self):
+        return self._token is not None and self._snapshot is None
+
+    def load(self):
+        """Devuelve el catálogo (lista de dicts), desde el disco si sigue vigente."""
+        if self.revalidate():
+            return self.problems
+        return self.refresh()
+
+    def refresh(self):
+        """Descarga el catálogo completo con proyección y reescribe la caché."""
+        print("DEBUG: Catálogo desactualizado, descargando con proyección...")
+        token = self._token or self.version_token()
+        problems = []
+        for problem in self.collection.find({}, self.PROJECTION).sort("_id", pymongo.ASCENDING):
+            problem["_id"] = str(problem["_id"])
+            problems.append(problem)
+
+        self._set_problems(problems)
+        self._write_cache(token, problems)
+        return problems
+
+    def page(self, after_id=None, limit=200):
+        """
+        Devuelve hasta ``limit`` problemas con _id mayor que ``after_id`` (paginación por cursor).
+        Si la caché es vigente se sirve de memoria; si no, con una consulta sobre el índice _id.
+        """
+        if self._token is None:
+            self.revalidate()
+
+        snapshot = self._snapshot
+        if snapshot is not None:
+            problems, ids = snapshot
+            start = bisect_right(ids, after_id) if after_id is not None else 0
+            return problems[start:start + limit]
+
+        query = {}
+        if after_id is not None:
+            query = {"_id": {"$gt": to_object_id(after_id)}}
+        page = []
+        for problem in self.collection.find(query, self.PROJECTION).sort("_id", pymongo.ASCENDING).limit(limit):
+            problem["_id"] = str(problem["_id"])
+            page.append(problem)
+        return page
+
+    def _set_problems(self, problems):
+        # Una sola asignación: quien pagina en otro hilo ve la versión vieja o la nueva, nunca una mezcla
+        self._snapshot = (problems, [problem["_id"] for problem in problems])
+
+    def invalidate(self):
+        """Borra la caché en disco; la próxima carga irá a MongoDB."""
+        self._snapshot = None
+        self._token = None
+        try:
+            os.remove(self.cache_path)
+        except FileNotFoundError:
+            pass
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"DEBUG: Caché de catálogo ilegible, se ignorará: {e}")
+            return None
+
+    def _write_cache(self, token, problems):
+        # Escritura atómica: un cierre a medias no deja un archivo corrupto
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": token, "problems": problems}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"DEBUG: No se pudo guardar la caché del catálogo: {e}")
+
+
+class ProblemDetailsCache:
+    """
+    Caché LRU de documentos completos de problemas.
+
+    Limita tanto la cantidad de entradas como los bytes aproximados (tamaño del
+    documento serializado a JSON). Es segura entre hilos porque la precarga de
+    vecinos escribe desde un hilo trabajador.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clave -> (documento, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, document):
+        size = len(json.dumps(document, default=str, ensure_ascii=False).encode("utf-8"))
+        if size > self.max_bytes:
+            return  # Un documento más grande que toda la caché no se guarda
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (document, size)
+            self._bytes += size
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def invalidate(self, key=None):
+        """Elimina una entrada, o todas si no se indica clave."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            else:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
 # PyLogic.py - CORREGIR LA CLASE DatabaseHandler
 
 class DatabaseHandler:
-    def __init__(self):
+    """
+    Acceso a los problemas en MongoDB.
+
+    Con cada conexión exitosa se sincroniza en segundo plano un espejo local
+    (ProblemMirror, SQLite). Si MongoDB no responde al arrancar, o una
+    consulta falla después, el catálogo y los problemas se sirven desde el
+    espejo (``offline``) con la misma interfaz. Un hilo propio repite la
+    sincronización cada ``MIRROR_SYNC_INTERVAL_S`` segundos, haya o no
+    ventana abierta, y sin conexión reintenta conectar cada
+    ``RECONNECT_INTERVAL_S``; al volver MongoDB deja el modo sin conexión.
+    ``close`` lo detiene.
+    """
+    DEFAULT_URI = "mongodb://localhost:27017/"
+    DEFAULT_DB = "codecoach_db"
+    MIRROR_SYNC_INTERVAL_S = 5 * 60
+    RECONNECT_INTERVAL_S = 30
+
+    def __init__(self, uri=None, db_name=None, use_mirror=True):
         self.client = None
         self.db = None
         self.problems_collection = None
-
-        MONGO_URI = "mongodb://localhost:27017/"
-        TIMEOUT_MS = 3000
-
+        self.catalog = None
+        self.problem_index = {}  # _id -> registro del catálogo
+        self.details_cache = ProblemDetailsCache()  # _id -> documento completo
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+        self._prefetching = {}  # _id -> Future de la precarga en curso
+        self._catalog_refresh_started = False
+        self._prefetch_lock = threading.Lock()
+        self.offline = False  # True: sin MongoDB, se sirve el espejo local
+        self.mirror_sync = None  # Future de la sincronización del espejo
+        self._mirror_listeners = []
+        self._closing = threading.Event()
+        self._sync_thread = None
+
+        self._uri = uri or os.environ.get("MONGO_URI", self.DEFAULT_URI)
+        self._db_name = db_name or self.DEFAULT_DB
+        self.mirror = ProblemMirror.open(self._db_name) if use_mirror else None
+
+        if not self._connect():
+            self._go_offline()
+
+        self._sync_thread = threading.Thread(target=self._periodic_sync, name="mirror-sync", daemon=True)
+        self._sync_thread.start()
+
+    def _connect(self, timeout_ms=3000):
+        """Conecta a MongoDB y prepara catálogo y espejo. False si no responde."""
+        client = None
         try:
-            self.client = pymongo.MongoClient(MONGO_URI, serverSelectionTimeoutMS=TIMEOUT_MS)
-            self.client.admin.command('ping')  # Forzar la verificación
+            client = pymongo.MongoClient(self._uri, serverSelectionTimeoutMS=timeout_ms)
+            client.admin.command('ping')  # Forzar la verificación
 
             # CAMBIAR: Usar codecoach_db en lugar de leetai_db
-            self.db = self.client["codecoach_db"]  # ← ESTA ES LA CORRECCIÓN
-            self.problems_collection = self.db["problems"]
+            db = client[self._db_name]  # ← ESTA ES LA CORRECCIÓN
+            # Otra base (p. ej. la de benchmarks) no debe pisar la caché del catálogo real
+            cache_path = None if self._db_name == self.DEFAULT_DB else os.path.join(
+                get_app_data_dir(), f"problem_catalog_{self._db_name}.json")
+            self.catalog = ProblemCatalog(db["problems"], cache_path=cache_path)
+            self.db = db
+            self.problems_collection = db["problems"]
+            self.client = client
             print("INFO: Conexión a MongoDB establecida exitosamente.")
             print(f"INFO: Base de datos: {self.db.name}, Colección: {self.problems_collection.name}")
+        except Exception as e:
+            if isinstance(e, ServerSelectionTimeoutError):
+                print("ERROR DB: Fallo de conexión a MongoDB. La aplicación continuará.")
+            else:
+                print(f"ERROR DB: Fallo inesperado: {e}")
+            if client is not None:
+                client.close()  # Sus hilos de monitoreo seguirían vivos
+            return False
 
-        except ServerSelectionTimeoutError as err:
-            print("ERROR DB: Fallo de conexión a MongoDB. La aplicación continuará.")
-            self.client = None
+        self.start_mirror_sync()
+        return True
+
+    def _go_offline(self):
+        """Sin MongoDB: usar el espejo local si alguna vez se sincronizó."""
+        if self.mirror is not None and len(self.mirror) > 0:
+            self.offline = True
+            print(f"INFO: Modo sin conexión: {len(self.mirror)} problemas desde el espejo local.")
+
+    def add_mirror_listener(self, callback):
+        """``callback(documentos, ids_borrados)`` tras cada lote que cambia el espejo."""
+        self._mirror_listeners.append(callback)
+
+    def _notify_mirror_listeners(self, upserted, removed):
+        for callback in self._mirror_listeners:
+            try:
+                callback(upserted, removed)
+            except Exception as e:
+                print(f"ERROR: Fallo al propagar cambios del espejo local: {e}")
+
+    def sync_mirror(self):
+        """Actualiza el espejo local con lo que cambió en MongoDB (incremental)."""
+        if self.mirror is None or self.problems_collection is None:
+            return None
+        try:
+            return self.mirror.sync(self.problems_collection, on_change=self._notify_mirror_listeners)
         except Exception as e:
-            print(f"ERROR DB: Fallo inesperado: {e}")
-            self.client = None
+            print(f"ERROR DB: No se pudo sincronizar el espejo local: {e}")
+            return None
 
-    def get_all_problem_titles(self):
+    def start_mirror_sync(self):
+        """Lanza sync_mirror en segundo plano, salvo que ya haya una en curso."""
+        if self.mirror is None or self.problems_collection is None:
+            return None
+        if self.mirror_sync is None or self.mirror_sync.done():
+            self.mirror_sync = self._prefetch_executor.submit(self.sync_mirror)
+        return self.mirror_sync
+
+    def _periodic_sync(self):
+        while not self._closing.wait(self.RECONNECT_INTERVAL_S if self.client is None
+                                     else self.MIRROR_SYNC_INTERVAL_S):
+            try:
+                if self.client is None:
+                    if self._connect() and self.offline:
+                        self.offline = False
+                        print("INFO: MongoDB volvió a responder; se deja el modo sin conexión.")
+                else:
+                    self.start_mirror_sync()
+            except RuntimeError:
+                break  # El executor ya se cerró
+
+    def close(self):
         """
-        Obtiene una lista de todos los títulos de problemas y su dificultad.
+        Detiene la sincronización periódica y descarta las precargas en
+        espera. El executor sigue abierto: quien comparte el handler (varias
+        ventanas en los benchmarks) puede seguir consultando.
         """
-        # VERIFICACIÓN CRÍTICA: Si no hay conexión, retornar lista vacía
-        if self.problems_collection is None:
-            print("DEBUG: problems_collection es None - sin conexión a DB")
-            return []
+        self._closing.set()
+        with self._prefetch_lock:
+            pending = list(self._prefetching.values())
+        for future in pending:
+            future.cancel()
+
+    def diagnose(self):
+        """Imprime un diagnóstico de la conexión: bases, colecciones y problemas de ejemplo."""
+        print("\n=== DIAGNÓSTICO DE BASE DE DATOS ===")
+
+        if not self.client:
+            print("❌ Cliente MongoDB no conectado")
+            if self.offline:
+                print(f"📦 Sirviendo {len(self.mirror)} problemas desde el espejo local ({self.mirror.path})")
+            return
+
+        print("✅ Cliente MongoDB conectado")
 
         try:
-            print("DEBUG: Intentando obtener problemas de la colección...")
+            # Listar todas las bases de datos
+            databases = self.client.list_database_names()
+            print(f"📊 Bases de datos disponibles: {databases}")
 
-            # Obtener todos los documentos de la colección problems
-            problems_cursor = self.problems_collection.find({})
-            problems_list = list(problems_cursor)
+            if 'codecoach_db' in databases:
+                print("✅ codecoach_db encontrada")
 
-            print(f"DEBUG: Se encontraron {len(problems_list)} problemas en la colección")
+                # Listar colecciones en codecoach_db
+                collections = self.db.list_collection_names()
+                print(f"📁 Colecciones en codecoach_db: {collections}")
 
-            formatted_list = []
-            for problem in problems_list:
-                title = problem.get('title', 'Sin título')
-                difficulty = problem.get('difficulty', 'Desconocida')
+                if 'problems' in collections:
+                    print("✅ Colección 'problems' encontrada")
 
-                print(f"DEBUG: Procesando problema - Título: {title}, Dificultad: {difficulty}")
+                    # Contar documentos en problems
+                    count = self.problems_collection.count_documents({})
+                    print(f"📄 Número de problemas en la colección: {count}")
 
-                # Asignar iconos según dificultad
-                if difficulty == "Fácil":
-                    icon = "🟢"
-                elif difficulty == "Media":
-                    icon = "🟡"
-                elif difficulty == "Difícil":
-                    icon = "🔴"
+                    # Mostrar algunos títulos como ejemplo
+                    sample_problems = self.problems_collection.find().limit(3)
+                    print("🔍 Problemas de ejemplo:")
+                    for problem in sample_problems:
+                        print(f"   - {problem.get('title', 'Sin título')}")
                 else:
-                    icon = "⚪"  # Para dificultades desconocidas
+                    print("❌ Colección 'problems' NO encontrada")
+            else:
+                print("❌ codecoach_db NO encontrada")
 
-                formatted_list.append(f"{icon} {title} - {difficulty}")
+        except Exception as e:
+            print(f"💥 Error durante diagnóstico: {e}")
 
-            print(f"DEBUG: Lista formateada: {formatted_list}")
-            return formatted_list
+        print("=== FIN DIAGNÓSTICO ===\n")
+
+    def get_all_problem_titles(self):
+        """
+        Obtiene una lista de todos los títulos de problemas y su dificultad.
+        Usa el catálogo proyectado (solo los campos de la barra lateral) con caché en disco.
+        """
+        return [label for label, _ in self.get_sidebar_entries()]
+
+    def get_sidebar_entries(self):
+        """
+        Devuelve pares (texto, _id) para la barra lateral.
+        El _id viaja con cada elemento para buscar los detalles sin reinterpretar el texto.
+        """
+        # VERIFICACIÓN CRÍTICA: Si no hay conexión ni espejo, retornar lista vacía
+        if self.catalog is None and not self.offline:
+            print("DEBUG: problems_collection es None - sin conexión a DB")
+            return []
+
+        try:
+            problems_list = self.mirror.catalog() if self.offline else self.catalog.load()
+            self.problem_index = {problem['_id']: problem for problem in problems_list}
+            print(f"DEBUG: Catálogo con {len(problems_list)} problemas")
+            return [(format_problem_label(problem), problem['_id']) for problem in problems_list]
 
         except Exception as e:
             print(f"Error al obtener títulos de problemas: {e}")
             return []
 
+    def get_sidebar_page(self, after_id=None, limit=200):
+        """
+        Devuelve una página de pares (texto, _id) y el cursor de la siguiente
+        (None cuando no quedan más). Si la caché del catálogo estaba vencida,
+        la refresca en segundo plano para el próximo arranque.
+        """
+        if self.catalog is None and not self.offline:
+            return [], None
+
+        try:
+            source = self.mirror if self.offline else self.catalog
+            problems = source.page(after_id, limit)
+        except Exception as e:
+            print(f"Error al obtener página de problemas: {e}")
+            return [], None
+
+        for problem in problems:
+            self.problem_index[problem['_id']] = problem
+
+        if not self.offline and self.catalog.needs_refresh() and not self._catalog_refresh_started:
+            self._catalog_refresh_started = True
+            self._prefetch_executor.submit(self.catalog.refresh)
+
+        next_cursor = problems[-1]['_id'] if len(problems) == limit else None
+        return [(format_problem_label(problem), problem['_id']) for problem in problems], next_cursor
+
+    def get_problem_by_id(self, problem_id):
+        """
+        Obtiene todos los detalles de un problema por su _id.
+        Consulta primero la caché LRU; si el problema se está precargando, espera esa consulta.
+        El _id puede no estar en las páginas ya cargadas (resultados del buscador): se consulta igual.
+        """
+        # VERIFICACIÓN CRÍTICA: Si no hay conexión ni espejo, retornar None
+        if self.problems_collection is None and not self.offline:
+            print("DEBUG: Sin conexión a DB en get_problem_by_id")
+            return None
+
+        cached = self.details_cache.get(problem_id)
+        if cached is not None:
+            print(f"DEBUG: Problema '{problem_id}' servido desde la caché")
+            return cached
+
+        with self._prefetch_lock:
+            pending = self._prefetching.get(problem_id)
+        if pending is not None:
+            try:
+                return pending.result(timeout=5)
+            except Exception as e:
+                print(f"DEBUG: Precarga de '{problem_id}' fallida, consultando de nuevo: {e}")
+
+        return self._fetch_problem({"_id": self._to_object_id(problem_id)})
+
     def get_problem_details(self, title):
         """
         Obtiene todos los detalles de un problema por su título.
+        Se mantiene por compatibilidad; la barra lateral usa get_problem_by_id.
         """
-        # VERIFICACIÓN CRÍTICA: Si no hay conexión, retornar None
-        if self.problems_collection is None:
+        # VERIFICACIÓN CRÍTICA: Si no hay conexión ni espejo, retornar None
+        if self.problems_collection is None and not self.offline:
             print("DEBUG: Sin conexión a DB en get_problem_details")
             return None
 
-        try:
-            print(f"DEBUG: Buscando problema con título: {title}")
+        # Limpiar el título (remover icono y dificultad si existen)
+        clean_title = title
+        if ' - ' in title:
+            clean_title = title.rsplit(' - ', 1)[0].split(' ', 1)[1]
 
-            # Limpiar el título (remover iconos y dificultad si existen)
-            clean_title = title
-            if ' - ' in title:
-                clean_title = title.split(' - ')[0].split(' ', 1)[1]  # Remover icono y dificultad
+        return self._fetch_problem({"title": clean_title})
 
-            print(f"DEBUG: Título limpio para búsqueda: '{clean_title}'")
+    def prefetch_problem_details(self, problem_ids):
+        """
+        Carga en segundo plano los problemas indicados que no estén en caché.
+        Pensado para los vecinos del problema seleccionado en la barra lateral.
+        """
+        if self.problems_collection is None and not self.offline:
+            return
 
-            problem_data = self.problems_collection.find_one({"title": clean_title})
+        for problem_id in problem_ids:
+            if problem_id is None or problem_id in self.details_cache:
+                continue
+            with self._prefetch_lock:
+                if problem_id in self._prefetching:
+                    continue
+                future = self._prefetch_executor.submit(
+                    self._fetch_problem, {"_id": self._to_object_id(problem_id)})
+                self._prefetching[problem_id] = future
+            future.add_done_callback(lambda f, pid=problem_id: self._prefetch_done(pid))
+
+    def _prefetch_done(self, problem_id):
+        with self._prefetch_lock:
+            self._prefetching.pop(problem_id, None)
+
+    def _to_object_id(self, problem_id):
+        # Los _id de la colección son ObjectId; si alguno es texto plano se usa tal cual
+        return to_object_id(problem_id)
+
+    def _fetch_problem(self, query):
+        """
+        Consulta MongoDB (o el espejo local sin conexión) y guarda el
+        resultado en la caché, indexado por _id.
+        """
+        try:
+            print(f"DEBUG: Buscando problema con: {query}")
+
+            if self.offline:
+                problem_data = self.mirror.find(query)
+            else:
+                try:
+                    problem_data = self.problems_collection.find_one(query)
+                except PyMongoError as e:
+                    if self.mirror is None:
+                        raise
+                    # MongoDB se cayó durante la sesión: este problema sale del espejo
+                    print(f"ERROR DB: {e}. Usando el espejo local.")
+                    problem_data = self.mirror.find(query)
 
             if problem_data:
                 print(f"DEBUG: Problema encontrado: {problem_data.get('title')}")
                 # Convertir ObjectId a string para serialización
-                if '_id' in problem_data:
-                    problem_data['_id'] = str(problem_data['_id'])
+                problem_data['_id'] = str(problem_data['_id'])
+                self.details_cache.put(problem_data['_id'], problem_data)
             else:
-                print(f"DEBUG: No se encontró problema con título: '{clean_title}'")
+                print(f"DEBUG: No se encontró problema con: {query}")
 
             return problem_data
 
         except Exception as e:
-            print(f"Error al obtener detalles del problema {title}: {e}")
+            print(f"Error al obtener detalles del problema {query}: {e}")
             return None
 
 class UIActions:
@@ -194,26 +730,9 @@ class UIActions:
         print(f"   - Usuario: {submission_package.get('user_name', 'N/A')}")
         print(f"   - Problema: {submission_package.get('problem_details', {}).get('title', 'N/A')}")
         
-        # Limpiar terminal y mostrar mensaje de progreso
-        self.win.terminal_output.clear()
-        self.win.terminal_output.setText("🔄 Enviando código al servidor C++...")
-        
-        try:
-            # Enviar al servidor C++
-            result = self.win.compiler_client.send_evaluation_package(submission_package)
-            
-            print(f"📨 Respuesta del servidor C++: {result.get('status', 'unknown')}")
-            
-            # Mostrar resultados en la interfaz
-            self.win.show_output(result)
-            
-        except Exception as e:
-            error_msg = f"💥 Error inesperado: {str(e)}"
-            print(error_msg)
-            self.win.show_output({
-                "status": "client_error", 
-                "message": error_msg
-            })
+        # Encolar la evaluación; el resultado llega a la ventana por señales
+        task_id = self.win.enqueue_evaluation(submission_package)
+        print(f"📨 Envío #{task_id} encolado para el servidor C++")
 
     def send_code(self):
         """Se ejecutará cuando el usuario presione 'Ejecutar'."""
@@ -233,31 +752,277 @@ class UIActions:
         print(f">>> Navegar a: {section_name}")
 
 
+class UserStore:
+    """
+    Usuarios en la colección ``users`` de MongoDB.
+
+    ``nombre`` tiene un índice único, así que buscar un usuario (iniciar
+    sesión) es una sola consulta indexada sin importar cuántos haya, y dos
+    registros simultáneos con el mismo nombre no pueden duplicarse. Los
+    cambios de puntaje se aplican en el servidor con una actualización
+    atómica (sin leer-modificar-escribir). El usuario con sesión iniciada se
+    guarda en una caché local.
+
+    Los puntajes no se escriben uno por uno: ``add_score`` actualiza el User
+    en caché y deja el cambio en un WriteBehindBuffer, que junta los de cada
+    usuario y los manda en lotes con bulk_write. Cada envío aceptado suma
+    sus puntos; ``num_ejercicios`` solo sube la primera vez que se resuelve
+    un ejercicio, tanto en la caché como en el servidor. Cada cambio lleva
+    un id propio y el servidor recuerda los últimos aplicados
+    (``applied_score_ids``), así que reaplicar un lote (un reintento tras un
+    timeout que sí llegó a escribirse) no suma dos veces.
+
+    Sin colección (MongoDB caído) los usuarios viven en memoria, como antes.
+    """
+
+    COLLECTION = "users"
+
+    def __init__(self, collection=None, flush_interval=0.5):
+        self.collection = collection
+        self._memory = {}  # nombre -> User, solo sin MongoDB
+        self._cache = {}  # nombre -> User con sesión iniciada
+        self._lock = threading.Lock()
+        self.score_writes = None
+        if self.collection is not None:
+            self.score_writes = WriteBehindBuffer(self.collection, self._score_op, merge=self._merge_scores,
+                                                  flush_interval=flush_interval, name="score-writes")
+
+        if self.collection is not None:
+            try:
+                self.collection.create_index("nombre", unique=True)
+            except Exception as e:
+                print(f"ERROR DB: No se pudo crear el índice de usuarios: {e}")
+
+    @classmethod
+    def from_database(cls, db):
+        """Store sobre ``db.users``, o en memoria si ``db`` es None."""
+        if db is None:
+            print("INFO: Sin MongoDB; los usuarios se guardarán solo en memoria.")
+            return cls(None)
+        return cls(db[cls.COLLECTION])
+
+    @classmethod
+    def connect(cls, uri=None, db_name=None, timeout_ms=3000):
+        """Conecta por su cuenta (cuando no hay un DatabaseHandler a mano)."""
+        uri = uri or os.environ.get("MONGO_URI", DatabaseHandler.DEFAULT_URI)
+        try:
+            client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=timeout_ms)
+            client.admin.command('ping')
+            return cls.from_database(client[db_name or DatabaseHandler.DEFAULT_DB])
+        except Exception as e:
+            print(f"ERROR DB: Fallo de conexión para usuarios: {e}")
+            return cls.from_database(None)
+
+    @property
+    def persistent(self):
+        return self.collection is not None
+
+    def find(self, nombre, use_cache=True):
+        """
+        Usuario por nombre, o None. Con ``use_cache`` el usuario con sesión
+        sale de la caché; el login la omite para validar contra la base.
+        """
+        with self._lock:
+            if self.collection is None:
+                return self._memory.get(nombre)
+            if use_cache and nombre in self._cache:
+                return self._cache[nombre]
+
+        try:
+            doc = self.collection.find_one({"nombre": nombre})
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo leer el usuario '{nombre}': {e}")
+            return None
+        return User.from_dict(doc) if doc else None
+
+    def insert(self, user):
+        """Crea el usuario; False si el nombre ya existe."""
+        if self.collection is None:
+            with self._lock:
+                if user.nombre in self._memory:
+                    return False
+                self._memory[user.nombre] = user
+            return True
+
+        try:
+            self.collection.insert_one(user.to_dict())
+        except DuplicateKeyError:
+            return False
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo crear el usuario '{user.nombre}': {e}")
+            return False
+        return True
+
+    def bulk_load(self, users):
+        """
+        Carga muchos usuarios de una vez (por ejemplo, la lista de un curso).
+        Los que ya existen no se tocan. Devuelve cuántos se crearon.
+        """
+        users = [u if isinstance(u, User) else User.from_dict(u) for u in users]
+        if self.collection is None:
+            return sum(1 for user in users if self.insert(user))
+        if not users:
+            return 0
+
+        ops = [pymongo.UpdateOne({"nombre": user.nombre}, {"$setOnInsert": user.to_dict()}, upsert=True)
+               for user in users]
+        try:
+            result = self.collection.bulk_write(ops, ordered=False)
+            return result.upserted_count
+        except BulkWriteError as e:
+            # Dos upserts del mismo nombre en el lote chocan con el índice único; el resto se aplicó
+            return e.details.get("nUpserted", 0)
+        except PyMongoError as e:
+            print(f"ERROR DB: Falló la carga masiva de usuarios: {e}")
+            return 0
+
+    def set_password(self, nombre, contrasena):
+        """Reemplaza el hash guardado (por ejemplo, al subir el costo del KDF)."""
+        if self.collection is None:
+            with self._lock:
+                user = self._memory.get(nombre)
+                if user is not None:
+                    user.contrasena = contrasena
+                return user is not None
+
+        try:
+            result = self.collection.update_one({"nombre": nombre}, {"$set": {"contrasena": contrasena}})
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo actualizar la contraseña de '{nombre}': {e}")
+            return False
+        with self._lock:
+            if nombre in self._cache:
+                self._cache[nombre].contrasena = contrasena
+        return result.matched_count > 0
+
+    def remember(self, user):
+        """Guarda en caché al usuario que inició sesión."""
+        with self._lock:
+            self._cache[user.nombre] = user
+
+    def forget(self, nombre):
+        with self._lock:
+            self._cache.pop(nombre, None)
+
+    APPLIED_IDS_KEPT = 200  # ids de cambios ya aplicados que se recuerdan por usuario
+
+    def add_score(self, nombre, points_earned, exercise_name):
+        """
+        Suma puntaje y registra el ejercicio. Devuelve el User actualizado o
+        None. Con MongoDB la escritura queda en ``score_writes`` y sale en el
+        siguiente lote.
+        """
+        if self.collection is None:
+            with self._lock:
+                user = self._memory.get(nombre)
+                if user is None:
+                    return None
+                user.puntaje += points_earned
+                if user.add_exercise(exercise_name):
+                    user.num_ejercicios += 1
+                return user
+
+        user = self.find(nombre)  # Normalmente sale de la caché: sin viaje a la base
+        if user is None:
+            return None
+        with self._lock:
+            user.puntaje += points_earned
+            if user.add_exercise(exercise_name):
+                user.num_ejercicios += 1
+        self.score_writes.add(nombre, ({uuid.uuid4().hex: points_earned}, {exercise_name: None}))
+        return user
+
+    @staticmethod
+    def _merge_scores(old, new):
+        # Puntos por id de cambio; ejercicios como dict ordenado sin repetidos
+        return {**old[0], **new[0]}, {**old[1], **new[1]}
+
+    @classmethod
+    def _score_op(cls, nombre, change):
+        """
+        Una actualización por usuario y lote, idempotente. Solo suman los
+        puntos de cambios cuyo id no está en ``applied_score_ids`` (que
+        guarda los últimos APPLIED_IDS_KEPT), y los ejercicios que ya estaban
+        en ``exercise_list`` no vuelven a contar en ``num_ejercicios``,
+        aunque otra sesión o un reintento los haya agregado mientras tanto.
+        """
+        points, exercises = change
+        pending = [{"id": change_id, "p": amount} for change_id, amount in points.items()]
+        fresh_points = {"$reduce": {
+            "input": {"$literal": pending},
+            "initialValue": 0,
+            "in": {"$add": ["$$value", {"$cond": [{"$in": ["$$this.id", "$_fresh"]}, "$$this.p", 0]}]}
+        }}
+        return pymongo.UpdateOne({"nombre": nombre}, [
+            {"$set": {"_new": {"$setDifference": [{"$literal": list(exercises)},
+                                                  {"$ifNull": ["$exercise_list", []]}]},
+                      "_fresh": {"$setDifference": [{"$literal": list(points)},
+                                                    {"$ifNull": ["$applied_score_ids", []]}]}}},
+            {"$set": {"puntaje": {"$add": [{"$ifNull": ["$puntaje", 0]}, fresh_points]},
+                      "num_ejercicios": {"$add": [{"$ifNull": ["$num_ejercicios", 0]}, {"$size": "$_new"}]},
+                      "exercise_list": {"$concatArrays": [{"$ifNull": ["$exercise_list", []]}, "$_new"]},
+                      "applied_score_ids": {"$slice": [
+                          {"$concatArrays": [{"$ifNull": ["$applied_score_ids", []]}, "$_fresh"]},
+                          -cls.APPLIED_IDS_KEPT]}}},
+            {"$unset": ["_new", "_fresh"]}
+        ])
+
+    def flush(self):
+        """Escribe ya los puntajes pendientes."""
+        if self.score_writes is not None:
+            self.score_writes.flush()
+
+    def close(self):
+        if self.score_writes is not None:
+            self.score_writes.close()
+
+
 class LogAccion:
     """
     Clase para manejar las acciones de login y registro de usuarios.
+
+    Los usuarios viven en un UserStore. ``store_factory`` lo entrega bajo
+    demanda (por ejemplo, AppBootstrap.user_store, que reutiliza la conexión
+    del arranque); así crear LogAccion no bloquea esperando a MongoDB.
+
+    Las contraseñas se guardan como hash con sal (PasswordHasher). El KDF es
+    lento a propósito: signin y new_user deben llamarse fuera del hilo de Qt.
     """
 
-    def __init__(self):
-        self.users = {}  # nombre -> User object
+    def __init__(self, store=None, store_factory=None, hasher=None):
+        self._store = store
+        self._store_factory = store_factory or UserStore.connect
+        self._store_lock = threading.Lock()
+        self.hasher = hasher or PasswordHasher.from_config()
+        self._score_listeners = []
+
+    def add_score_listener(self, callback):
+        """Registra ``callback(user)``, llamado con el User actualizado tras cada puntaje."""
+        self._score_listeners.append(callback)
+
+    @property
+    def store(self):
+        with self._store_lock:
+            if self._store is None:
+                self._store = self._store_factory()
+            return self._store
 
     def new_user(self, username, password):
         """Método para crear un nuevo usuario - SOLO establece nombre y contraseña."""
         print(f"=== NUEVO USUARIO ===")
         print(f"Usuario: {username}")
-        print(f"Contraseña: {password}")
-
-        if username in self.users:
-            print(f"Error: El usuario '{username}' ya existe")
-            return False
 
         new_user = User(
             nombre=username,
-            contrasena=password
+            contrasena=self.hasher.hash(password)
         )
 
-        self.users[username] = new_user
-        print(f"Usuario '{username}' creado exitosamente con la contraseña {new_user.contrasena}")
+        if not self.store.insert(new_user):
+            print(f"Error: El usuario '{username}' ya existe")
+            return False
+
+        self.store.remember(new_user)
+        print(f"Usuario '{username}' creado exitosamente")
         print(f"Datos del usuario: {new_user}")
 
         return True
@@ -266,17 +1031,29 @@ class LogAccion:
         """Método para iniciar sesión."""
         print(f"=== INICIAR SESIÓN ===")
         print(f"Usuario: {username}")
-        print(f"Contraseña: {password}")
 
-        if username not in self.users:
-            print(f"Error: El usuario '{username}' no existe")
+        user = self.store.find(username, use_cache=False)
+        if user is None:
+            # Mismo costo que un usuario real: el tiempo de respuesta no revela qué nombres existen
+            self.hasher.hash(password)
+            if self.offline:
+                print(f"Error: Sin conexión a MongoDB; '{username}' no está entre los usuarios de esta sesión")
+            else:
+                print(f"Error: El usuario '{username}' no existe")
             return False
 
-        user = self.users[username]
-        if user.contrasena != password:
+        matches, needs_rehash = self.hasher.verify(password, user.contrasena)
+        if not matches:
             print("Error: Contraseña incorrecta")
             return False
 
+        # Texto plano heredado o costo viejo: se guarda con el KDF actual
+        if needs_rehash:
+            user.contrasena = self.hasher.hash(password)
+            self.store.set_password(username, user.contrasena)
+            print(f"INFO: Contraseña de '{username}' migrada a {self.hasher.algorithm}")
+
+        self.store.remember(user)
         print(f"Login exitoso para usuario: {username}")
         print(f"Datos del usuario: {user}")
 
@@ -284,42 +1061,110 @@ class LogAccion:
 
     def get_user(self, username):
         """Obtiene un usuario por su nombre."""
-        return self.users.get(username)
+        return self.store.find(username)
 
     def update_user_score(self, username, points_earned, exercise_name):
         """Actualiza el puntaje y lista de ejercicios de un usuario."""
-        if username in self.users:
-            user = self.users[username]
-            user.puntaje += points_earned
-            user.num_ejercicios += 1
-            if exercise_name not in user.exercise_list:
-                user.exercise_list.append(exercise_name)
-            print(f"Puntaje actualizado para {username}: +{points_earned} puntos")
-            return True
-        return False
+        user = self.store.add_score(username, points_earned, exercise_name)
+        if user is None:
+            return False
+        print(f"Puntaje actualizado para {username}: +{points_earned} puntos")
+        for callback in self._score_listeners:
+            try:
+                callback(user)
+            except Exception as e:
+                print(f"ERROR: Oyente de puntaje falló: {e}")
+        return True
+
+    @property
+    def offline(self):
+        """True si MongoDB no respondió y los usuarios viven solo en memoria."""
+        with self._store_lock:
+            return self._store is not None and not self._store.persistent
+
+    def close(self):
+        """Escribe los puntajes pendientes (si el store llegó a crearse)."""
+        with self._store_lock:
+            store = self._store
+        if store is not None:
+            store.close()
 
 
 class HttpClient:
     """
-    Cliente HTTP actualizado para trabajar con Docker
+    Cliente HTTP actualizado para trabajar con Docker.
+
+    Mantiene una sesión de requests de larga vida con un pool de conexiones
+    keep-alive, así que los envíos repetidos reutilizan la misma conexión TCP.
     """
-    
-    def __init__(self, host=None, port=5000):
-        # En Docker, usar el nombre del servicio; localmente, localhost
-        docker_host = "cpp-server"  # Nombre del servicio en docker-compose
-        local_host = "localhost"
-        
-        # Determinar automáticamente si estamos en Docker
-        try:
-            import socket
-            # Intentar resolver el nombre del servicio Docker
-            socket.gethostbyname(docker_host)
-            self.BASE_URL = f"http://{docker_host}:{port}"
-            print(f"✅ Conectando al servidor C++ en Docker: {self.BASE_URL}")
-        except socket.gaierror:
-            # Fallback a localhost
-            self.BASE_URL = f"http://{local_host}:{port}"
-            print(f"⚠️  Conectando al servidor C++ local: {self.BASE_URL}")
+
+    # Códigos que indican que el servidor no procesó la solicitud
+    RETRY_STATUS_CODES = (502, 503, 504)
+    NDJSON_MIME = "application/x-ndjson"
+
+    def __init__(self, host=None, port=5000, base_url=None, pool_size=10, max_retries=3,
+                 backoff_factor=0.3, connect_timeout=3.05, read_timeout=30):
+        """
+        Args:
+            base_url (str): URL ya resuelta del servidor (evita la resolución DNS)
+            pool_size (int): Conexiones keep-alive máximas hacia el servidor
+            max_retries (int): Reintentos ante fallos de conexión (y 502/503/504 fuera de POST)
+            backoff_factor (float): Base del backoff exponencial entre reintentos
+            connect_timeout (float): Segundos para establecer la conexión
+            read_timeout (float): Segundos de espera por la respuesta
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_size = pool_size
+        self.session = self._build_session(pool_size, max_retries, backoff_factor)
+
+        self.BASE_URL = base_url or resolve_server_base_url(port)
+
+    def _build_session(self, pool_size, max_retries, backoff_factor):
+        """
+        Crea la sesión compartida con su pool de conexiones y política de reintentos.
+
+        Los errores de conexión siempre se reintentan, también en POST (la
+        solicitud nunca llegó). Los errores de lectura no, porque el servidor
+        pudo haber procesado la solicitud. Los 502/503/504 solo se reintentan
+        en métodos idempotentes: un POST con 503/504 pudo haber llegado a
+        evaluarse (o a encolarse) detrás del proxy, y repetirlo duplicaría el
+        trabajo; ese error se devuelve a quien llamó.
+        """
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=self.RETRY_STATUS_CODES,
+            allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+            raise_on_status=False
+        )
+        self.retry = retry
+
+        session = requests.Session()
+        self._mount_adapter(session, pool_size)
+        session.headers.update({"Connection": "keep-alive"})
+        return session
+
+    def _mount_adapter(self, session, pool_size):
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=self.retry)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+
+    def ensure_pool_size(self, pool_size):
+        """Agranda el pool si se van a usar más conexiones simultáneas que las previstas."""
+        if pool_size > self.pool_size:
+            self.pool_size = pool_size
+            old_adapter = self.session.get_adapter(self.BASE_URL)
+            self._mount_adapter(self.session, pool_size)
+            # El adaptador reemplazado ya no recibe solicitudes: se cierran sus conexiones
+            # ociosas (las que estén en uso se cierran al devolverse a su pool cerrado)
+            old_adapter.close()
+
+    def close(self):
+        """Cierra las conexiones abiertas del pool."""
+        self.session.close()
 
     def send(self, data: dict, endpoint: str):
         """
@@ -329,7 +1174,7 @@ class HttpClient:
         print(f"📤 Enviando a {url}")
 
         try:
-            response = requests.post(url, json=data, timeout=30)
+            response = self.session.post(url, json=data, timeout=self.timeout)
             
             if response.status_code == 200:
                 try:
@@ -351,7 +1196,74 @@ class HttpClient:
                     "details": response.text
                 }
 
-        except requests.exceptions.ConnectionError:
+        except Exception as e:
+            return self._error_result(e, url)
+
+    def send_stream(self, data: dict, endpoint: str, on_event=None, cancel_event=None):
+        """
+        Envía datos pidiendo respuesta en streaming (NDJSON, un evento JSON por línea).
+
+        Cada evento se entrega a ``on_event`` apenas llega: ``{"event": "test", "test": {...}}``
+        por caso de prueba y ``{"event": "summary", ...}`` al final. Si el servidor
+        responde con un JSON normal, se generan los mismos eventos a partir de él.
+        Devuelve el resultado completo, con la misma forma que ``send``.
+        """
+        url = self.BASE_URL + endpoint
+        print(f"📤 Enviando (streaming) a {url}")
+        on_event = on_event or (lambda event: None)
+
+        try:
+            with self.session.post(url, json=data, timeout=self.timeout, stream=True,
+                                   headers={"Accept": self.NDJSON_MIME}) as response:
+                if response.status_code != 200:
+                    print(f"❌ Error HTTP {response.status_code}: {response.text}")
+                    return {
+                        "status": "http_error",
+                        "message": f"Error HTTP {response.status_code}",
+                        "details": response.text
+                    }
+
+                if not response.headers.get("Content-Type", "").startswith(self.NDJSON_MIME):
+                    # Servidor sin streaming: un solo JSON con todos los resultados
+                    result = response.json()
+                    for test in result.get("tests", []):
+                        on_event({"event": "test", "test": test})
+                    on_event(dict(result, event="summary"))
+                    return result
+
+                tests = []
+                result = {"status": "incomplete", "message": "El servidor cerró el stream sin resumen"}
+                for line in response.iter_lines(decode_unicode=True):
+                    if cancel_event is not None and cancel_event.is_set():
+                        print("⛔ Stream cancelado por el usuario")
+                        return {"status": "cancelled", "message": "Evaluación cancelada.", "tests": tests}
+                    if not line:
+                        continue
+
+                    event = json.loads(line)
+                    on_event(event)
+                    kind = event.get("event")
+                    if kind == "test":
+                        tests.append(event.get("test", {}))
+                    elif kind in ("summary", "error"):
+                        result = {k: v for k, v in event.items() if k != "event"}
+
+                result["tests"] = tests
+                print(f"✅ Stream completo: {len(tests)} casos recibidos")
+                return result
+
+        except ValueError as e:
+            print(f"❌ Error decodificando JSON: {e}")
+            return {
+                "status": "json_error",
+                "message": f"Error decodificando respuesta: {str(e)}"
+            }
+        except Exception as e:
+            return self._error_result(e, url)
+
+    def _error_result(self, error, url):
+        """Traduce una excepción de red al diccionario de error que muestra la interfaz."""
+        if isinstance(error, requests.exceptions.ConnectionError):
             error_msg = f"❌ No se pudo conectar al servidor C++ en {url}"
             print(error_msg)
             return {
@@ -359,20 +1271,71 @@ class HttpClient:
                 "message": error_msg,
                 "suggestion": "Asegúrate de que el servidor C++ esté ejecutándose en Docker"
             }
-        except requests.exceptions.Timeout:
+        if isinstance(error, requests.exceptions.Timeout):
             error_msg = f"⏰ Timeout al conectar con el servidor C++"
             print(error_msg)
             return {
                 "status": "timeout_error",
                 "message": error_msg
             }
-        except Exception as e:
-            error_msg = f"💥 Error inesperado: {str(e)}"
-            print(error_msg)
-            return {
-                "status": "unexpected_error",
-                "message": error_msg
-            }
+        error_msg = f"💥 Error inesperado: {str(error)}"
+        print(error_msg)
+        return {
+            "status": "unexpected_error",
+            "message": error_msg
+        }
+
+
+class BatchGradingReport:
+    """
+    Resultado agregado de CodeCompilerWrapper.grade_batch.
+
+    Un envío cuenta como fallo si no se pudo evaluar (red, HTTP, JSON); una
+    solución incorrecta es un resultado válido y no cuenta como fallo.
+    """
+
+    FAILURE_STATUSES = ("connection_error", "timeout_error", "http_error", "json_error",
+                        "unexpected_error", "server_error")
+
+    def __init__(self):
+        self.total = 0
+        self.failures = []  # (índice, estado, mensaje)
+        self.latencies_ms = []
+        self.elapsed_s = 0.0
+
+    def record(self, index, result, latency_ms):
+        self.total += 1
+        if latency_ms is not None:
+            self.latencies_ms.append(latency_ms)
+        status = result.get("status", "unknown")
+        if status in self.FAILURE_STATUSES:
+            self.failures.append((index, status, result.get("message", "")))
+
+    @property
+    def succeeded(self):
+        return self.total - len(self.failures)
+
+    @property
+    def throughput(self):
+        """Envíos evaluados por segundo."""
+        return self.total / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def as_dict(self):
+        return {
+            "total": self.total,
+            "succeeded": self.succeeded,
+            "failed": len(self.failures),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput_per_s": round(self.throughput, 2),
+            "latency_ms": summarize_latencies(self.latencies_ms),
+            "failures": self.failures
+        }
+
+    def summary_line(self):
+        latency = summarize_latencies(self.latencies_ms)
+        return (f"{self.total} envíos, {len(self.failures)} fallos, "
+                f"{self.throughput:.2f} envíos/s, p50={latency.get('p50', '-')} ms, "
+                f"p95={latency.get('p95', '-')} ms")
 
 
 class CodeCompilerWrapper:
@@ -380,14 +1343,15 @@ class CodeCompilerWrapper:
     Capa de lógica de negocio actualizada para el nuevo formato
     """
     
-    def __init__(self):
-        self.http_client = HttpClient()  # Usa detección automática
+    def __init__(self, http_client=None):
+        self.http_client = http_client or HttpClient()  # Usa detección automática
 
-    def send_evaluation_package(self, submission_package: dict):
+    def build_evaluation_payload(self, submission_package: dict, verbose=True) -> dict:
         """
         Adapta el formato antiguo al nuevo formato esperado por C++
         """
-        print("🔄 Adaptando formato para servidor C++...")
+        if verbose:
+            print("🔄 Adaptando formato para servidor C++...")
         
         # Extraer datos del paquete original
         user_code = submission_package.get("code", "")
@@ -398,18 +1362,32 @@ class CodeCompilerWrapper:
         cpp_payload = {
             "problem_title": problem_details.get("title", "Problema sin título"),
             "user_code": user_code,
-            "test_cases": self._extract_test_cases(problem_details)
+            "test_cases": self._extract_test_cases(problem_details, verbose)
         }
-        
-        print(f"📦 Payload para C++:")
-        print(f"   - Problema: {cpp_payload['problem_title']}")
-        print(f"   - Casos de prueba: {len(cpp_payload['test_cases'])}")
-        print(f"   - Usuario: {user_name}")
-        
+
+        if verbose:
+            print(f"📦 Payload para C++:")
+            print(f"   - Problema: {cpp_payload['problem_title']}")
+            print(f"   - Casos de prueba: {len(cpp_payload['test_cases'])}")
+            print(f"   - Usuario: {user_name}")
+
+        return cpp_payload
+
+    def send_evaluation_package(self, submission_package: dict):
+        """Envía el paquete y espera el resultado completo."""
+        endpoint = "/submit_evaluation"
+        return self.http_client.send(self.build_evaluation_payload(submission_package), endpoint)
+
+    def stream_evaluation_package(self, submission_package: dict, on_event=None, cancel_event=None):
+        """
+        Envía el paquete pidiendo los resultados en streaming: ``on_event`` recibe
+        cada caso de prueba en cuanto el servidor lo termina.
+        """
         endpoint = "/submit_evaluation"
-        return self.http_client.send(cpp_payload, endpoint)
+        return self.http_client.send_stream(self.build_evaluation_payload(submission_package), endpoint,
+                                            on_event=on_event, cancel_event=cancel_event)
     
-    def _extract_test_cases(self, problem_details: dict) -> list:
+    def _extract_test_cases(self, problem_details: dict, verbose=True) -> list:
         """
         Extrae y formatea los casos de prueba del formato MongoDB al formato C++
         """
@@ -424,10 +1402,68 @@ class CodeCompilerWrapper:
             test_cases.append(test_case)
             
             # Log para debugging
-            print(f"   Caso {i}: Input='{test_case['input_raw']}', Expected='{test_case['expected_output_raw']}'")
+            if verbose:
+                print(f"   Caso {i}: Input='{test_case['input_raw']}', Expected='{test_case['expected_output_raw']}'")
         
         return test_cases
 
+    def grade_batch(self, submissions, max_concurrency=4, on_result=None):
+        """
+        Evalúa muchos envíos (por ejemplo, recalificar un curso entero) con
+        concurrencia limitada sobre el mismo pool de conexiones.
+
+        Args:
+            submissions: Iterable de paquetes con el formato de
+                get_submission_data_for_evaluation (se consume de a poco)
+            max_concurrency (int): Envíos simultáneos como máximo
+            on_result: Callback ``on_result(indice, paquete, resultado)`` llamado
+                en cuanto cada envío termina (en el orden en que terminan)
+
+        Returns:
+            BatchGradingReport con rendimiento, latencias y fallos.
+        """
+        self.http_client.ensure_pool_size(max_concurrency)
+        report = BatchGradingReport()
+        endpoint = "/submit_evaluation"
+
+        def grade(package):
+            start = time.perf_counter()
+            result = self.http_client.send(self.build_evaluation_payload(package, verbose=False), endpoint)
+            return result, (time.perf_counter() - start) * 1000
+
+        started = time.perf_counter()
+        pending = {}  # Future -> (índice, paquete)
+        submissions = iter(enumerate(submissions))
+
+        with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="batch") as executor:
+            def submit_next():
+                for index, package in submissions:
+                    pending[executor.submit(grade, package)] = (index, package)
+                    return True
+                return False
+
+            # Ventana acotada: nunca hay más de max_concurrency envíos en vuelo
+            while len(pending) < max_concurrency and submit_next():
+                pass
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, package = pending.pop(future)
+                    try:
+                        result, latency_ms = future.result()
+                    except Exception as e:
+                        result, latency_ms = {"status": "unexpected_error", "message": str(e)}, None
+
+                    report.record(index, result, latency_ms)
+                    if on_result is not None:
+                        on_result(index, package, result)
+                    submit_next()
+
+        report.elapsed_s = time.perf_counter() - started
+        print(f"📊 Lote terminado: {report.summary_line()}")
+        return report
+
     def send_code_to_compile(self, user_code: str):
         """
         Para el botón 'Ejecutar' - compilación simple
@@ -443,22 +1479,3 @@ class CodeCompilerWrapper:
         }
         endpoint = "/submit_evaluation"
         return self.http_client.send(payload, endpoint)
-
-class CodeCompilerWrapper:
-    """
-    Capa de lógica de negocio que utiliza HttpClient para enviar código.
-    """
-
-    def __init__(self):
-        self.http_client = HttpClient(host="http://127.0.0.1", port=5000)
-
-    def send_code_to_compile(self, user_code: str):
-        """Para el botón 'Ejecutar' (compilación simple)"""
-        payload = {"code": user_code}
-        endpoint = "/submit_code"
-        return self.http_client.send(payload, endpoint)
-
-    def send_evaluation_package(self, submission_package: dict):
-        """Para el botón 'Enviar' (evaluación completa con test cases)"""
-        endpoint = "/submit_evaluation"
-        return self.http_client.send(submission_package, endpoint)
\ No newline at end of file
@@ -0,0 +1,284 @@
+# SubmissionJournal.py
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pymongo
+from pymongo.errors import BulkWriteError, PyMongoError
+
+DUPLICATE_KEY = 11000
+
+
+def _journal_dir():
+    """Directorio local (mismo criterio que la GUI: CODECOACH_HOME o ~/.codecoach)."""
+    path = os.environ.get("CODECOACH_HOME") or os.path.join(os.path.expanduser("~"), ".codecoach")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class SubmissionJournal:
+    """
+    Diario local de envíos, solo de agregado, que se vuelca a MongoDB.
+
+    ``append`` no toca el disco: deja la línea en memoria y vuelve. Un hilo
+    escritor junta lo acumulado cada ``fsync_interval`` segundos y lo graba
+    con un solo write + fsync (commit en grupo). Otro hilo sube lo que ya
+    está en disco a la colección ``submissions`` con ``insert_many`` y anota
+    hasta qué byte llegó en ``submissions.checkpoint``.
+
+    Cada registro lleva un ``_id`` uuid4 propio: si el proceso muere entre
+    el insert y el checkpoint, al reintentar los duplicados se ignoran, así
+    que cada envío queda en la base exactamente una vez. Sin MongoDB el
+    diario sigue creciendo y se sube cuando vuelve la conexión; una línea
+    cortada por un cierre abrupto se descarta al abrir.
+    """
+
+    JOURNAL_FILE = "submissions.jsonl"
+    CHECKPOINT_FILE = "submissions.checkpoint"
+    COLLECTION = "submissions"
+
+    def __init__(self, collection=None, directory=None, fsync_interval=0.2, upload_interval=2.0,
+                 batch_size=500, rotate_bytes=8 * 1024 * 1024):
+        directory = directory or _journal_dir()
+        self.path = os.path.join(directory, self.JOURNAL_FILE)
+        self.checkpoint_path = os.path.join(directory, self.CHECKPOINT_FILE)
+        self.fsync_interval = fsync_interval
+        self.upload_interval = upload_interval
+        self.batch_size = batch_size
+        self.rotate_bytes = rotate_bytes
+        self.collection = None
+
+        self._pending = []  # Líneas aún no grabadas
+        self._lock = threading.Lock()
+        self._file_lock = threading.Lock()  # Escritura vs. rotación del archivo
+        self._wake_writer = threading.Event()
+        self._wake_uploader = threading.Event()
+        self._closed = False
+        self._stop_upload = False
+        self.counters = {"appended": 0, "fsyncs": 0, "uploaded": 0, "duplicates": 0, "upload_errors": 0}
+
+        self._file = open(self.path, "ab+")
+        self._drop_torn_tail()
+        self._durable = self._file.tell()
+        self._checkpoint = min(self._read_checkpoint(), self._durable)
+
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._uploader = threading.Thread(target=self._upload_loop, name="journal-uploader", daemon=True)
+        self._writer.start()
+        self._uploader.start()
+
+        if collection is not None:
+            self.attach(collection)
+
+    def attach(self, collection):
+        """Habilita la subida a MongoDB (el diario puede empezar antes de tener conexión)."""
+        if collection is None:
+            return
+        try:
+            collection.create_index([("user", pymongo.ASCENDING), ("submitted_at", pymongo.DESCENDING)])
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudo crear el índice de envíos: {e}")
+        self.collection = collection
+        self._wake_uploader.set()
+
+    def append(self, record):
+        """Encola un envío para el diario. Devuelve su _id (vuelve sin esperar al disco)."""
+        record = dict(record)
+        record.setdefault("_id", uuid.uuid4().hex)
+        submitted_at = record.get("submitted_at") or datetime.utcnow()
+        # En el diario va como texto ISO; al subirlo vuelve a ser fecha (ver _read_durable)
+        record["submitted_at"] = submitted_at.isoformat(timespec="milliseconds")
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+        with self._lock:
+            self._pending.append(line.encode("utf-8"))
+            self.counters["appended"] += 1
+        self._wake_writer.set()
+        return record["_id"]
+
+    def pending_upload_bytes(self):
+        return self._durable - self._checkpoint
+
+    def close(self, upload_timeout=5):
+        """Graba lo pendiente y hace un último intento de subida."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake_writer.set()
+        self._writer.join(timeout=5)
+        self._commit()
+
+        # El escritor ya terminó: el uploader ve todo lo grabado en su último intento
+        self._stop_upload = True
+        self._wake_uploader.set()
+        self._uploader.join(timeout=upload_timeout)
+        with self._file_lock:
+            self._file.close()
+
+    # ---------- escritura ----------
+
+    def _drop_torn_tail(self):
+        """Corta una última línea incompleta (el proceso murió a mitad de un write)."""
+        self._file.seek(0, os.SEEK_END)
+        size = self._file.tell()
+        if size == 0:
+            return
+        chunk = min(size, 64 * 1024)
+        self._file.seek(size - chunk)
+        tail = self._file.read(chunk)
+        if tail.endswith(b"\n"):
+            return
+        last_newline = tail.rfind(b"\n")
+        keep = size - chunk + last_newline + 1 if last_newline >= 0 else 0
+        print(f"INFO: Diario de envíos con una línea incompleta; se descartan {size - keep} bytes")
+        self._file.truncate(keep)
+        self._file.seek(keep)
+
+    def _commit(self):
+        with self._lock:
+            lines, self._pending = self._pending, []
+        if not lines or self._file.closed:
+            return
+        with self._file_lock:
+            self._file.write(b"".join(lines))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._durable = self._file.tell()
+        self.counters["fsyncs"] += 1
+        self._wake_uploader.set()
+
+    def _write_loop(self):
+        while not self._closed:
+            self._wake_writer.wait()
+            self._wake_writer.clear()
+            # Esperar un poco junta en un solo fsync los envíos que llegan casi a la vez
+            time.sleep(self.fsync_interval)
+            try:
+                self._commit()
+            except OSError as e:
+                print(f"ERROR: No se pudo grabar el diario de envíos: {e}")
+
+    # ---------- subida ----------
+
+    def _read_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                return int(json.load(f).get("offset", 0))
+        except FileNotFoundError:
+            return 0
+        except (ValueError, TypeError, AttributeError):
+            print("ERROR: Checkpoint del diario corrupto; se resube todo (los duplicados se ignoran).")
+            return 0
+
+    def _write_checkpoint(self, offset):
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self._checkpoint = offset
+
+    def _read_batch(self, start, end):
+        """
+        Hasta ``batch_size`` registros grabados a partir del byte ``start``
+        (sin pasar de ``end``), con el byte donde termina cada uno, y el byte
+        donde quedó la lectura. Nunca se carga el resto del diario en memoria.
+        """
+        records = []
+        offset = start
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            while offset < end and len(records) < self.batch_size:
+                line = f.readline(end - offset)
+                if not line:
+                    break
+                offset += len(line)
+                try:
+                    doc = json.loads(line)
+                    # Fecha UTC real, como el resto de la base: el índice ordena por fecha, no por texto
+                    doc["submitted_at"] = datetime.fromisoformat(doc["submitted_at"])
+                    records.append((doc, offset))
+                except (ValueError, KeyError, TypeError):
+                    print(f"ERROR: Línea ilegible en el diario (byte {offset}); se omite.")
+        return records, offset
+
+    def _upload(self):
+        """Sube lo grabado de a un lote; ante el primer lote que falla, espera al siguiente intento."""
+        if self.collection is None or self._durable <= self._checkpoint:
+            return
+        end = self._durable
+
+        while self._checkpoint < end:
+            batch, offset = self._read_batch(self._checkpoint, end)
+            if batch:
+                try:
+                    result = self.collection.insert_many([doc for doc, _ in batch], ordered=False)
+                    self.counters["uploaded"] += len(result.inserted_ids)
+                except BulkWriteError as e:
+                    errors = e.details.get("writeErrors", [])
+                    others = [err for err in errors if err.get("code") != DUPLICATE_KEY]
+                    if others:
+                        self.counters["upload_errors"] += 1
+                        print(f"ERROR DB: {len(others)} envíos no se pudieron subir; se reintentará: "
+                              f"{others[0].get('errmsg')}")
+                        return
+                    # Ya estaban subidos (reintento tras un corte): no es un error
+                    self.counters["duplicates"] += len(errors)
+                    self.counters["uploaded"] += e.details.get("nInserted", 0)
+                except PyMongoError as e:
+                    self.counters["upload_errors"] += 1
+                    print(f"ERROR DB: No se pudo subir el diario de envíos (se reintentará): {e}")
+                    return
+            self._write_checkpoint(offset)  # También avanza sobre líneas ilegibles
+
+        self._maybe_rotate()
+
+    def _maybe_rotate(self):
+        """Con todo subido, vacía el diario si creció demasiado."""
+        # Todo bajo el lock del archivo: ningún commit puede grabar entre el truncado y el
+        # checkpoint en 0. Si el proceso muere en medio, el diario está vacío y el checkpoint
+        # viejo se recorta al abrir, sin registros nuevos que perder
+        with self._file_lock:
+            if self._file.closed or self._checkpoint != self._durable or self._durable < self.rotate_bytes:
+                return
+            self._file.truncate(0)
+            self._file.seek(0)
+            self._durable = 0
+            self._write_checkpoint(0)
+
+    def _upload_loop(self):
+        while not self._stop_upload:
+            self._wake_uploader.wait(self.upload_interval)
+            self._wake_uploader.clear()
+            try:
+                self._upload()
+            except OSError as e:
+                print(f"ERROR: No se pudo leer el diario de envíos: {e}")
+        try:
+            self._upload()  # Último intento al cerrar
+        except (OSError, PyMongoError):
+            pass
+
+
+def submission_record(package, result, client_ms=None):
+    """Registro del diario a partir del paquete enviado y la respuesta recibida."""
+    problem = package.get("problem_details") or {}
+    return {
+        "user": package.get("user_name", "Invitado"),
+        "problem_id": problem.get("_id"),
+        "problem_title": problem.get("title"),
+        "code": package.get("code", ""),
+        "verdict": {
+            "status": result.get("status"),
+            "problem_solved": bool(result.get("problem_solved")),
+            "passed_count": result.get("passed_count"),
+            "total_tests": result.get("total_tests"),
+            "score": result.get("score", 0)
+        },
+        "metrics": result.get("metrics"),
+        "client_ms": round(client_ms, 1) if client_ms is not None else None
+    }
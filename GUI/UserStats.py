@@ -0,0 +1,231 @@
+# UserStats.py
+import threading
+from datetime import date
+
+import pymongo
+from pymongo.errors import PyMongoError
+
+
+class UserStatsStore:
+    """
+    Estadísticas de progreso por usuario, mantenidas como contadores.
+
+    Cada veredicto se aplica con una sola actualización atómica (pipeline de
+    agregación con upsert) sobre el documento del usuario en ``user_stats``:
+    envíos, aceptados, resueltos por dificultad y categoría, rachas y tiempo
+    total de ejecución. Leer el progreso es leer un documento; nunca se
+    recorre el historial de envíos.
+
+    Documento (``_id`` = nombre de usuario):
+        submissions, accepted          -> tasa de éxito
+        solved, solved_total           -> problemas distintos resueltos
+        solved_by_difficulty.<dif>     -> resueltos por dificultad
+        solved_by_category.<cat>       -> resueltos por categoría
+        verdict_streak, best_verdict_streak   -> envíos aceptados seguidos
+        day_streak, best_day_streak    -> días seguidos con un aceptado
+        last_solved_day, solved_today  -> día (ordinal) del último aceptado
+        runtime_total_ms, runtime_samples     -> tiempo medio de ejecución
+
+    Sin MongoDB se aplica la misma lógica en memoria.
+
+    Los contadores por dificultad/categoría usan ``$getField``/``$setField``
+    (MongoDB 5.0+), que tratan la clave como texto. Con un servidor más
+    viejo (se revisa al conectar) se escriben con una ruta con puntos, con
+    "." y "$" de la clave reemplazados por sus equivalentes de ancho
+    completo.
+    """
+
+    COLLECTION = "user_stats"
+    LITERAL_KEYS_MIN_VERSION = (5, 0)
+
+    def __init__(self, collection=None, literal_keys=True):
+        self.collection = collection
+        self.literal_keys = literal_keys
+        self._memory = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_store(cls, store):
+        """Estadísticas junto a la colección de usuarios de un UserStore."""
+        users = getattr(store, "collection", None)
+        if users is None:
+            return cls()
+        try:
+            version = tuple(users.database.client.server_info()["versionArray"][:2])
+        except (PyMongoError, KeyError) as e:
+            print(f"ERROR DB: No se pudo leer la versión de MongoDB: {e}")
+            version = None
+        literal_keys = version is None or version >= cls.LITERAL_KEYS_MIN_VERSION
+        if not literal_keys:
+            print(f"INFO: MongoDB {'.'.join(map(str, version))} < 5.0: contadores por categoría "
+                  f"con claves saneadas (sin $getField/$setField)")
+        return cls(users.database[cls.COLLECTION], literal_keys=literal_keys)
+
+    def get(self, nombre):
+        """Documento de estadísticas del usuario (vacío si aún no envió nada)."""
+        if self.collection is None:
+            with self._lock:
+                return dict(self._memory.get(nombre, {"_id": nombre}))
+        try:
+            return self.collection.find_one({"_id": nombre}, {"solved": 0}) or {"_id": nombre}
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudieron leer las estadísticas de '{nombre}': {e}")
+            return None
+
+    def record_verdict(self, nombre, problem, accepted, difficulty=None, category=None,
+                       runtime_ms=None, day=None):
+        """
+        Aplica un veredicto a los contadores del usuario y devuelve el
+        documento actualizado (o None si falló la escritura).
+        ``day`` es el ordinal de la fecha local; por defecto, hoy.
+        """
+        day = day if day is not None else date.today().toordinal()
+
+        if self.collection is None:
+            with self._lock:
+                doc = self._memory.setdefault(nombre, {"_id": nombre})
+                self._apply_local(doc, problem, accepted, difficulty, category, runtime_ms, day)
+                return dict(doc)
+
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": nombre},
+                self._pipeline(problem, accepted, difficulty, category, runtime_ms, day, self.literal_keys),
+                projection={"solved": 0},
+                upsert=True,
+                return_document=pymongo.ReturnDocument.AFTER
+            )
+        except PyMongoError as e:
+            print(f"ERROR DB: No se pudieron actualizar las estadísticas de '{nombre}': {e}")
+            return None
+        return doc
+
+    @staticmethod
+    def _pipeline(problem, accepted, difficulty, category, runtime_ms, day, literal_keys=True):
+        def field(name):
+            return {"$ifNull": [f"${name}", 0]}
+
+        def plus(name, amount):
+            return {"$add": [field(name), amount]}
+
+        def bump(name, key, amount):
+            # $getField/$setField con la clave como $literal: una categoría con "." o que
+            # empiece con "$" es una clave más, no una ruta ni un campo
+            counters = {"$ifNull": [f"${name}", {}]}
+            key = {"$literal": key}
+            current = {"$ifNull": [{"$getField": {"field": key, "input": counters}}, 0]}
+            return {"$setField": {"field": key, "input": counters, "value": {"$add": [current, amount]}}}
+
+        counters = {
+            "submissions": plus("submissions", 1),
+            "verdict_streak": plus("verdict_streak", 1) if accepted else 0
+        }
+        if runtime_ms is not None:
+            counters["runtime_total_ms"] = plus("runtime_total_ms", runtime_ms)
+            counters["runtime_samples"] = plus("runtime_samples", 1)
+        if not accepted:
+            return [{"$set": counters}]
+
+        # Las expresiones de un mismo $set ven el documento anterior: primero
+        # se calculan _new (primera vez que lo resuelve) y _gap (días desde el último)
+        counters["accepted"] = plus("accepted", 1)
+        # $literal: un título que empiece con "$" no debe leerse como campo
+        counters["_new"] = {"$not": [{"$in": [{"$literal": problem}, {"$ifNull": ["$solved", []]}]}]}
+        counters["_gap"] = {"$subtract": [day, {"$ifNull": ["$last_solved_day", -2]}]}
+
+        new = {"$cond": ["$_new", 1, 0]}
+        solved = {
+            "solved": {"$setUnion": [{"$ifNull": ["$solved", []]}, {"$literal": [problem]}]},
+            "solved_total": plus("solved_total", new),
+            "solved_today": {"$cond": [{"$eq": ["$_gap", 0]}, plus("solved_today", new), new]},
+            "day_streak": {"$switch": {"branches": [
+                {"case": {"$eq": ["$_gap", 0]}, "then": field("day_streak")},
+                {"case": {"$eq": ["$_gap", 1]}, "then": plus("day_streak", 1)}
+            ], "default": 1}},
+            "last_solved_day": {"$max": [day, field("last_solved_day")]}
+        }
+        for name, key in (("solved_by_difficulty", difficulty), ("solved_by_category", category)):
+            if not key:
+                continue
+            if literal_keys:
+                solved[name] = bump(name, key, new)
+            else:
+                path = f"{name}.{_safe_key(key)}"
+                solved[path] = plus(path, new)
+
+        return [
+            {"$set": counters},
+            {"$set": solved},
+            {"$set": {"best_verdict_streak": {"$max": [field("best_verdict_streak"), "$verdict_streak"]},
+                      "best_day_streak": {"$max": [field("best_day_streak"), "$day_streak"]}}},
+            {"$unset": ["_new", "_gap"]}
+        ]
+
+    @staticmethod
+    def _apply_local(doc, problem, accepted, difficulty, category, runtime_ms, day):
+        """Mismo efecto que ``_pipeline`` sobre un dict en memoria."""
+        doc["submissions"] = doc.get("submissions", 0) + 1
+        doc["verdict_streak"] = doc.get("verdict_streak", 0) + 1 if accepted else 0
+        if runtime_ms is not None:
+            doc["runtime_total_ms"] = doc.get("runtime_total_ms", 0) + runtime_ms
+            doc["runtime_samples"] = doc.get("runtime_samples", 0) + 1
+        if not accepted:
+            return
+
+        doc["accepted"] = doc.get("accepted", 0) + 1
+        solved = doc.setdefault("solved", [])
+        new = 0 if problem in solved else 1
+        if new:
+            solved.append(problem)
+        gap = day - doc.get("last_solved_day", -2)
+
+        doc["solved_total"] = doc.get("solved_total", 0) + new
+        doc["solved_today"] = doc.get("solved_today", 0) + new if gap == 0 else new
+        if gap == 1:
+            doc["day_streak"] = doc.get("day_streak", 0) + 1
+        elif gap != 0:
+            doc["day_streak"] = 1
+        doc["last_solved_day"] = max(day, doc.get("last_solved_day", 0))
+        if difficulty:
+            by_difficulty = doc.setdefault("solved_by_difficulty", {})
+            by_difficulty[difficulty] = by_difficulty.get(difficulty, 0) + new
+        if category:
+            by_category = doc.setdefault("solved_by_category", {})
+            by_category[category] = by_category.get(category, 0) + new
+
+        doc["best_verdict_streak"] = max(doc.get("best_verdict_streak", 0), doc["verdict_streak"])
+        doc["best_day_streak"] = max(doc.get("best_day_streak", 0), doc["day_streak"])
+
+
+def _safe_key(key):
+    """Clave usable en una ruta con puntos (solo para MongoDB < 5.0)."""
+    key = key.replace(".", "\uff0e")
+    return "\uff04" + key[1:] if key.startswith("$") else key
+
+
+def summarize(doc, today=None):
+    """
+    Valores listos para mostrar a partir de un documento de ``user_stats``
+    (tiempo constante: solo lee contadores). Las rachas por día caducan si
+    el último aceptado fue antes de ayer.
+    """
+    doc = doc or {}
+    today = today if today is not None else date.today().toordinal()
+    last_day = doc.get("last_solved_day")
+    submissions = doc.get("submissions", 0)
+    samples = doc.get("runtime_samples", 0)
+
+    return {
+        "solved_total": doc.get("solved_total", 0),
+        "solved_today": doc.get("solved_today", 0) if last_day == today else 0,
+        "verdict_streak": doc.get("verdict_streak", 0),
+        "best_verdict_streak": doc.get("best_verdict_streak", 0),
+        "day_streak": doc.get("day_streak", 0) if last_day is not None and today - last_day <= 1 else 0,
+        "best_day_streak": doc.get("best_day_streak", 0),
+        "submissions": submissions,
+        "acceptance_rate": doc.get("accepted", 0) / submissions if submissions else None,
+        "avg_runtime_ms": doc.get("runtime_total_ms", 0) / samples if samples else None,
+        # Un aceptado repetido deja la clave en 0: no se muestra
+        "solved_by_difficulty": {k: v for k, v in doc.get("solved_by_difficulty", {}).items() if v},
+        "solved_by_category": {k: v for k, v in doc.get("solved_by_category", {}).items() if v}
+    }
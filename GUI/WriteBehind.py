@@ -0,0 +1,110 @@
+# WriteBehind.py
+import atexit
+import threading
+
+from pymongo.errors import BulkWriteError, PyMongoError
+
+
+class WriteBehindBuffer:
+    """
+    Buffer de escritura diferida hacia una colección de MongoDB.
+
+    ``add(clave, valor)`` vuelve al instante: los cambios se acumulan por
+    clave (``merge`` combina el pendiente con el nuevo) y un hilo los
+    escribe cada ``flush_interval`` segundos, o antes si hay ``max_pending``
+    claves, en un solo ``bulk_write(ordered=False)``. Una ráfaga de
+    veredictos del mismo usuario termina en una operación, y la de muchos
+    usuarios en un viaje de red.
+
+    ``make_op(clave, valor)`` arma la operación (UpdateOne, ...). Lo que
+    falla al escribir vuelve a la cola para el siguiente intento; tras un
+    timeout el servidor pudo haberla aplicado igual, así que las operaciones
+    deben ser idempotentes (reaplicarlas no cambia el resultado). ``close``
+    (también registrado con atexit) escribe lo pendiente.
+    """
+
+    def __init__(self, collection, make_op, merge=None, flush_interval=0.5, max_pending=256,
+                 name="write-behind"):
+        self.collection = collection
+        self.make_op = make_op
+        self.merge = merge or (lambda old, new: new)  # Por defecto gana el último valor
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.name = name
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Un solo bulk_write a la vez
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+        self.counters = {"added": 0, "ops_written": 0, "flushes": 0, "failed_flushes": 0, "largest_batch": 0}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pending)
+
+    def add(self, key, value):
+        with self._lock:
+            self._pending[key] = self.merge(self._pending[key], value) if key in self._pending else value
+            self.counters["added"] += 1
+            full = len(self._pending) >= self.max_pending
+            closed = self._closed
+            if self._thread is None and not closed:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+        if closed:
+            self.flush()  # Tras close ya no hay hilo: se escribe en el momento
+        elif full:
+            self._wake.set()
+
+    def flush(self):
+        """Escribe todo lo pendiente. Devuelve cuántas operaciones se escribieron."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+            if not batch:
+                return 0
+
+            keys = list(batch)
+            ops = [self.make_op(key, batch[key]) for key in keys]
+            failed = []
+            try:
+                self.collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = [keys[err["index"]] for err in e.details.get("writeErrors", [])]
+                print(f"ERROR DB: {len(failed)} de {len(ops)} escrituras diferidas fallaron ({self.name})")
+            except PyMongoError as e:
+                failed = keys
+                print(f"ERROR DB: No se pudo escribir el lote diferido ({self.name}): {e}")
+
+            with self._lock:
+                for key in failed:
+                    # Lo que llegó mientras tanto se combina detrás del valor que falló
+                    self._pending[key] = (self.merge(batch[key], self._pending[key])
+                                          if key in self._pending else batch[key])
+                self.counters["flushes"] += 1
+                self.counters["failed_flushes"] += bool(failed)
+                self.counters["ops_written"] += len(ops) - len(failed)
+                self.counters["largest_batch"] = max(self.counters["largest_batch"], len(ops))
+            return len(ops) - len(failed)
+
+    def close(self):
+        """Detiene el hilo y escribe lo pendiente (idempotente)."""
+        with self._lock:
+            self._closed = True
+            thread = self._thread
+        self._wake.set()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed:
+                break
+            self.flush()
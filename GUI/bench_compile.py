@@ -0,0 +1,157 @@
+# bench_compile.py
+"""
+Compara la latencia de compilación en frío (sin encabezados precompilados)
+contra la compilación en caliente (con .gch) para los problemas de la
+colección ``problems``.
+
+Por cada problema se arma un programa distinto (una combinación de
+fragmentos elegida a partir del título) en dos variantes: con
+``<bits/stdc++.h>`` y con solo los includes que usa. Cada uno se compila
+directamente (sin pasar por la caché de binarios) sin y con su .gch; antes
+de medir se espera a que terminen los .gch y el calentamiento.
+
+Uso:
+    python bench_compile.py                  # problemas de MongoDB
+    python bench_compile.py --limit 20
+    python bench_compile.py --synthetic 30   # sin MongoDB
+"""
+import argparse
+import json
+import random
+import shutil
+import tempfile
+import time
+
+from EvaluationEngine import EvaluationEngine, CompilationError
+from PerfStats import summarize_latencies
+
+# (includes que necesita, función ``long long fN(const vector<string>& lines)``)
+SNIPPETS = [
+    (("algorithm",),
+     "    vector<long long> v;\n    for (const string& l : lines) v.push_back((long long)l.size());\n"
+     "    sort(v.begin(), v.end());\n    return v.empty() ? 0 : v[v.size() / 2];\n"),
+    (("map",),
+     "    map<string, int> freq;\n    for (const string& l : lines) freq[l]++;\n"
+     "    long long best = 0;\n    for (auto& kv : freq) best = max<long long>(best, kv.second);\n"
+     "    return best;\n"),
+    (("set",),
+     "    set<char> seen;\n    for (const string& l : lines) seen.insert(l.begin(), l.end());\n"
+     "    return (long long)seen.size();\n"),
+    (("queue",),
+     "    int n = (int)lines.size();\n    vector<int> dist(n, -1);\n    queue<int> q;\n"
+     "    if (n) { dist[0] = 0; q.push(0); }\n"
+     "    while (!q.empty()) {\n        int u = q.front(); q.pop();\n"
+     "        for (int w : {u + 1, 2 * u + 1}) if (w < n && dist[w] < 0) { dist[w] = dist[u] + 1; q.push(w); }\n"
+     "    }\n    return n ? dist[n - 1] : 0;\n"),
+    (("numeric",),
+     "    vector<long long> v;\n    for (const string& l : lines) v.push_back((long long)l.size());\n"
+     "    return accumulate(v.begin(), v.end(), 0LL);\n"),
+    (("sstream",),
+     "    long long total = 0;\n    for (const string& l : lines) {\n"
+     "        istringstream in(l);\n        long long x;\n        while (in >> x) total += x;\n    }\n"
+     "    return total;\n"),
+    (("unordered_map",),
+     "    unordered_map<long long, int> seen;\n    long long pairs = 0;\n"
+     "    for (const string& l : lines) pairs += seen[(long long)l.size()]++;\n    return pairs;\n"),
+    (("stack",),
+     "    long long ok = 0;\n    for (const string& l : lines) {\n        stack<char> st;\n"
+     "        bool good = true;\n        for (char c : l) {\n"
+     "            if (c == '(') st.push(c);\n"
+     "            else if (c == ')') { if (st.empty()) { good = false; break; } st.pop(); }\n"
+     "        }\n        ok += good && st.empty();\n    }\n    return ok;\n"),
+]
+PARTS_PER_PROGRAM = 3
+
+
+def build_program(title, variant):
+    """Programa propio de cada problema: los fragmentos salen del título, el prelude de ``variant``."""
+    rng = random.Random(title)
+    parts = rng.sample(SNIPPETS, PARTS_PER_PROGRAM)
+    if variant == "bits":
+        prelude = "#include <bits/stdc++.h>\n"
+    else:
+        headers = ["iostream", "string", "vector"]
+        for needs, _ in parts:
+            headers += [h for h in needs if h not in headers]
+        prelude = "".join(f"#include <{h}>\n" for h in headers)
+
+    body = [prelude, "using namespace std;\n\n", f"static const char* TITLE = {json.dumps(title, ensure_ascii=False)};\n\n"]
+    for i, (_, code) in enumerate(parts):
+        body.append(f"long long f{i}(const vector<string>& lines) {{\n{code}}}\n\n")
+    calls = " + ".join(f"f{i}(lines)" for i in range(len(parts)))
+    body.append("int main() {\n    vector<string> lines;\n    string line;\n"
+                "    while (getline(cin, line)) lines.push_back(line);\n"
+                f"    cout << TITLE << \": \" << ({calls}) << \"\\n\";\n    return 0;\n}}\n")
+    return "".join(body)
+
+
+def load_problem_titles(uri, limit):
+    import pymongo
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=3000)
+    cursor = client["codecoach_db"]["problems"].find({}, {"title": 1}).limit(limit)
+    return [p.get("title", str(p["_id"])) for p in cursor]
+
+
+def time_compile(engine, source, pch_flags):
+    work_dir = tempfile.mkdtemp(prefix="codecoach_bench_")
+    try:
+        start = time.perf_counter()
+        engine._run_compiler(source, work_dir, pch_flags)
+        return (time.perf_counter() - start) * 1000
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compilación en frío vs con encabezados precompilados")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--limit", type=int, default=50, help="Máximo de problemas a compilar")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Usar N problemas sintéticos en lugar de MongoDB")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        titles = [f"Problema sintético {i}" for i in range(args.synthetic)]
+    else:
+        try:
+            titles = load_problem_titles(args.mongo_uri, args.limit)
+        except Exception as e:
+            print(f"ERROR: No se pudo leer la colección problems ({e}). Use --synthetic N.")
+            return 1
+    if not titles:
+        print("ERROR: No hay problemas para compilar.")
+        return 1
+
+    engine = EvaluationEngine()
+    print("Generando encabezados precompilados...")
+    engine.wait_until_warm()
+    print(f"Listos: {engine.pch.ready()} en {engine.pch.pch_dir}")
+
+    print(f"\n=== COMPILACIÓN: {len(titles)} problemas ===")
+    for variant in ("bits", "std"):
+        cold, warm = [], []
+        for title in titles:
+            source = build_program(title, variant)
+            pch_flags = engine.pch.prepare(source)  # Fuera de la medición: el .gch de este conjunto
+            try:
+                cold.append(time_compile(engine, source, []))
+                warm.append(time_compile(engine, source, pch_flags))
+            except CompilationError as e:
+                print(f"ERROR: '{title}' no compiló: {e.output[:200]}")
+
+        cold_stats = summarize_latencies(cold)
+        warm_stats = summarize_latencies(warm)
+        if not cold_stats["count"]:
+            continue
+        speedup = cold_stats["p50"] / warm_stats["p50"] if warm_stats["p50"] else 0
+        print(f"[{variant}] frío     p50={cold_stats['p50']} p95={cold_stats['p95']} "
+              f"p99={cold_stats['p99']} ms")
+        print(f"[{variant}] caliente p50={warm_stats['p50']} p95={warm_stats['p95']} "
+              f"p99={warm_stats['p99']} ms  (x{speedup:.1f})")
+
+    engine.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+# bench_kdf.py
+"""
+Elige el costo del hash de contraseñas para este equipo.
+
+Mide cuánto tarda PasswordHasher con costos crecientes (scrypt: n = 2^k;
+PBKDF2: iteraciones) y propone el mayor que queda por debajo de la latencia
+objetivo de login. Con --save lo guarda en ~/.codecoach/kdf.json, que
+LogAccion lee al arrancar. Los hashes existentes siguen siendo válidos y se
+recalculan con el nuevo costo en el siguiente login de cada usuario.
+
+Uso:
+    python bench_kdf.py                     # objetivo 250 ms
+    python bench_kdf.py --target-ms 400 --save
+    python bench_kdf.py --algorithm pbkdf2_sha256
+"""
+import argparse
+import hashlib
+import time
+
+from PasswordHasher import PasswordHasher
+from PerfStats import summarize_latencies
+
+
+def time_hash(hasher, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        hasher.hash("contraseña de prueba")
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize_latencies(samples)
+
+
+def candidates(algorithm):
+    if algorithm == "scrypt":
+        for k in range(12, 21):
+            yield PasswordHasher("scrypt", n=2 ** k, r=8, p=1)
+    else:
+        iterations = 100000
+        while iterations <= 3200000:
+            yield PasswordHasher("pbkdf2_sha256", iterations=iterations)
+            iterations *= 2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ajusta el costo del KDF a una latencia objetivo")
+    parser.add_argument("--algorithm", choices=("scrypt", "pbkdf2_sha256"),
+                        default="scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256")
+    parser.add_argument("--target-ms", type=float, default=250.0,
+                        help="Latencia máxima aceptable del hash en un login (p95)")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--save", action="store_true", help="Guardar el costo elegido en kdf.json")
+    args = parser.parse_args()
+
+    print(f"=== KDF: {args.algorithm}, objetivo p95 ≤ {args.target_ms} ms ===")
+    chosen = None
+    for hasher in candidates(args.algorithm):
+        stats = time_hash(hasher, args.repeats)
+        fits = stats["p95"] <= args.target_ms
+        print(f"   {hasher.params()}  p50={stats['p50']} ms  p95={stats['p95']} ms  {'✅' if fits else '❌'}")
+        if not fits:
+            break  # El costo solo crece: los siguientes tampoco entran
+        chosen = hasher
+
+    if chosen is None:
+        print("ERROR: Ningún costo entra en el objetivo; se mantiene la configuración actual.")
+        return 1
+
+    print(f"\n⏱️  Costo recomendado: {chosen.params()}")
+    if args.save:
+        print(f"INFO: Guardado en {chosen.save_config()}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
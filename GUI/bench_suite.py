@@ -0,0 +1,320 @@
+# bench_suite.py
+"""
+Benchmarks reproducibles de los caminos de datos y transporte del cliente.
+
+Mide:
+  * DatabaseHandler.get_all_problem_titles / get_problem_by_id contra un
+    mongod local con catálogos sintéticos (100 / 10k / 100k problemas), cada
+    uno en su propia base ``codecoach_bench_<n>`` (nunca en codecoach_db).
+  * HttpClient.send contra el mock local (python mock_server.py --mode grade --quiet).
+  * Construcción de ModernMainWindow con Qt offscreen.
+
+Cada corrida se agrega a ~/.codecoach/bench_results.jsonl con el commit
+actual, y se imprime la diferencia de p50 contra la corrida anterior.
+
+Uso:
+    python bench_suite.py
+    python bench_suite.py --sizes 100,10000 --iterations 50
+    python bench_suite.py --skip-mongo --mock-url http://127.0.0.1:5000
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+# Debe definirse antes de crear la QApplication
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PerfStats import summarize_latencies
+from PyLogic import get_app_data_dir, format_problem_label
+
+RESULTS_FILE = "bench_results.jsonl"
+SEED_VERSION = 1  # Cambiarlo fuerza a regenerar los catálogos sintéticos
+CATEGORIES = ("Arrays", "Strings", "Matemáticas", "Grafos", "Programación Dinámica",
+              "Ordenamiento", "Árboles", "Búsqueda")
+DIFFICULTIES = ("Fácil", "Media", "Difícil")
+
+
+# =============================================
+# MEDICIÓN
+# =============================================
+
+def measure(fn, iterations, warmup=1):
+    """Corre ``fn`` ``warmup`` + ``iterations`` veces y resume las latencias (ms)."""
+    # Los print de depuración del cliente se descartan, pero su costo sigue dentro de la medición
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        samples = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    return summarize_latencies(samples)
+
+
+# =============================================
+# MONGODB
+# =============================================
+
+def synthetic_problem(rng, i):
+    a, b = rng.randint(1, 1000), rng.randint(1, 1000)
+    return {
+        "title": f"problema_{i:06d}",
+        "category": rng.choice(CATEGORIES),
+        "difficulty": rng.choice(DIFFICULTIES),
+        "statement": f"Problema sintético {i}. " + " ".join(
+            rng.choice(("suma", "arreglo", "entero", "cadena", "grafo", "camino", "mínimo", "máximo"))
+            for _ in range(40)),
+        "examples": [
+            {"input_raw": f"{a} {b}", "output_raw": str(a + b), "explanation": "Suma de ambos valores"}
+            for a, b in ((a, b), (b, a), (a, a))
+        ],
+        "updated_at": datetime(2024, 1, 1)
+    }
+
+
+def seed_catalog(client, db_name, size, batch=5000):
+    """Crea (una sola vez) el catálogo sintético de ``size`` problemas en ``db_name``."""
+    db = client[db_name]
+    marker = db["bench_meta"].find_one({"_id": "seed"})
+    if marker and marker.get("size") == size and marker.get("version") == SEED_VERSION:
+        return False
+
+    print(f"INFO: Generando {size} problemas sintéticos en {db_name}...")
+    db["problems"].drop()
+    rng = random.Random(size)  # Misma semilla, mismo catálogo en cada máquina
+    docs = []
+    for i in range(size):
+        docs.append(synthetic_problem(rng, i))
+        if len(docs) >= batch:
+            db["problems"].insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        db["problems"].insert_many(docs, ordered=False)
+    db["bench_meta"].replace_one({"_id": "seed"}, {"_id": "seed", "size": size, "version": SEED_VERSION},
+                                 upsert=True)
+    return True
+
+
+def bench_mongo(args, results):
+    import pymongo
+    from PyLogic import DatabaseHandler
+
+    try:
+        client = pymongo.MongoClient(args.mongo_uri, serverSelectionTimeoutMS=3000)
+        client.admin.command("ping")
+    except Exception as e:
+        print(f"ERROR: MongoDB no disponible en {args.mongo_uri} ({e}); se omiten sus benchmarks.")
+        return None
+
+    smallest = None
+    for size in sorted(args.sizes):
+        db_name = f"{args.db_prefix}_{size}"
+        seed_catalog(client, db_name, size)
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Sin espejo: su sincronización en segundo plano ensuciaría las mediciones
+            handler = DatabaseHandler(uri=args.mongo_uri, db_name=db_name, use_mirror=False)
+        if handler.catalog is None:
+            print(f"ERROR: No se pudo abrir {db_name}")
+            continue
+        smallest = smallest or handler
+
+        def titles_cold():
+            handler.catalog.invalidate()
+            handler.get_all_problem_titles()
+
+        # En frío baja el catálogo de MongoDB; en caliente solo valida la marca de versión
+        results[f"mongo.titles_cold.{size}"] = measure(titles_cold, max(3, args.iterations // 10))
+        results[f"mongo.titles_warm.{size}"] = measure(handler.get_all_problem_titles, args.iterations)
+
+        # Camino de la app: la barra lateral abre por _id. Se vacía la caché de detalles
+        # para medir la consulta indexada y no un acierto en memoria
+        rng = random.Random(42)
+        problem_ids = [p["_id"] for p in handler.catalog.problems]
+
+        def problem_by_id():
+            problem_id = rng.choice(problem_ids)
+            handler.details_cache.invalidate(problem_id)
+            handler.get_problem_by_id(problem_id)
+
+        results[f"mongo.problem_by_id.{size}"] = measure(problem_by_id, args.iterations)
+
+        # Búsqueda por título (sin índice): serie aparte, solo como referencia
+        labels = [format_problem_label(p) for p in handler.catalog.problems]
+
+        results[f"mongo.problem_by_title.{size}"] = measure(
+            lambda: handler.get_problem_details(rng.choice(labels)), max(3, args.iterations // 10))
+        print(f"INFO: Catálogo de {size} problemas medido.")
+
+    return smallest
+
+
+# =============================================
+# HTTP
+# =============================================
+
+def bench_http(args, results):
+    from PyLogic import HttpClient
+
+    client = HttpClient(base_url=args.mock_url)
+    payload = {
+        "problem_title": "problema_000001",
+        "user_code": "#include <bits/stdc++.h>\nint main() { long long a, b; std::cin >> a >> b; "
+                     "std::cout << a + b; }\n",
+        "test_cases": [{"input_raw": f"{i} {i}", "expected_output_raw": str(2 * i)} for i in range(5)]
+    }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        probe = client.send(payload, "/submit_evaluation")
+    if probe.get("status") in ("connection_error", "timeout_error"):
+        print(f"ERROR: Mock no disponible en {args.mock_url}; inicie 'python mock_server.py --mode grade --quiet'.")
+        return
+
+    results["http.send"] = measure(lambda: client.send(payload, "/submit_evaluation"), args.iterations)
+    client.close()
+
+
+# =============================================
+# GUI
+# =============================================
+
+def bench_gui(args, results, db_handler):
+    from PyQt5.QtWidgets import QApplication
+    from AuxCreator import ModernMainWindow, DummyDatabaseHandler
+    from PyLogic import CodeCompilerWrapper, HttpClient
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    with contextlib.redirect_stdout(io.StringIO()):
+        db_handler = db_handler or DummyDatabaseHandler()
+        compiler_client = CodeCompilerWrapper(HttpClient(base_url=args.mock_url))
+        sidebar_page = db_handler.get_sidebar_page() if hasattr(db_handler, "get_sidebar_page") else None
+
+    def build_window():
+        # Mismos argumentos que entrega AppBootstrap: se mide solo la construcción
+        win = ModernMainWindow(compiler_client=compiler_client, db_handler=db_handler,
+                               sidebar_page=sidebar_page)
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+
+    # Lo que la ventana guarda en disco (el diario de envíos, por ejemplo) va a un directorio
+    # temporal: el benchmark no debe abrir ni rotar el ~/.codecoach del usuario
+    previous_home = os.environ.get("CODECOACH_HOME")
+    with tempfile.TemporaryDirectory(prefix="codecoach_bench_gui_") as home:
+        os.environ["CODECOACH_HOME"] = home
+        try:
+            results["gui.main_window_build"] = measure(build_window, max(5, args.iterations // 5))
+        finally:
+            if previous_home is None:
+                os.environ.pop("CODECOACH_HOME", None)
+            else:
+                os.environ["CODECOACH_HOME"] = previous_home
+
+
+# =============================================
+# RESULTADOS
+# =============================================
+
+def git_revision():
+    try:
+        sha = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             timeout=10).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                                    capture_output=True, text=True, timeout=30).stdout.strip())
+        return sha or None, dirty
+    except (OSError, subprocess.SubprocessError):
+        return None, False
+
+
+def previous_results(path):
+    """Último valor registrado de cada benchmark, con el commit donde se midió."""
+    latest = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                for name, stats in run.get("benchmarks", {}).items():
+                    latest[name] = (stats, run.get("git_sha"))
+    except FileNotFoundError:
+        pass
+    return latest
+
+
+def print_report(results, previous):
+    print("\n=== RESULTADOS (ms) ===")
+    print(f"   {'benchmark':<32} {'p50':>9} {'p95':>9} {'p99':>9}   vs anterior (p50)")
+    for name, stats in sorted(results.items()):
+        line = f"   {name:<32} {stats['p50']:>9} {stats['p95']:>9} {stats['p99']:>9}"
+        if name in previous and previous[name][0].get("p50"):
+            before, sha = previous[name]
+            delta = (stats["p50"] - before["p50"]) / before["p50"] * 100
+            flag = " ⚠️" if delta > 10 else ""
+            line += f"   {delta:+.1f}% ({sha or '?'}){flag}"
+        print(line)
+    print("=== FIN ===\n")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del cliente CodeCoach")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--db-prefix", default="codecoach_bench")
+    parser.add_argument("--sizes", default="100,10000,100000",
+                        help="Tamaños de catálogo sintético separados por coma")
+    parser.add_argument("--mock-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--skip-mongo", action="store_true")
+    parser.add_argument("--skip-http", action="store_true")
+    parser.add_argument("--skip-gui", action="store_true")
+    parser.add_argument("--results", default=None, help=f"JSONL de resultados (por defecto ~/.codecoach/{RESULTS_FILE})")
+    args = parser.parse_args(argv)
+    args.sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    return args
+
+
+def main():
+    args = parse_args()
+    results_path = args.results or os.path.join(get_app_data_dir(), RESULTS_FILE)
+    previous = previous_results(results_path)
+    results = {}
+
+    db_handler = None if args.skip_mongo else bench_mongo(args, results)
+    if not args.skip_http:
+        bench_http(args, results)
+    if not args.skip_gui:
+        bench_gui(args, results, db_handler)
+
+    if not results:
+        print("ERROR: No se pudo medir nada.")
+        return 1
+
+    sha, dirty = git_revision()
+    run = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "git_sha": sha,
+        "git_dirty": dirty,
+        "python": platform.python_version(),
+        "host": platform.node(),
+        "iterations": args.iterations,
+        "benchmarks": results
+    }
+    print_report(results, previous)
+    with open(results_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"INFO: Resultados agregados a {results_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
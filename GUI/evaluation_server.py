@@ -0,0 +1,47 @@
+# evaluation_server.py
+import json
+import os
+
+from flask import Flask, request, jsonify, Response
+
+from EvaluationEngine import EvaluationEngine
+
+app = Flask(__name__)
+engine = EvaluationEngine()
+
+NDJSON_MIME = "application/x-ndjson"
+
+
+@app.route('/submit_evaluation', methods=['POST'])
+def submit_evaluation():
+    """
+    Evalúa el payload de CodeCompilerWrapper con el motor local.
+    Con 'Accept: application/x-ndjson' responde un evento por caso de prueba.
+    """
+    data = request.get_json(silent=True)
+
+    if NDJSON_MIME in request.headers.get('Accept', ''):
+        def generate():
+            for event in engine.iter_evaluate(data):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        return Response(generate(), mimetype=NDJSON_MIME)
+
+    result = engine.evaluate(data) if data is not None else {
+        "status": "error", "message": "El cuerpo debe ser un objeto JSON."}
+    status_code = 400 if result.get("status") == "error" else 200
+    return jsonify(result), status_code
+
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Contadores del motor (aciertos/fallos de la caché de binarios) para ajustar tamaños."""
+    return jsonify(engine.stats()), 200
+
+
+if __name__ == '__main__':
+    port = int(os.environ.get("PORT", "5000"))
+    # Corre código arbitrario: solo local salvo que se pida explícitamente (HOST=0.0.0.0)
+    host = os.environ.get("HOST", "127.0.0.1")
+    print("SERVIDOR DE EVALUACIÓN (PYTHON) INICIADO.")
+    print(f"Esperando en http://{host}:{port}/submit_evaluation")
+    app.run(host=host, port=port, debug=False, threaded=True)
@@ -0,0 +1,345 @@
+# load_generator.py
+"""
+Generador de carga para /submit_evaluation: simula un curso entero enviando
+soluciones a la vez (por ejemplo, un día de examen).
+
+Reproduce un corpus de envíos con el formato exacto de CodeCompilerWrapper
+(``problem_title``, ``user_code``, ``test_cases``), con llegadas de Poisson
+a una tasa dada y un máximo de envíos en vuelo. Cada ``--interval``
+segundos imprime rendimiento, tasa de error y percentiles de la ventana, y
+al final un resumen total.
+
+El tiempo de respuesta se mide desde el instante en que el envío DEBÍA
+salir según la tasa, no desde que salió: si el servidor se satura y los
+envíos esperan un cupo, esa espera aparece en los percentiles.
+
+Corpus (JSONL, un envío por línea): el payload de /submit_evaluation o un
+paquete de get_submission_data_for_evaluation (``code`` + ``problem_details``).
+
+Uso:
+    python load_generator.py --corpus envios.jsonl --rate 20 --concurrency 16 --duration 120
+    python load_generator.py --from-mongo 50 --save-corpus envios.jsonl --count 500
+    python load_generator.py --corpus envios.jsonl --rate 0 --concurrency 8   # lazo cerrado
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from PerfStats import summarize_latencies
+from PyLogic import BatchGradingReport, CodeCompilerWrapper, HttpClient
+
+ENDPOINT = "/submit_evaluation"
+
+TEMPLATE_SOLUTION = """#include <bits/stdc++.h>
+using namespace std;
+
+// Solución de carga para: {title}
+int main() {{
+    string line;
+    while (getline(cin, line)) cout << line << "\\n";
+    return 0;
+}}
+"""
+
+
+# =============================================
+# CORPUS
+# =============================================
+
+def load_corpus(path, adapter):
+    """
+    Lee el corpus JSONL y lo lleva al formato del payload de /submit_evaluation
+    (los paquetes se adaptan con ``adapter.build_evaluation_payload``).
+    """
+    payloads = []
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError as e:
+                print(f"ERROR: Línea {line_no} del corpus inválida: {e}")
+                continue
+            if "user_code" in entry:
+                payloads.append(entry)
+            else:
+                payloads.append(adapter.build_evaluation_payload(entry, verbose=False))
+    return payloads
+
+
+def corpus_from_mongo(uri, limit, adapter):
+    """Arma un envío de plantilla por cada problema de la colección ``problems``."""
+    import pymongo
+    client = pymongo.MongoClient(uri, serverSelectionTimeoutMS=3000)
+    payloads = []
+    for problem in client["codecoach_db"]["problems"].find({}).limit(limit):
+        problem["_id"] = str(problem["_id"])
+        package = {"code": TEMPLATE_SOLUTION.format(title=problem.get("title", "")),
+                   "problem_details": problem, "user_name": "carga"}
+        payloads.append(adapter.build_evaluation_payload(package, verbose=False))
+    return payloads
+
+
+# =============================================
+# ESTADÍSTICAS
+# =============================================
+
+class LoadStats:
+    """
+    Acumula los resultados: el total (en un BatchGradingReport) y la ventana
+    actual, que se vacía en cada reporte periódico.
+    """
+
+    def __init__(self):
+        self.report = BatchGradingReport()
+        self.response_ms = []  # Incluye la espera por un cupo
+        self.first_event_ms = []  # Solo en streaming: hasta el primer caso recibido
+        self.statuses = Counter()
+        self.sent = 0
+        self.in_flight = 0
+        self._window = []  # (tiempo de respuesta, falló)
+        self._lock = threading.Lock()
+
+    def started(self):
+        with self._lock:
+            self.sent += 1
+            self.in_flight += 1
+
+    def finished(self, index, result, service_ms, response_ms, first_event_ms=None):
+        failed = result.get("status") in BatchGradingReport.FAILURE_STATUSES + ("incomplete",)
+        with self._lock:
+            self.in_flight -= 1
+            self.report.record(index, result, service_ms)
+            self.response_ms.append(response_ms)
+            if first_event_ms is not None:
+                self.first_event_ms.append(first_event_ms)
+            self.statuses[result.get("status", "unknown")] += 1
+            self._window.append((response_ms, failed))
+
+    def take_window(self):
+        with self._lock:
+            window, self._window = self._window, []
+            return window, self.sent, self.in_flight
+
+
+def print_window(elapsed_s, interval_s, window, sent, in_flight):
+    latencies = summarize_latencies([ms for ms, _ in window])
+    errors = sum(1 for _, failed in window if failed)
+    error_rate = errors / len(window) if window else 0.0
+    print(f"[{elapsed_s:7.1f}s] enviados={sent:<6} en vuelo={in_flight:<4} "
+          f"completados={len(window):<5} {len(window) / interval_s:7.2f} env/s  "
+          f"errores={error_rate:6.1%}  p50={latencies.get('p50', '-')} "
+          f"p95={latencies.get('p95', '-')} p99={latencies.get('p99', '-')} ms")
+
+
+# =============================================
+# GENERADOR
+# =============================================
+
+class LoadGenerator:
+    """
+    Dispara los envíos según un proceso de Poisson de tasa ``rate`` (envíos/s;
+    0 = lazo cerrado, tan rápido como lo permita la concurrencia) sin superar
+    ``concurrency`` envíos en vuelo.
+    """
+
+    def __init__(self, client, payloads, rate, concurrency, stream=False, seed=None):
+        self.client = client
+        self.payloads = payloads
+        self.rate = rate
+        self.concurrency = concurrency
+        self.stream = stream
+        self.rng = random.Random(seed)
+        self.stats = LoadStats()
+        self._slots = threading.Semaphore(concurrency)
+        self._stop = threading.Event()
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self, count=None, duration_s=None, interval_s=5.0):
+        started = time.perf_counter()
+        reporter = threading.Thread(target=self._report_loop, args=(started, interval_s), daemon=True)
+        reporter.start()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load") as executor:
+                self._dispatch(executor, started, count, duration_s)
+        finally:
+            self.stats.report.elapsed_s = time.perf_counter() - started
+            self._stop.set()
+            reporter.join()
+        return self.stats
+
+    def _dispatch(self, executor, started, count, duration_s):
+        scheduled = started
+        index = 0
+        while not self._stop.is_set():
+            if count is not None and index >= count:
+                break
+            if duration_s is not None and scheduled - started >= duration_s:
+                break
+
+            if self.rate > 0:
+                scheduled += self.rng.expovariate(self.rate)
+                delay = scheduled - time.perf_counter()
+                if delay > 0 and self._stop.wait(delay):
+                    break
+            else:
+                scheduled = time.perf_counter()
+
+            self._slots.acquire()  # Servidor saturado: el envío espera, su reloj ya corre
+            payload = self.payloads[index % len(self.payloads)]
+            self.stats.started()
+            executor.submit(self._send_one, index, payload, scheduled)
+            index += 1
+
+    def _send_one(self, index, payload, scheduled):
+        sent_at = time.perf_counter()
+        first_event = []
+
+        def on_event(event):
+            if not first_event and event.get("event") == "test":
+                first_event.append((time.perf_counter() - sent_at) * 1000)
+
+        try:
+            if self.stream:
+                result = self.client.send_stream(payload, ENDPOINT, on_event=on_event)
+            else:
+                result = self.client.send(payload, ENDPOINT)
+        except Exception as e:
+            result = {"status": "unexpected_error", "message": str(e)}
+        finally:
+            self._slots.release()
+
+        now = time.perf_counter()
+        self.stats.finished(index, result, (now - sent_at) * 1000, (now - scheduled) * 1000,
+                            first_event[0] if first_event else None)
+
+    def _report_loop(self, started, interval_s):
+        last = started
+        while not self._stop.wait(interval_s):
+            now = time.perf_counter()
+            print_window(now - started, now - last, *self.stats.take_window())
+            last = now
+
+
+def print_summary(stats, args):
+    report = stats.report.as_dict()
+    report.pop("failures")
+    summary = {
+        "config": {"rate": args.rate, "concurrency": args.concurrency, "stream": args.stream,
+                   "url": args.url, "corpus_size": args.corpus_size},
+        "grading": report,
+        "response_ms": summarize_latencies(stats.response_ms),
+        "statuses": dict(stats.statuses),
+        "error_rate": round(len(stats.report.failures) / stats.report.total, 4) if stats.report.total else 0.0
+    }
+    if stats.first_event_ms:
+        summary["first_event_ms"] = summarize_latencies(stats.first_event_ms)
+
+    print("\n=== RESUMEN DE CARGA ===")
+    print(f"📊 {stats.report.summary_line()}")
+    response = summary["response_ms"]
+    print(f"⏱️  Respuesta (incluye espera por cupo): p50={response.get('p50', '-')} "
+          f"p95={response.get('p95', '-')} p99={response.get('p99', '-')} ms")
+    if "first_event_ms" in summary:
+        print(f"⏱️  Primer caso recibido: p50={summary['first_event_ms']['p50']} ms")
+    print(f"   Estados: {dict(stats.statuses)}  · tasa de error {summary['error_rate']:.2%}")
+    print("=== FIN ===\n")
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para /submit_evaluation")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--corpus", help="JSONL con un envío por línea")
+    source.add_argument("--from-mongo", type=int, metavar="N",
+                        help="Armar envíos de plantilla para N problemas de MongoDB")
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017/")
+    parser.add_argument("--save-corpus", help="Guardar el corpus usado (JSONL) para repetir la prueba")
+    parser.add_argument("--url", default=None, help="URL base del servidor (por defecto, detección automática)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Llegadas por segundo (0 = lazo cerrado)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Envíos en vuelo como máximo")
+    parser.add_argument("--count", type=int, default=None, help="Total de envíos")
+    parser.add_argument("--duration", type=float, default=None, help="Duración en segundos")
+    parser.add_argument("--interval", type=float, default=5.0, help="Segundos entre reportes")
+    parser.add_argument("--stream", action="store_true", help="Pedir resultados en streaming (NDJSON)")
+    parser.add_argument("--retries", type=int, default=0,
+                        help="Reintentos del cliente HTTP (0 para ver los errores reales del servidor)")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", help="Guardar el resumen final en este archivo JSON")
+    args = parser.parse_args(argv)
+    if args.count is None and args.duration is None:
+        args.count = 100
+    return args
+
+
+def main():
+    args = parse_args()
+    client = HttpClient(base_url=args.url, pool_size=args.concurrency, max_retries=args.retries)
+    adapter = CodeCompilerWrapper(client)
+
+    try:
+        if args.corpus:
+            payloads = load_corpus(args.corpus, adapter)
+        else:
+            payloads = corpus_from_mongo(args.mongo_uri, args.from_mongo, adapter)
+    except Exception as e:
+        print(f"ERROR: No se pudo armar el corpus: {e}")
+        return 1
+    if not payloads:
+        print("ERROR: El corpus está vacío.")
+        return 1
+    args.corpus_size = len(payloads)
+
+    if args.save_corpus:
+        with open(args.save_corpus, "w", encoding="utf-8") as f:
+            for payload in payloads:
+                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+    generator = LoadGenerator(client, payloads, args.rate, args.concurrency, stream=args.stream, seed=args.seed)
+    print(f"INFO: {len(payloads)} envíos en el corpus → {client.BASE_URL}{ENDPOINT} "
+          f"(tasa {args.rate}/s, concurrencia {args.concurrency})")
+
+    # Los print por envío de HttpClient se silencian: con carga taparían los reportes
+    real_stdout = sys.stdout
+    sys.stdout = _Quiet(real_stdout)
+    try:
+        stats = generator.run(count=args.count, duration_s=args.duration, interval_s=args.interval)
+    except KeyboardInterrupt:
+        generator.stop()
+        stats = generator.stats
+    finally:
+        sys.stdout = real_stdout
+        client.close()
+
+    summary = print_summary(stats, args)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+class _Quiet:
+    """stdout que solo deja pasar lo que escribe el propio generador (hilo de reportes y principal)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, text):
+        if not threading.current_thread().name.startswith("load"):
+            self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,32 +1,249 @@
 # mock_server.py
-from flask import Flask, request, jsonify
+"""
+Servidor de prueba con el contrato de /submit_evaluation.
+
+Sin argumentos se comporta como siempre: imprime y devuelve lo recibido
+(o resultados simulados en streaming si el cliente pide NDJSON). Con
+argumentos sirve como sustituto del servidor C++ para pruebas de carga de
+HttpClient/CodeCompilerWrapper: latencia configurable, errores inyectados,
+capacidad limitada y modo de calificación simulada.
+
+Ejemplos:
+    python mock_server.py
+    python mock_server.py --mode grade --quiet --latency lognormal --latency-ms 120 --jitter-ms 60
+    python mock_server.py --mode grade --quiet --error-rate 0.05 --error-kinds 503,timeout,malformed
+    python mock_server.py --max-concurrency 4 --latency fixed --latency-ms 200
+"""
+import argparse
+import json
+import math
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from flask import Flask, request, jsonify, Response
+
+from PerfStats import summarize_latencies
 
 app = Flask(__name__)
 
+NDJSON_MIME = "application/x-ndjson"
+
+# Pausa simulada por caso de prueba en modo streaming (segundos)
+STREAM_TEST_DELAY = float(os.environ.get("MOCK_STREAM_DELAY", "0.3"))
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+ERROR_KINDS = ("500", "503", "timeout", "malformed")
+
+
+class MockBehavior:
+    """
+    Comportamiento configurable del mock: latencia, errores y capacidad.
+
+    ``latency_ms`` es el valor (fixed) o la media de la distribución;
+    ``jitter_ms`` es el semiancho (uniform) o la desviación estándar
+    (normal, lognormal). ``max_concurrency`` limita cuántas peticiones se
+    atienden a la vez: el resto espera en cola, como en un servidor real.
+    Una respuesta en streaming ocupa su cupo hasta terminar de enviarse.
+    Las estadísticas de latencia usan las últimas ``LATENCY_SAMPLES`` muestras.
+    """
+
+    LATENCY_SAMPLES = 10000
+
+    def __init__(self, mode="echo", latency="fixed", latency_ms=0.0, jitter_ms=0.0,
+                 error_rate=0.0, error_kinds=ERROR_KINDS, hang_s=35.0, pass_rate=1.0,
+                 stream_delay=STREAM_TEST_DELAY, max_concurrency=0, quiet=False, seed=None):
+        self.mode = mode
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_kinds = tuple(error_kinds)
+        self.hang_s = hang_s
+        self.pass_rate = pass_rate
+        self.stream_delay = stream_delay
+        self.quiet = quiet
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency > 0 else None
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": {kind: 0 for kind in ERROR_KINDS},
+                         "in_flight": 0, "max_in_flight": 0}
+        self.injected_ms = deque(maxlen=self.LATENCY_SAMPLES)
+
+    def sample_latency_ms(self):
+        """Latencia simulada (ms) según la distribución configurada; nunca negativa."""
+        mean, spread = self.latency_ms, self.jitter_ms
+        with self._lock:
+            if self.latency == "uniform":
+                value = self._rng.uniform(mean - spread, mean + spread)
+            elif self.latency == "normal":
+                value = self._rng.gauss(mean, spread)
+            elif self.latency == "lognormal":
+                # Parámetros de la normal subyacente para obtener esa media y desviación
+                if mean <= 0:
+                    value = 0.0
+                else:
+                    sigma2 = math.log(1 + (spread / mean) ** 2)
+                    value = self._rng.lognormvariate(math.log(mean) - sigma2 / 2, sigma2 ** 0.5)
+            elif self.latency == "exponential":
+                value = self._rng.expovariate(1 / mean) if mean > 0 else 0.0
+            else:
+                value = mean
+        return max(0.0, value)
+
+    def pick_error(self):
+        """Tipo de error a inyectar en esta petición, o None."""
+        with self._lock:
+            if not self.error_kinds or self._rng.random() >= self.error_rate:
+                return None
+            kind = self._rng.choice(self.error_kinds)
+            self.counters["errors"][kind] += 1
+            return kind
+
+    def test_passes(self):
+        with self._lock:
+            return self._rng.random() < self.pass_rate
+
+    def enter(self):
+        if self._slots:
+            self._slots.acquire()
+        with self._lock:
+            self.counters["requests"] += 1
+            self.counters["in_flight"] += 1
+            self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+
+    def leave(self):
+        with self._lock:
+            self.counters["in_flight"] -= 1
+        if self._slots:
+            self._slots.release()
+
+    def record_latency(self, ms):
+        with self._lock:
+            self.injected_ms.append(ms)
+
+    def stats(self):
+        with self._lock:
+            samples = list(self.injected_ms)
+            counters = dict(self.counters, errors=dict(self.counters["errors"]))
+        counters["injected_latency_ms"] = summarize_latencies(samples)
+        counters["config"] = {
+            "mode": self.mode, "latency": self.latency, "latency_ms": self.latency_ms,
+            "jitter_ms": self.jitter_ms, "error_rate": self.error_rate,
+            "error_kinds": list(self.error_kinds), "pass_rate": self.pass_rate
+        }
+        return counters
+
+
+behavior = MockBehavior()
+
+
+def build_mock_tests(test_cases):
+    """ Resultados simulados: cada caso 'obtiene' lo esperado (o falla según pass_rate) """
+    tests = []
+    for i, case in enumerate(test_cases, 1):
+        passed = behavior.test_passes()
+        expected = case.get('expected_output_raw', '')
+        tests.append({
+            "test_id": i,
+            "input": case.get('input_raw', ''),
+            "expected": expected,
+            "obtained": expected if passed else "",
+            "passed": passed
+        })
+    return tests
+
+
+def build_summary(tests):
+    passed = sum(1 for t in tests if t["passed"])
+    return {
+        "status": "success",
+        "message": "Resultado simulado por el mock server",
+        "passed_count": passed,
+        "total_tests": len(tests),
+        "score": passed * 10,
+        "problem_solved": passed == len(tests)
+    }
+
+
+def stream_results(tests):
+    """ Emite un evento NDJSON por caso de prueba y un resumen al final """
+    for test in tests:
+        time.sleep(behavior.stream_delay)
+        yield json.dumps({"event": "test", "test": test}, ensure_ascii=False) + "\n"
+    yield json.dumps(dict(build_summary(tests), event="summary"), ensure_ascii=False) + "\n"
+
+
+def injected_error_response(kind):
+    """Respuesta para un error inyectado (None si el tipo no corta la petición)."""
+    if kind == "500":
+        return jsonify({"status": "server_error", "message": "Error 500 inyectado por el mock"}), 500
+    if kind == "503":
+        response = jsonify({"status": "server_error", "message": "Servicio no disponible (inyectado)"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    if kind == "malformed":
+        return Response('{"status": "success", "passed_count": ', status=200, mimetype="application/json")
+    if kind == "timeout":
+        # Más que el timeout de lectura del cliente: debe cortar él
+        time.sleep(behavior.hang_s)
+        return jsonify({"status": "server_error", "message": "Respuesta tardía (inyectada)"}), 504
+    return None
+
+
+def print_received(data):
+    print("\n=== DATOS RECIBIDOS EN EL SERVIDOR ===")
+    print(f"Código (primeros 100 chars): {data.get('user_code', 'N/A')[:100]}...")
+    print(f"Título del problema: {data.get('problem_title', 'N/A')}")
+
+    # Mostrar casos de prueba si existen
+    test_cases = data.get('test_cases', [])
+    print(f"Número de casos de prueba: {len(test_cases)}")
+    for i, case in enumerate(test_cases, 1):
+        print(f"  Caso {i}:")
+        print(f"    Input: {case.get('input_raw', 'N/A')}")
+        print(f"    Output esperado: {case.get('expected_output_raw', 'N/A')}")
+
+    print("=====================================\n")
+
 
 @app.route('/submit_evaluation', methods=['POST'])
 def mock_submit_evaluation():
-    """ Devuelve EXACTAMENTE lo que recibe para corroborar el formato """
+    """
+    En modo 'echo' devuelve lo que recibe para corroborar el formato; en modo
+    'grade' responde con un resultado simulado. Si el cliente pide NDJSON
+    (cabecera Accept), responde en streaming, un caso de prueba por línea.
+    """
+    behavior.enter()
+    streaming = False
     try:
         data = request.get_json()
 
-        print("\n=== DATOS RECIBIDOS EN EL SERVIDOR ===")
-        print(f"Código (primeros 100 chars): {data.get('code', 'N/A')[:100]}...")
-        print(f"Usuario: {data.get('user_name', 'N/A')}")
+        if not behavior.quiet:
+            print_received(data)
 
-        problem_details = data.get('problem_details', {})
-        print(f"Título del problema: {problem_details.get('title', 'N/A')}")
-        print(f"Dificultad: {problem_details.get('difficulty', 'N/A')}")
+        latency_ms = behavior.sample_latency_ms()
+        behavior.record_latency(latency_ms)
+        time.sleep(latency_ms / 1000)
 
-        # Mostrar ejemplos si existen
-        examples = problem_details.get('examples', [])
-        print(f"Número de ejemplos: {len(examples)}")
-        for i, example in enumerate(examples, 1):
-            print(f"  Ejemplo {i}:")
-            print(f"    Input: {example.get('input_raw', 'N/A')}")
-            print(f"    Output esperado: {example.get('output_raw', 'N/A')}")
+        error = injected_error_response(behavior.pick_error())
+        if error is not None:
+            return error
 
-        print("=====================================\n")
+        test_cases = data.get('test_cases', [])
+        if NDJSON_MIME in request.headers.get('Accept', ''):
+            # El generador corre después de esta función: el cupo se libera cuando la
+            # respuesta se cierra (enviada completa o cortada por el cliente)
+            response = Response(stream_results(build_mock_tests(test_cases)), mimetype=NDJSON_MIME)
+            response.call_on_close(behavior.leave)
+            streaming = True
+            return response
+
+        if behavior.mode == "grade":
+            tests = build_mock_tests(test_cases)
+            return jsonify(dict(build_summary(tests), tests=tests)), 200
 
         # DEVOLVER EXACTAMENTE LO RECIBIDO (más un campo extra para confirmación)
         response_data = {
@@ -43,10 +260,66 @@ def mock_submit_evaluation():
             "status": "server_error",
             "message": f"Error interno en el mock: {e}"
         }), 500
+    finally:
+        if not streaming:
+            behavior.leave()
+
+
+@app.route('/stats', methods=['GET'])
+def mock_stats():
+    """Contadores del mock: peticiones, errores inyectados, concurrencia y latencia simulada."""
+    return jsonify(behavior.stats()), 200
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Mock configurable del servidor de evaluación")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--mode", choices=("echo", "grade"), default="echo",
+                        help="echo: devuelve lo recibido; grade: resultado simulado")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="fixed",
+                        help="Distribución de la latencia simulada")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="Valor (fixed) o media de la latencia")
+    parser.add_argument("--jitter-ms", type=float, default=0.0,
+                        help="Semiancho (uniform) o desviación estándar (normal/lognormal)")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="Probabilidad de inyectar un error en cada petición (0-1)")
+    parser.add_argument("--error-kinds", default=",".join(ERROR_KINDS),
+                        help=f"Tipos de error separados por coma: {', '.join(ERROR_KINDS)}")
+    parser.add_argument("--hang-s", type=float, default=35.0,
+                        help="Espera de un error 'timeout' (mayor que el timeout de lectura del cliente)")
+    parser.add_argument("--pass-rate", type=float, default=1.0,
+                        help="Probabilidad de que cada caso simulado se apruebe")
+    parser.add_argument("--stream-delay", type=float, default=STREAM_TEST_DELAY,
+                        help="Pausa entre casos en modo streaming (segundos)")
+    parser.add_argument("--max-concurrency", type=int, default=0,
+                        help="Peticiones atendidas a la vez (0 = sin límite); el resto espera")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--quiet", action="store_true", help="No imprimir cada payload recibido")
+    args = parser.parse_args(argv)
+
+    kinds = [k.strip() for k in args.error_kinds.split(",") if k.strip()]
+    unknown = [k for k in kinds if k not in ERROR_KINDS]
+    if unknown:
+        parser.error(f"Tipos de error desconocidos: {', '.join(unknown)}")
+    args.error_kinds = kinds
+    return args
 
 
 if __name__ == '__main__':
-    print("MOCK SERVER EN MODO DEBUG INICIADO.")
-    print("Mostrará y devolverá exactamente lo recibido.")
-    print("Esperando en http://127.0.0.1:5000/submit_evaluation")
-    app.run(host='127.0.0.1', port=5000, debug=False)
\ No newline at end of file
+    args = parse_args()
+    behavior = MockBehavior(mode=args.mode, latency=args.latency, latency_ms=args.latency_ms,
+                            jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                            error_kinds=args.error_kinds, hang_s=args.hang_s, pass_rate=args.pass_rate,
+                            stream_delay=args.stream_delay, max_concurrency=args.max_concurrency,
+                            quiet=args.quiet, seed=args.seed)
+
+    print(f"MOCK SERVER INICIADO (modo {args.mode}).")
+    if args.mode == "echo":
+        print("Mostrará y devolverá exactamente lo recibido.")
+    print(f"Latencia: {args.latency} {args.latency_ms} ms ± {args.jitter_ms} ms · "
+          f"errores: {args.error_rate:.0%} ({', '.join(args.error_kinds)})")
+    print(f"Con 'Accept: {NDJSON_MIME}' responde en streaming, un caso cada {args.stream_delay}s.")
+    print(f"Esperando en http://{args.host}:{args.port}/submit_evaluation (estadísticas en /stats)")
+    app.run(host=args.host, port=args.port, debug=False, threaded=True)
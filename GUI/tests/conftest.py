@@ -0,0 +1,6 @@
+# conftest.py
+import os
+import sys
+
+# Los módulos de GUI/ se importan por nombre (como lo hace la app al correr desde GUI/)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+# test_password_hasher.py
+import hashlib
+
+import pytest
+
+from PasswordHasher import PasswordHasher
+
+# Costos mínimos: las pruebas verifican el formato y la lógica, no la lentitud del KDF
+CHEAP_SCRYPT = {"n": 2 ** 4, "r": 1, "p": 1}
+CHEAP_PBKDF2 = 1000
+
+requires_scrypt = pytest.mark.skipif(not hasattr(hashlib, "scrypt"), reason="Python sin hashlib.scrypt")
+
+
+@requires_scrypt
+def test_scrypt_roundtrip():
+    hasher = PasswordHasher("scrypt", **CHEAP_SCRYPT)
+    stored = hasher.hash("secreto")
+    assert stored.startswith("scrypt$16$1$1$")
+    assert hasher.verify("secreto", stored) == (True, False)
+    assert hasher.verify("otro", stored) == (False, False)
+
+
+def test_pbkdf2_roundtrip_and_unique_salts():
+    hasher = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2)
+    first, second = hasher.hash("secreto"), hasher.hash("secreto")
+    assert first != second  # Sal distinta en cada hash
+    assert hasher.verify("secreto", first) == (True, False)
+    assert hasher.verify("secreto", second) == (True, False)
+    assert hasher.verify("Secreto", first)[0] is False
+
+
+def test_higher_cost_asks_for_rehash():
+    old = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2)
+    new = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2 * 2)
+    stored = old.hash("secreto")
+    assert new.verify("secreto", stored) == (True, True)
+
+
+@requires_scrypt
+def test_other_algorithm_still_verifies_and_asks_for_rehash():
+    pbkdf2 = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2)
+    scrypt = PasswordHasher("scrypt", **CHEAP_SCRYPT)
+    assert scrypt.verify("secreto", pbkdf2.hash("secreto")) == (True, True)
+    assert pbkdf2.verify("secreto", scrypt.hash("secreto")) == (True, True)
+
+
+def test_legacy_plaintext_is_accepted_once_and_marked_for_rehash():
+    hasher = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2)
+    assert hasher.verify("secreto", "secreto") == (True, True)
+    assert hasher.verify("otro", "secreto") == (False, True)
+    assert hasher.verify("secreto", None) == (False, True)
+
+
+def test_corrupt_hash_never_matches():
+    hasher = PasswordHasher("pbkdf2_sha256", iterations=CHEAP_PBKDF2)
+    assert hasher.verify("secreto", "pbkdf2_sha256$no-es-numero$abc$def") == (False, False)
@@ -0,0 +1,98 @@
+# test_problem_search_index.py
+import random
+
+from ProblemSearchIndex import ProblemSearchIndex, fold, tokenize
+
+
+PROBLEMS = [
+    {"_id": "p1", "title": "Suma de dos números", "difficulty": "Fácil", "category": "Arreglos",
+     "statement": "Dado un arreglo de enteros, devuelve los índices de dos números que suman el objetivo."},
+    {"_id": "p2", "title": "Árbol binario balanceado", "difficulty": "Media", "category": "Árboles",
+     "statement": "Determina si la altura de los subárboles difiere en a lo sumo uno."},
+    {"_id": "p3", "title": "Camino más corto", "difficulty": "Difícil", "category": "Grafos",
+     "statement": "Encuentra la distancia mínima entre dos nodos de un grafo ponderado."},
+    {"_id": "p4", "title": "Subcadena palíndroma", "difficulty": "Media", "category": "Cadenas",
+     "statement": "Devuelve la subcadena palíndroma más larga."},
+]
+
+
+def ids(results):
+    return [problem_id for _, problem_id in results]
+
+
+def build(problems=PROBLEMS):
+    index = ProblemSearchIndex(lambda p: p["title"])
+    index.build(problems)
+    return index
+
+
+def test_fold_and_tokenize_ignore_case_and_accents():
+    assert fold("Árboles") == "arboles"
+    assert tokenize("Camino MÁS corto") == ["camino", "mas", "corto"]
+
+
+def test_prefix_search_on_fields_without_accents():
+    index = build()
+    assert ids(index.search("arbol")) == ["p2"]
+    assert ids(index.search("ÁRB")) == ["p2"]
+    assert ids(index.search("media")) == ["p2", "p4"]  # En orden de catálogo
+
+
+def test_every_word_must_match():
+    index = build()
+    assert ids(index.search("dos")) == ["p1", "p3"]  # "dos" del enunciado de p3
+    assert ids(index.search("dos grafo")) == ["p3"]
+    assert index.search("dos inexistente") == []
+    assert index.search("   ") == []
+
+
+def test_statement_needs_a_minimum_prefix():
+    index = build()
+    # "su" está en títulos (Suma, Subcadena); "subá" solo en un enunciado
+    assert ids(index.search("su")) == ["p1", "p4"]
+    assert ids(index.search("subárb")) == ["p2"]
+    assert ids(index.search("di")) == ["p3"]  # "Difícil"; "difiere" solo está en un enunciado
+
+
+def test_add_replaces_in_place_and_remove_forgets():
+    index = build()
+    index.add(dict(PROBLEMS[0], title="Suma de tres números"))
+    assert ids(index.search("tres")) == ["p1"]
+    assert index.search("suma tres")[0] == ("Suma de tres números", "p1")
+
+    index.add({"_id": "p5", "title": "Suma de rangos", "difficulty": "Fácil", "category": "Prefijos"})
+    assert ids(index.search("suma")) == ["p1", "p5"]
+
+    assert index.remove("p1")
+    assert not index.remove("p1")
+    assert ids(index.search("suma")) == ["p5"]
+    assert len(index) == 4
+
+
+def test_limit_and_dense_terms_agree_with_a_linear_scan():
+    rng = random.Random(11)
+    words = ["suma", "grafo", "arbol", "cadena", "pila", "cola", "mapa", "bit", "dp", "orden"]
+    problems = [{"_id": f"p{i}", "title": " ".join(rng.sample(words, 3)),
+                 "difficulty": rng.choice(["Fácil", "Media", "Difícil"]), "category": rng.choice(words),
+                 "statement": " ".join(rng.choices(words, k=8))}
+                for i in range(600)]
+
+    def expected(query, limit):
+        tokens = set(tokenize(query))
+        found = []
+        for problem in problems:
+            fields = set(tokenize(" ".join([problem["title"], problem["category"], problem["difficulty"]])))
+            text = set(tokenize(problem["statement"]))
+            if all(any(t.startswith(tok) for t in fields)
+                   or len(tok) >= ProblemSearchIndex.MIN_TEXT_PREFIX and any(t.startswith(tok) for t in text)
+                   for tok in tokens):
+                found.append(problem["_id"])
+        return found[:limit]
+
+    index = build(problems)
+    dense_index = build(problems)
+    dense_index.MAX_SET_POSTINGS = 50  # Fuerza el recorrido de candidatos para términos frecuentes
+    for query in ["suma", "suma grafo", "media pila", "ord", "co", "bit dp cola", "difícil arbol"]:
+        for limit in (5, 500):
+            assert ids(index.search(query, limit)) == expected(query, limit), query
+            assert ids(dense_index.search(query, limit)) == expected(query, limit), query
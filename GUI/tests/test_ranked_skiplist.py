@@ -0,0 +1,69 @@
+# test_ranked_skiplist.py
+import random
+
+import pytest
+
+pytest.importorskip("pymongo")  # Leaderboard.py lo importa al cargar
+
+from Leaderboard import RankedSkipList
+
+
+def check_against(skiplist, reference):
+    """La skip list debe coincidir con una lista ordenada en tamaño, rangos y cortes."""
+    reference = sorted(reference)
+    assert len(skiplist) == len(reference)
+    assert skiplist.slice(1, len(reference) + 5) == reference
+    for position, key in enumerate(reference, 1):
+        assert skiplist.rank(key) == position
+    for start in (1, 2, len(reference) // 2, len(reference)):
+        if start >= 1:
+            assert skiplist.slice(start, 3) == reference[start - 1:start + 2]
+
+
+def test_insert_remove_matches_sorted_reference():
+    rng = random.Random(7)
+    skiplist = RankedSkipList(seed=1)
+    reference = set()
+    for step in range(3000):
+        key = (-rng.randint(0, 500), f"u{rng.randint(0, 300)}")
+        if key in reference and rng.random() < 0.5:
+            assert skiplist.remove(key)
+            reference.discard(key)
+        elif key not in reference:
+            skiplist.insert(key)
+            reference.add(key)
+        if step % 250 == 0:
+            check_against(skiplist, reference)
+    check_against(skiplist, reference)
+
+
+def test_from_sorted_equals_incremental_inserts():
+    keys = sorted((-score, f"user{score % 17}") for score in range(400))
+    built = RankedSkipList.from_sorted(keys, seed=3)
+    check_against(built, keys)
+
+    # Sigue siendo una skip list válida después de construirla en bloque
+    built.insert((-1000, "nuevo"))
+    built.remove(keys[10])
+    expected = sorted(set(keys) - {keys[10]} | {(-1000, "nuevo")})
+    check_against(built, expected)
+
+
+def test_missing_keys_and_out_of_range():
+    skiplist = RankedSkipList(seed=5)
+    for key in [(-3, "a"), (-2, "b"), (-1, "c")]:
+        skiplist.insert(key)
+
+    assert skiplist.rank((-5, "zz")) is None
+    assert not skiplist.remove((-5, "zz"))
+    assert skiplist.slice(0, 2) == []
+    assert skiplist.slice(4, 2) == []
+    assert skiplist.slice(3, 10) == [(-1, "c")]
+
+
+def test_empty_list():
+    skiplist = RankedSkipList.from_sorted([])
+    assert len(skiplist) == 0
+    assert skiplist.slice(1, 10) == []
+    skiplist.insert((0, "solo"))
+    assert skiplist.rank((0, "solo")) == 1
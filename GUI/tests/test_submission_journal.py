@@ -0,0 +1,146 @@
+# test_submission_journal.py
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from SubmissionJournal import SubmissionJournal, DUPLICATE_KEY
+
+
+class InsertResult:
+    def __init__(self, inserted_ids):
+        self.inserted_ids = inserted_ids
+
+
+class FakeSubmissions:
+    """Colección con _id único, como ``submissions`` en MongoDB."""
+
+    def __init__(self):
+        self.docs = {}
+        self.fail_next = False
+
+    def create_index(self, keys):
+        pass
+
+    def insert_many(self, docs, ordered=True):
+        if self.fail_next:
+            self.fail_next = False
+            raise AutoReconnect("sin red")
+        inserted, errors = [], []
+        for index, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": DUPLICATE_KEY, "errmsg": "duplicate key"})
+            else:
+                self.docs[doc["_id"]] = doc
+                inserted.append(doc["_id"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(inserted)})
+        return InsertResult(inserted)
+
+
+def open_journal(directory, collection=None, **kwargs):
+    kwargs.setdefault("fsync_interval", 0.01)
+    kwargs.setdefault("upload_interval", 0.05)
+    return SubmissionJournal(collection=collection, directory=str(directory), **kwargs)
+
+
+def journal_lines(directory):
+    with open(os.path.join(directory, SubmissionJournal.JOURNAL_FILE), "rb") as f:
+        return f.read().splitlines(keepends=True)
+
+
+def test_appended_records_are_uploaded_once_with_real_dates(tmp_path):
+    collection = FakeSubmissions()
+    journal = open_journal(tmp_path)
+    ids = [journal.append({"user": "ana", "n": i}) for i in range(5)]
+    journal.attach(collection)
+    journal.close()
+
+    assert set(collection.docs) == set(ids)
+    assert all(isinstance(doc["submitted_at"], datetime) for doc in collection.docs.values())
+    assert journal.pending_upload_bytes() == 0
+
+
+def test_torn_last_line_is_dropped_on_open(tmp_path):
+    complete = [json.dumps({"_id": f"id{i}", "user": "ana", "submitted_at": "2024-01-01T00:00:00.000"})
+                for i in range(2)]
+    with open(tmp_path / SubmissionJournal.JOURNAL_FILE, "wb") as f:
+        f.write(("\n".join(complete) + "\n").encode("utf-8"))
+        f.write(b'{"_id": "id2", "user": "an')  # El proceso murió a mitad del write
+
+    collection = FakeSubmissions()
+    journal = open_journal(tmp_path, collection)
+    journal.append({"user": "beto"})
+    journal.close()
+
+    lines = journal_lines(tmp_path)
+    assert all(line.endswith(b"\n") for line in lines)
+    assert len(lines) == 3
+    assert {"id0", "id1"} <= set(collection.docs)
+    assert "id2" not in collection.docs
+    assert len(collection.docs) == 3
+
+
+def test_reupload_after_lost_checkpoint_skips_duplicates(tmp_path):
+    collection = FakeSubmissions()
+    journal = open_journal(tmp_path, collection)
+    for i in range(3):
+        journal.append({"user": "ana", "n": i})
+    journal.close()
+    assert len(collection.docs) == 3
+
+    # Murió entre el insert y el checkpoint: al reabrir se vuelve a subir todo
+    os.remove(tmp_path / SubmissionJournal.CHECKPOINT_FILE)
+    journal = open_journal(tmp_path, collection)
+    journal.close()
+
+    assert len(collection.docs) == 3
+    assert journal.counters["duplicates"] == 3
+    assert journal.pending_upload_bytes() == 0
+
+
+def test_failed_upload_keeps_the_checkpoint_and_retries(tmp_path):
+    collection = FakeSubmissions()
+    collection.fail_next = True
+    journal = open_journal(tmp_path, collection, batch_size=2)
+    for i in range(5):
+        journal.append({"user": "ana", "n": i})
+    journal.close()
+
+    assert journal.counters["upload_errors"] >= 1
+    assert len(collection.docs) == 5
+
+
+def test_rotation_empties_the_journal_and_resets_the_checkpoint(tmp_path):
+    collection = FakeSubmissions()
+    journal = open_journal(tmp_path, collection, rotate_bytes=1)
+    journal.append({"user": "ana"})
+    journal.close()
+
+    assert len(collection.docs) == 1
+    assert journal_lines(tmp_path) == []
+    with open(tmp_path / SubmissionJournal.CHECKPOINT_FILE, encoding="utf-8") as f:
+        assert json.load(f) == {"offset": 0}
+
+    # Lo que se anota después de rotar se sube normalmente
+    journal = open_journal(tmp_path, collection)
+    journal.append({"user": "beto"})
+    journal.close()
+    assert len(collection.docs) == 2
+
+
+def test_checkpoint_past_the_end_is_clamped(tmp_path):
+    # Murió tras truncar y antes de escribir el checkpoint en 0
+    with open(tmp_path / SubmissionJournal.CHECKPOINT_FILE, "w", encoding="utf-8") as f:
+        json.dump({"offset": 10 ** 6}, f)
+
+    collection = FakeSubmissions()
+    journal = open_journal(tmp_path, collection)
+    journal.append({"user": "ana"})
+    journal.close()
+    assert len(collection.docs) == 1
@@ -0,0 +1,102 @@
+# test_write_behind.py
+import pytest
+
+pytest.importorskip("pymongo")
+
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from WriteBehind import WriteBehindBuffer
+
+
+class FakeCollection:
+    """Registra cada bulk_write; ``fail_with`` hace fallar el siguiente."""
+
+    def __init__(self):
+        self.batches = []
+        self.fail_with = None
+
+    def bulk_write(self, ops, ordered=True):
+        assert ordered is False
+        if self.fail_with is not None:
+            error, self.fail_with = self.fail_with, None
+            raise error
+        self.batches.append(list(ops))
+
+
+def make_buffer(collection, merge=None):
+    # Intervalo largo: las pruebas llaman a flush() y el hilo no interviene
+    return WriteBehindBuffer(collection, lambda key, value: (key, value), merge=merge,
+                             flush_interval=3600, name="test-write-behind")
+
+
+def add_merge(old, new):
+    return old + new
+
+
+def test_changes_to_the_same_key_are_merged_into_one_op():
+    collection = FakeCollection()
+    buffer = make_buffer(collection, merge=add_merge)
+    for points in (10, 20, 30):
+        buffer.add("ana", points)
+    buffer.add("beto", 5)
+
+    assert len(buffer) == 2
+    assert buffer.flush() == 2
+    assert sorted(collection.batches[0]) == [("ana", 60), ("beto", 5)]
+    assert buffer.flush() == 0  # Nada pendiente
+    buffer.close()
+
+
+def test_default_merge_keeps_the_last_value():
+    collection = FakeCollection()
+    buffer = make_buffer(collection)
+    buffer.add("ana", 1)
+    buffer.add("ana", 2)
+    buffer.flush()
+    assert collection.batches == [[("ana", 2)]]
+    buffer.close()
+
+
+def test_failed_batch_is_requeued_before_newer_changes():
+    collection = FakeCollection()
+    buffer = make_buffer(collection, merge=add_merge)
+    buffer.add("ana", 10)
+    collection.fail_with = AutoReconnect("sin red")
+
+    assert buffer.flush() == 0
+    assert buffer.counters["failed_flushes"] == 1
+    assert len(buffer) == 1
+
+    # Lo que llega después se combina detrás del valor que falló
+    buffer.add("ana", 5)
+    assert buffer.flush() == 1
+    assert collection.batches == [[("ana", 15)]]
+    buffer.close()
+
+
+def test_only_the_failed_ops_of_a_bulk_write_are_requeued():
+    collection = FakeCollection()
+    buffer = make_buffer(collection, merge=add_merge)
+    buffer.add("ana", 1)
+    buffer.add("beto", 2)
+    buffer.add("carla", 3)
+    # El orden de las operaciones es el de inserción de las claves: falla la de "beto"
+    collection.fail_with = BulkWriteError({"writeErrors": [{"index": 1, "code": 2, "errmsg": "x"}]})
+
+    assert buffer.flush() == 2
+    assert len(buffer) == 1
+    buffer.flush()
+    assert collection.batches == [[("beto", 2)]]
+    buffer.close()
+
+
+def test_close_writes_pending_and_later_adds_go_straight_through():
+    collection = FakeCollection()
+    buffer = make_buffer(collection)
+    buffer.add("ana", 1)
+    buffer.close()
+    assert collection.batches == [[("ana", 1)]]
+
+    buffer.add("beto", 2)  # Tras close no hay hilo: se escribe en el momento
+    assert collection.batches[-1] == [("beto", 2)]
+    assert len(buffer) == 0